@@ -0,0 +1,722 @@
+# ---------------------- IMPORTS ----------------------
+
+import argparse  # Command-line interface: python benchmark.py rows --rows 100000
+import asyncio  # Load generation runs many concurrent MCP calls on one event loop
+import json  # Results are printed as machine-readable JSON
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from mcp import StdioServerParameters
+from mcp.server.fastmcp.server import _convert_to_content  # How FastMCP packs a tool's return value
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CallToolResult
+
+from datastore import EXPORT_FORMATS, EmployeeDB, export_employees, get_manager, get_read_cache, shard_database
+from calculator import ArrayCalculator
+from compact import dumps, encode_table, expand
+from employee import COLUMNS, Employee, row_to_dict
+from replica import enable_replica
+from session_pool import MCPSessionPool
+
+
+# Directory holding the server scripts, used to launch them over stdio
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+ROLES = ["Data Scientist", "ML Engineer", "Software Engineer", "Product Manager", "Analyst"]
+
+
+# ---------------------- SYNTHETIC DATA ----------------------
+
+def make_synthetic_db(path: str, rows: int, seed: int = 42) -> str:
+    """
+    Create (or top up) an employees database with `rows` random employees.
+
+    Args:
+        path (str): Database file to create.
+        rows (int): Number of employees the table should contain.
+        seed (int): Random seed, so runs are repeatable.
+
+    Returns:
+        str: The database path.
+    """
+    db = EmployeeDB(path)
+    with get_manager(path).reader() as conn:
+        existing = conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+    if existing < rows:
+        rng = random.Random(seed + existing)
+        db.bulk_add_employees(
+            ((f"emp{i}", rng.choice(ROLES), rng.randrange(40_000, 250_000, 1000))
+             for i in range(existing, rows)),
+            chunk_size=50_000,
+            defer_indexes=True,
+        )
+    return path
+
+
+# ---------------------- ROW CONVERSION BENCHMARK ----------------------
+
+def bench_rows(db_file: str, repeat: int = 3) -> dict:
+    """
+    Compare the per-row cost of turning query results into serializable dicts.
+
+    - validated: Employee(...) with Pydantic validation, then model_dump()
+                 (what every read did before the fast path existed)
+    - raw: row_to_dict(), the plain-dict fast path used by the server tools
+
+    The query itself is timed separately so the conversion cost can be compared to it.
+    """
+    with get_manager(db_file).reader() as conn:
+        t0 = time.perf_counter()
+        rows = conn.execute(f"SELECT {COLUMNS} FROM employees ORDER BY id").fetchall()
+        query_seconds = time.perf_counter() - t0
+
+    paths = {
+        "validated": lambda r: Employee(id=r[0], name=r[1], role=r[2], salary=r[3]).model_dump(),
+        "raw": row_to_dict,
+    }
+    results = {"rows": len(rows), "query_us_per_row": query_seconds / max(len(rows), 1) * 1e6}
+    for name, convert in paths.items():
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = [convert(r) for r in rows]
+            best = min(best, time.perf_counter() - t0)
+        # Serializing the result is part of what every tool call pays
+        t0 = time.perf_counter()
+        json.dumps(out)
+        results[name] = {
+            "convert_us_per_row": round(best / max(len(rows), 1) * 1e6, 3),
+            "json_us_per_row": round((time.perf_counter() - t0) / max(len(rows), 1) * 1e6, 3),
+        }
+    results["query_us_per_row"] = round(results["query_us_per_row"], 3)
+    results["speedup_raw_vs_validated"] = round(
+        results["validated"]["convert_us_per_row"] / max(results["raw"]["convert_us_per_row"], 1e-9), 1
+    )
+    return results
+
+
+# ---------------------- EXPORT BENCHMARK ----------------------
+
+def bench_export(db_file: str, formats: list, rows_per_file: int, out_dir: str) -> dict:
+    """
+    Time each export format and measure its peak Python heap.
+
+    Each format is run twice: once untraced for the timing, then under tracemalloc
+    for the peak memory (tracing slows allocation down). The inline baseline is
+    what get_all_employees does: build every row as a dict and JSON-encode the list.
+    """
+    results = {}
+    for fmt in formats:
+        report = export_employees(db_file, fmt, out_dir, rows_per_file)
+        tracemalloc.start()
+        traced = export_employees(db_file, fmt, out_dir, rows_per_file)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[fmt] = {
+            "rows": report["rows"],
+            "files": len(report["files"]),
+            "bytes": sum(f["bytes"] for f in report["files"]),
+            "seconds": report["seconds"],
+            "rows_per_sec": round(report["rows"] / report["seconds"]) if report["seconds"] else None,
+            "peak_heap_mb": round(peak / 2**20, 1),
+        }
+        for f in report["files"] + traced["files"]:
+            os.remove(f["path"])
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    body = json.dumps(list(Employee.iter_all(batch_size=10_000, db_file=db_file, raw=True)))
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results["inline_json_baseline"] = {
+        "bytes": len(body),
+        "seconds_traced": round(seconds, 3),
+        "peak_heap_mb": round(peak / 2**20, 1),
+    }
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# ---------------------- REPLICA BENCHMARK ----------------------
+
+# Read queries timed against the disk file and the in-memory replica
+REPLICA_QUERIES = {
+    "point": (f"SELECT {COLUMNS} FROM employees WHERE id = ?", lambda rng, n: (rng.randint(1, n),)),
+    "page": (f"SELECT {COLUMNS} FROM employees WHERE id > ? ORDER BY id LIMIT 100",
+             lambda rng, n: (rng.randint(0, max(n - 100, 0)),)),
+    "search": (f"SELECT {COLUMNS} FROM employees WHERE role = ? AND salary BETWEEN ? AND ? LIMIT 100",
+               lambda rng, n: (rng.choice(ROLES), 100_000, 101_000)),
+}
+
+
+def bench_replica(db_file: str, queries: int, inserts: int, seed: int = 7) -> dict:
+    """
+    Compare reads from the disk file with reads from an in-memory replica.
+
+    The SQL queries bypass the read cache (they go straight through the connection
+    manager) so the numbers show the storage cost; get_by_id is the full lookup
+    path including the cache's version check. Afterwards `inserts` rows are added
+    and the time of the replica's incremental refresh is reported.
+    """
+    manager = get_manager(db_file)
+    with manager.reader() as conn:
+        n = conn.execute("SELECT MAX(id) FROM employees").fetchone()[0] or 1
+
+    def run_queries() -> dict:
+        results = {}
+        for name, (sql, make_args) in REPLICA_QUERIES.items():
+            rng = random.Random(seed)
+            args = [make_args(rng, n) for _ in range(queries)]
+            t0 = time.perf_counter()
+            for a in args:
+                with manager.reader() as conn:
+                    conn.execute(sql, a).fetchall()
+            seconds = time.perf_counter() - t0
+            results[name] = {"us_per_query": round(seconds / queries * 1e6, 1),
+                             "queries_per_sec": round(queries / seconds)}
+        # What get_employee_by_id pays: the read cache's version check, then (mostly) a miss
+        rng = random.Random(seed)
+        ids = [rng.randint(1, n) for _ in range(queries)]
+        t0 = time.perf_counter()
+        for emp_id in ids:
+            Employee.get_by_id(emp_id, db_file)
+        seconds = time.perf_counter() - t0
+        results["get_by_id"] = {"us_per_query": round(seconds / queries * 1e6, 1),
+                                "queries_per_sec": round(queries / seconds)}
+        return results
+
+    report = {"rows": n, "disk": run_queries()}
+
+    replica = enable_replica(db_file)
+    report["replica_load_seconds"] = round(replica.last_load_seconds, 3)
+    report["replica"] = run_queries()
+    for name in report["disk"]:
+        report["replica"][name]["speedup"] = round(
+            report["disk"][name]["us_per_query"] / max(report["replica"][name]["us_per_query"], 1e-9), 2
+        )
+
+    if inserts:
+        EmployeeDB(db_file).bulk_add_employees(
+            ((f"replica{i}", ROLES[i % len(ROLES)], 50_000.0) for i in range(inserts))
+        )
+        t0 = time.perf_counter()
+        replica.refresh()
+        report["refresh_after_inserts"] = {
+            "rows": inserts,
+            "seconds": round(time.perf_counter() - t0, 4),
+            "full_reloads": replica.loads - 1,
+        }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+# ---------------------- READ CACHE BENCHMARK ----------------------
+
+def bench_cache(db_file: str, queries: int, hot_ids: int, seed: int = 3) -> dict:
+    """
+    Cost of a get_by_id call served by the read cache, against the same calls
+    going to SQLite every time.
+
+    - uncached: the cache is sized to zero, so every call queries the database
+    - poll_every_get: cached, but PRAGMA data_version is checked on every lookup
+    - cached: cached with the default version poll interval
+
+    Lookups cycle over `hot_ids` IDs, so after the first round every cached call is a hit.
+    """
+    cache = get_read_cache(db_file)
+    maxsize, poll_interval = cache.maxsize, cache.poll_interval
+    with get_manager(db_file).reader() as conn:
+        n = conn.execute("SELECT MAX(id) FROM employees").fetchone()[0] or 1
+    rng = random.Random(seed)
+    hot = [rng.randint(1, n) for _ in range(hot_ids)]
+    ids = [hot[i % hot_ids] for i in range(queries)]
+
+    def run(size: int, interval: float) -> dict:
+        cache.maxsize, cache.poll_interval = size, interval
+        cache.invalidate()
+        for emp_id in hot:
+            Employee.get_by_id(emp_id, db_file)   # Warm up
+        t0 = time.perf_counter()
+        for emp_id in ids:
+            Employee.get_by_id(emp_id, db_file)
+        seconds = time.perf_counter() - t0
+        return {"us_per_lookup": round(seconds / queries * 1e6, 2), "lookups_per_sec": round(queries / seconds)}
+
+    try:
+        report = {
+            "rows": n,
+            "hot_ids": hot_ids,
+            "uncached": run(0, 0.0),
+            "poll_every_get": run(maxsize, 0.0),
+            "cached": run(maxsize, poll_interval),
+        }
+    finally:
+        cache.maxsize, cache.poll_interval = maxsize, poll_interval
+    for name in ("poll_every_get", "cached"):
+        report[name]["speedup"] = round(
+            report["uncached"]["us_per_lookup"] / max(report[name]["us_per_lookup"], 1e-9), 2
+        )
+    report["poll_interval_ms"] = poll_interval * 1000
+    return report
+
+
+# ---------------------- SHARDING BENCHMARK ----------------------
+
+def bench_shards(rows: int, shards: int, inserts: int, writers: int, queries: int, seed: int = 11) -> dict:
+    """
+    Compare one database file with the same rows split over `shards` files.
+
+    Both layouts are built in a temporary directory. Reported per layout: bulk
+    insert throughput, single-row insert throughput from `writers` threads, and
+    the latency of point lookups, searches, pages and role aggregates.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import shutil
+
+    report = {"rows": rows, "shards": shards}
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = make_synthetic_db(os.path.join(tmp, "plain.db"), rows, seed)
+        sharded = os.path.join(tmp, "sharded.db")
+        shutil.copy(plain, sharded)
+        report["split_seconds"] = shard_database(sharded, shards)["seconds"]
+
+        for label, db_file in (("single_file", plain), ("sharded", sharded)):
+            rng = random.Random(seed)
+            result = {}
+            new_rows = [(f"new{i}", rng.choice(ROLES), 50_000.0) for i in range(inserts)]
+            r = EmployeeDB(db_file).bulk_add_employees(new_rows, chunk_size=10_000)
+            result["bulk_rows_per_sec"] = r["rows_per_sec"]
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(writers) as pool:
+                list(pool.map(lambda i: Employee.add_employee(f"w{i}", ROLES[i % len(ROLES)], 1.0, db_file),
+                              range(inserts // 10)))
+            result["single_inserts_per_sec"] = round(inserts // 10 / (time.perf_counter() - t0))
+
+            lookups = {
+                "point": lambda: Employee.get_by_id(rng.randint(1, rows), db_file),
+                "search": lambda: Employee.search(role=rng.choice(ROLES), min_salary=100_000,
+                                                  max_salary=101_000, limit=50, db_file=db_file, raw=True),
+                "page": lambda: Employee.get_page(rng.randint(0, rows), 100, db_file, raw=True),
+                "role_stats": lambda: Employee.role_stats(db_file),
+            }
+            for name, call in lookups.items():
+                t0 = time.perf_counter()
+                for _ in range(queries):
+                    call()
+                result[f"{name}_us"] = round((time.perf_counter() - t0) / queries * 1e6, 1)
+            report[label] = result
+    return report
+
+
+# ---------------------- COMPACT RESULT BENCHMARK ----------------------
+
+def _best_seconds(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_compact(db_file: str, batch_size: int, repeat: int = 3, seed: int = 5) -> dict:
+    """
+    Size and encode/decode time of a large tool result in each format, measured on
+    the CallToolResult message the server actually sends.
+
+    - default: the tool's normal return value (FastMCP turns a list into one
+               indent=2 JSON text content item per element)
+    - compact: header plus row arrays, no whitespace
+    - compact_dict: the same with role / error messages dictionary-encoded
+                    (what the tools send with compact=True)
+
+    Encoding covers building the result message and serializing it; decoding covers
+    parsing the message and its JSON texts and, for the compact forms, expanding
+    them back to row dicts (what the client wrappers do).
+    """
+    employees = Employee.get_all(db_file, raw=True)
+    rng = random.Random(seed)
+    a = [rng.uniform(-1000, 1000) for _ in range(batch_size)]
+    b = [rng.choice((0.0, rng.uniform(-1000, 1000))) for _ in range(batch_size)]   # Many divisions by zero
+    batch = ArrayCalculator().batch("divide", a, b)
+    columns = ("id", "name", "role", "salary")
+
+    cases = {
+        "employees": {
+            "default": lambda: employees,
+            "compact": lambda: dumps(encode_table(employees, columns)),
+            "compact_dict": lambda: dumps(encode_table(employees, columns, ("role",))),
+        },
+        "batch_eval": {
+            "default": lambda: batch,
+            "compact": lambda: dumps({"results": batch["results"],
+                                      "errors": encode_table(batch["errors"], ("index", "error"))}),
+            "compact_dict": lambda: dumps({"results": batch["results"],
+                                           "errors": encode_table(batch["errors"], ("index", "error"), ("error",))}),
+        },
+    }
+
+    def encode(tool_result) -> str:
+        return CallToolResult(content=_convert_to_content(tool_result)).model_dump_json(by_alias=True, exclude_none=True)
+
+    def decode(message: str):
+        content = CallToolResult.model_validate_json(message).content
+        return [expand(json.loads(item.text)) for item in content]
+
+    report = {"employee_rows": len(employees), "batch_size": batch_size, "batch_errors": len(batch["errors"])}
+    for name, formats in cases.items():
+        result = {}
+        for label, tool_result in formats.items():
+            message = encode(tool_result())
+            result[label] = {
+                "bytes": len(message.encode()),
+                "encode_ms": round(_best_seconds(lambda: encode(tool_result()), repeat) * 1000, 2),
+                "decode_ms": round(_best_seconds(lambda: decode(message), repeat) * 1000, 2),
+            }
+        for label in ("compact", "compact_dict"):
+            result[label]["size_vs_default"] = round(result[label]["bytes"] / result["default"]["bytes"], 3)
+        report[name] = result
+    return report
+
+
+# ---------------------- LOAD GENERATION ----------------------
+
+# Each workload names the server it targets and builds the arguments for one call.
+# No LLM is involved: these are the tool calls an agent would make, issued directly.
+WORKLOADS = {
+    "point": ("employee", "get_employee_by_id", lambda rng, n: {"emp_id": rng.randint(1, n)}),
+    "page": ("employee", "get_employees_page", lambda rng, n: {"limit": 100}),
+    "scan": ("employee", "get_all_employees", lambda rng, n: {}),
+    "insert": ("employee", "add_employee",
+               lambda rng, n: {"name": f"bench{rng.randrange(10**9)}", "role": rng.choice(ROLES),
+                               "salary": float(rng.randrange(40_000, 250_000, 1000))}),
+    "scalar": ("calculator", "add", lambda rng, n: {"a": rng.random(), "b": rng.random()}),
+    "batch": ("calculator", "batch_eval",
+              lambda rng, n: {"op": "multiply", "a": [rng.random() for _ in range(1000)],
+                              "b": [rng.random() for _ in range(1000)]}),
+}
+
+SERVER_SCRIPTS = {"calculator": "calculator_server.py", "employee": "employee_server.py"}
+
+
+def parse_mix(text: str) -> dict:
+    """Parse "point=80,insert=10,scalar=10" into {"point": 80, "insert": 10, "scalar": 10}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in WORKLOADS:
+            raise ValueError(f"Unknown workload '{name}'. Choose from: {', '.join(WORKLOADS)}.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident memory of this process and of finished child processes, in MiB."""
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+        }
+    except ImportError:
+        # Windows has no resource module; psutil reports the peak working set instead
+        import psutil
+        info = psutil.Process().memory_info()
+        return {"self": round(getattr(info, "peak_wset", info.rss) / 2**20, 1), "children": None}
+
+
+class _SessionCaller:
+    """Adapter giving a single ClientSession the same call_tool() as MCPSessionPool."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def call_tool(self, name, args):
+        return await self.session.call_tool(name, args)
+
+
+@asynccontextmanager
+async def http_server(name: str, db_file: str, start_timeout: float = 30.0):
+    """
+    Run a server subprocess with the streamable HTTP transport on a free local port.
+
+    Yields:
+        str: The server's URL, e.g. "http://127.0.0.1:53211/mcp".
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(HERE, SERVER_SCRIPTS[name]),
+        "--transport", "streamable-http", "--host", "127.0.0.1", "--port", str(port),
+        env={**os.environ, "EMPLOYEE_DB": db_file}, cwd=HERE,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        # Wait until the server accepts connections
+        deadline = time.monotonic() + start_timeout
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                if proc.returncode is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{name} server did not start listening on port {port}.")
+                await asyncio.sleep(0.1)
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            await proc.wait()
+
+
+@asynccontextmanager
+async def open_servers(names: set, transport: str, db_file: str, sessions: int, urls: dict | None = None):
+    """
+    Connect to each server that the workload mix needs.
+
+    Args:
+        urls (dict | None): For the http transport, server name -> URL of an already
+            running server. Servers without a URL are started on a free local port.
+
+    Yields:
+        dict: Server name -> object with an async call_tool(name, args).
+    """
+    os.environ["EMPLOYEE_DB"] = db_file
+    async with AsyncExitStack() as stack:
+        callers = {}
+        for name in names:
+            if transport == "http":
+                # One shared server process per tool set, `sessions` connections to it
+                url = (urls or {}).get(name) or await stack.enter_async_context(http_server(name, db_file))
+                callers[name] = await stack.enter_async_context(
+                    MCPSessionPool(url, size=sessions, health_check_interval=0)
+                )
+            elif transport == "memory":
+                # Import here so EMPLOYEE_DB is already set when the server module loads
+                module = __import__(SERVER_SCRIPTS[name][:-3])
+                session = await stack.enter_async_context(
+                    create_connected_server_and_client_session(module.mcp._mcp_server)
+                )
+                callers[name] = _SessionCaller(session)
+            else:
+                params = StdioServerParameters(
+                    command=sys.executable,
+                    args=[os.path.join(HERE, SERVER_SCRIPTS[name])],
+                    env={**os.environ, "EMPLOYEE_DB": db_file},
+                    cwd=HERE,
+                )
+                callers[name] = await stack.enter_async_context(
+                    MCPSessionPool(params, size=sessions, health_check_interval=0)
+                )
+        yield callers
+
+
+async def run_load(mix: dict, requests: int, concurrency: int, transport: str,
+                   db_file: str, rows: int, sessions: int = 1, seed: int = 42, urls: dict | None = None) -> dict:
+    """
+    Issue `requests` tool calls drawn from `mix` using `concurrency` workers.
+
+    Returns:
+        dict: Throughput, per-workload p50/p95/p99 latency (ms), error counts and peak RSS.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    plan = rng.choices(names, weights=[mix[n] for n in names], k=requests)
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    servers = {WORKLOADS[name][0] for name in names}
+
+    async with open_servers(servers, transport, db_file, sessions, urls) as callers:
+        queue = iter(plan)
+
+        async def worker():
+            for name in queue:
+                server, tool, make_args = WORKLOADS[name]
+                args = make_args(rng, rows)
+                t0 = time.perf_counter()
+                try:
+                    result = await callers[server].call_tool(tool, args)
+                    if result.isError:
+                        errors[name] += 1
+                except Exception:
+                    errors[name] += 1
+                latencies[name].append((time.perf_counter() - t0) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "config": {"mix": mix, "requests": requests, "concurrency": concurrency,
+                   "transport": transport, "rows": rows, "sessions": sessions},
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "workloads": {},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    for name, values in latencies.items():
+        values.sort()
+        report["workloads"][name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict) -> dict:
+    """Percentage change of throughput and latency percentiles versus a saved run."""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    diff = {"throughput_rps_pct": change(report["throughput_rps"], baseline["throughput_rps"]), "workloads": {}}
+    for name, stats in report["workloads"].items():
+        old = baseline.get("workloads", {}).get(name)
+        if old:
+            diff["workloads"][name] = {
+                key: change(stats[key], old[key]) for key in ("p50_ms", "p95_ms", "p99_ms")
+            }
+    return diff
+
+
+# ---------------------- ENTRY POINT ----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the calculator and employee MCP servers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rows = sub.add_parser("rows", help="Per-row cost of Pydantic vs plain-dict result building.")
+    rows.add_argument("--rows", type=int, default=100_000, help="Synthetic table size.")
+    rows.add_argument("--db", help="Use this database instead of a temporary synthetic one.")
+
+    export = sub.add_parser("export", help="Export time and peak memory per file format.")
+    export.add_argument("--rows", type=int, default=1_000_000, help="Synthetic table size.")
+    export.add_argument("--db", help="Use this database instead of a temporary synthetic one.")
+    export.add_argument("--formats", default=",".join(EXPORT_FORMATS),
+                        help=f"Comma-separated formats: {', '.join(EXPORT_FORMATS)}.")
+    export.add_argument("--rows-per-file", type=int, default=250_000, help="Rows per output chunk.")
+
+    replica = sub.add_parser("replica", help="Read latency from disk vs the in-memory replica.")
+    replica.add_argument("--rows", type=int, default=1_000_000, help="Synthetic table size.")
+    replica.add_argument("--db", help="Use this database instead of a synthetic one (rows are added to it).")
+    replica.add_argument("--queries", type=int, default=20_000, help="Queries per query type and mode.")
+    replica.add_argument("--inserts", type=int, default=1000,
+                         help="Rows added afterwards to time the incremental refresh.")
+
+    cache = sub.add_parser("cache", help="get_by_id latency with and without the read cache.")
+    cache.add_argument("--rows", type=int, default=100_000, help="Synthetic table size.")
+    cache.add_argument("--db", help="Use this database instead of a temporary synthetic one.")
+    cache.add_argument("--queries", type=int, default=100_000, help="Lookups per mode.")
+    cache.add_argument("--hot-ids", type=int, default=1000, help="Distinct IDs looked up.")
+
+    shards = sub.add_parser("shards", help="One database file vs the same rows split over shards.")
+    shards.add_argument("--rows", type=int, default=200_000, help="Synthetic table size.")
+    shards.add_argument("--shards", type=int, default=4, help="Number of shard files.")
+    shards.add_argument("--inserts", type=int, default=100_000, help="Rows bulk-inserted (a tenth of that one by one).")
+    shards.add_argument("--writers", type=int, default=8, help="Threads doing single-row inserts.")
+    shards.add_argument("--queries", type=int, default=2000, help="Calls per lookup type.")
+
+    compact = sub.add_parser("compact", help="Payload bytes and encode/decode time of compact results.")
+    compact.add_argument("--rows", type=int, default=100_000, help="Synthetic table size.")
+    compact.add_argument("--db", help="Use this database instead of a temporary synthetic one.")
+    compact.add_argument("--batch-size", type=int, default=100_000, help="Elements in the batch_eval result.")
+
+    load = sub.add_parser("load", help="Drive the MCP servers with a mixed tool-call workload.")
+    load.add_argument("--mix", default="point=70,page=5,insert=10,scalar=10,batch=5",
+                      help=f"Comma-separated workload=weight pairs. Workloads: {', '.join(WORKLOADS)}.")
+    load.add_argument("--requests", type=int, default=2000, help="Total tool calls to issue.")
+    load.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight calls.")
+    load.add_argument("--transport", choices=["memory", "stdio", "http"], default="memory",
+                      help="memory: server in this process; stdio: server subprocesses; "
+                           "http: one streamable-HTTP server process per tool set.")
+    load.add_argument("--sessions", type=int, default=1,
+                      help="Sessions per server (stdio: server processes; http: connections).")
+    load.add_argument("--calculator-url", help="With --transport http, use this running calculator server.")
+    load.add_argument("--employee-url", help="With --transport http, use this running employee server "
+                                             "(it should serve the same --db).")
+    load.add_argument("--rows", type=int, default=10_000, help="Synthetic employee table size (1k-10M).")
+    load.add_argument("--db", help="Use this database instead of a synthetic one (it will be written to).")
+    load.add_argument("--save", help="Write the JSON report to this file, e.g. to use as a baseline.")
+    load.add_argument("--baseline", help="Compare against a report saved earlier with --save.")
+
+    args = parser.parse_args()
+
+    if args.command == "rows":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        print(json.dumps(bench_rows(db_file), indent=2))
+
+    elif args.command == "export":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        with tempfile.TemporaryDirectory() as out_dir:
+            report = bench_export(db_file, args.formats.split(","), args.rows_per_file, out_dir)
+        print(json.dumps(report, indent=2))
+
+    elif args.command == "replica":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        print(json.dumps(bench_replica(db_file, args.queries, args.inserts), indent=2))
+
+    elif args.command == "cache":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        print(json.dumps(bench_cache(db_file, args.queries, args.hot_ids), indent=2))
+
+    elif args.command == "shards":
+        print(json.dumps(bench_shards(args.rows, args.shards, args.inserts, args.writers, args.queries), indent=2))
+
+    elif args.command == "compact":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        print(json.dumps(bench_compact(db_file, args.batch_size), indent=2))
+
+    elif args.command == "load":
+        db_file = args.db or make_synthetic_db(
+            os.path.join(tempfile.gettempdir(), f"bench_employees_{args.rows}.db"), args.rows
+        )
+        report = asyncio.run(run_load(
+            parse_mix(args.mix), args.requests, args.concurrency, args.transport,
+            os.path.abspath(db_file), args.rows, args.sessions,
+            urls={"calculator": args.calculator_url, "employee": args.employee_url},
+        ))
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["vs_baseline"] = compare_to_baseline(report, json.load(f))
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import threading  # The cache is shared by every thread serving requests
+import time  # Monotonic clock for time-to-live expiry
+from collections import OrderedDict  # Keeps entries in least-recently-used order
+
+
+# Returned by get() on a miss, so that None can still be a cached value
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded cache with least-recently-used eviction and an
+    optional time-to-live per entry.
+
+    Hit, miss, eviction and invalidation counters are kept so the cache's
+    usefulness can be observed at runtime.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        """
+        Args:
+            maxsize (int): Maximum number of entries before the oldest is evicted.
+            ttl (float | None): Seconds an entry stays valid, or None for no expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for `key`, or MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        """Store `value` under `key`, evicting the least recently used entry if full."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry."""
+        with self._lock:
+            if self._data:
+                self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Counters and current size, suitable for returning from an MCP resource."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionedCache(LRUCache):
+    """
+    An LRUCache that empties itself whenever an external version number changes.
+
+    Used in front of SQLite with `PRAGMA data_version` as the version, so commits
+    made by other connections or other processes invalidate cached reads.
+
+    Asking for the version costs about as much as the lookup being cached, so it
+    is asked at most every `poll_interval` seconds; in between, hits are served
+    without touching the database. invalidate() (called after every write made
+    through this process) makes the next get() ask again straight away.
+    """
+
+    def __init__(self, version_fn, maxsize: int = 1024, ttl: float | None = None,
+                 poll_interval: float = 0.0):
+        """
+        Args:
+            version_fn (callable): Returns the current data version.
+            maxsize (int): Maximum number of entries.
+            ttl (float | None): Seconds an entry stays valid, or None for no expiry.
+            poll_interval (float): Seconds between version checks (0 checks on every get).
+        """
+        super().__init__(maxsize, ttl)
+        self._version_fn = version_fn
+        self._version = None
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+
+    @property
+    def version(self):
+        """The data version the cached entries belong to (None right after invalidate())."""
+        return self._version
+
+    def get(self, key):
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self._next_poll = now + self.poll_interval
+            version = self._version_fn()
+            if version != self._version:
+                super().invalidate()
+                self._version = version
+        return super().get(key)
+
+    def set(self, key, value, version=None):
+        """
+        Store `value`, unless the data changed since `version` was read.
+
+        Callers pass the `version` seen just before they queried the database, so a
+        result read before a concurrent write is never cached after that write.
+        """
+        if version is not None and version != self._version:
+            return
+        super().set(key, value)
+
+    def invalidate(self):
+        """Drop every entry and forget the version, so in-flight reads are not cached."""
+        super().invalidate()
+        self._version = None
+        self._next_poll = 0.0
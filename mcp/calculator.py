@@ -1,3 +1,8 @@
+# NumPy lets us run one operation over whole arrays in compiled loops instead of
+# one Python call (and one MCP round trip) per pair of numbers.
+import numpy as np
+
+
 class Calculator:
     """
     A simple calculator class that provides basic arithmetic operations:
@@ -75,3 +80,148 @@ class Calculator:
             float: The result of a raised to the power b (a ** b).
         """
         return a ** b
+
+
+# ---------------------- ARRAY-AWARE LAYER ----------------------
+
+class ArrayCalculator(Calculator):
+    """
+    Vectorized counterpart of Calculator.
+
+    Applies the same five operations element-wise to whole lists of numbers using
+    NumPy kernels. Instead of raising on the first bad element, invalid results
+    (division by zero, overflow to infinity, NaN) are reported per element so the
+    rest of the batch still comes back.
+    """
+
+    # Maps operation names to the NumPy kernel that implements them
+    KERNELS = {
+        "add": np.add,
+        "subtract": np.subtract,
+        "multiply": np.multiply,
+        "divide": np.divide,
+        "power": np.power,
+    }
+
+    def _as_arrays(self, a, b):
+        """Convert inputs to float64 arrays, broadcasting a single-element b."""
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        if a.ndim != 1 or b.ndim != 1:
+            raise ValueError("Batch inputs must be flat lists of numbers.")
+        if b.size == 1 and a.size != 1:
+            b = np.broadcast_to(b, a.shape)
+        if a.shape != b.shape:
+            raise ValueError(f"Length mismatch: a has {a.size} values, b has {b.size}.")
+        return a, b
+
+    def _kernel(self, op: str):
+        try:
+            return self.KERNELS[op]
+        except KeyError:
+            raise ValueError(f"Unknown operation '{op}'. Expected one of: {', '.join(self.KERNELS)}.")
+
+    def _apply(self, op: str, a: np.ndarray, b: np.ndarray, out: np.ndarray, errors: np.ndarray):
+        """Run one kernel into `out`, flagging zero denominators in `errors`."""
+        if op == "divide":
+            zero = b == 0
+            errors[zero] = 1
+            np.divide(a, b, out=out, where=~zero)
+        else:
+            self._kernel(op)(a, b, out=out)
+
+    def _package(self, out: np.ndarray, errors: np.ndarray) -> dict:
+        """Turn the result array and error codes into a JSON-friendly dict."""
+        # Anything not finite (overflow, NaN) that was not already flagged
+        errors[(errors == 0) & ~np.isfinite(out)] = 2
+        bad = np.flatnonzero(errors)
+        results = out.tolist()
+        messages = {1: "Cannot divide by zero.", 2: "Result is not a finite number."}
+        for i in bad.tolist():
+            results[i] = None
+        return {
+            "results": results,
+            "errors": [{"index": i, "error": messages[int(errors[i])]} for i in bad.tolist()],
+        }
+
+    def compute(self, op: str, a, b, out: np.ndarray | None = None, errors: np.ndarray | None = None):
+        """
+        Apply one operation element-wise and return the raw result and error codes.
+
+        Parameters:
+            op (str): One of "add", "subtract", "multiply", "divide", "power".
+            a, b: Operands (lists or float64 arrays; b may be a single value).
+            out, errors (np.ndarray | None): Optional arrays to write into, e.g. views
+                over shared memory, instead of allocating new ones.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: float64 results and int8 error codes.
+        """
+        self._kernel(op)
+        a, b = self._as_arrays(a, b)
+        out = np.zeros(a.shape, dtype=np.float64) if out is None else out
+        errors = np.zeros(a.shape, dtype=np.int8) if errors is None else errors
+        errors[:] = 0
+        with np.errstate(all="ignore"):
+            self._apply(op, a, b, out, errors)
+        return out, errors
+
+    def compute_mixed(self, ops, a, b, out: np.ndarray | None = None, errors: np.ndarray | None = None):
+        """
+        Apply a different operation to each pair and return the raw result and error codes.
+
+        Elements are grouped by operation so every group still runs as a single
+        vectorized kernel. Takes the same optional output arrays as compute().
+        """
+        a, b = self._as_arrays(a, b)
+        ops = np.asarray(ops, dtype=str)
+        if ops.shape != a.shape:
+            raise ValueError(f"Length mismatch: {ops.size} operations for {a.size} values.")
+        out = np.zeros(a.shape, dtype=np.float64) if out is None else out
+        errors = np.zeros(a.shape, dtype=np.int8) if errors is None else errors
+        errors[:] = 0
+        with np.errstate(all="ignore"):
+            for op in np.unique(ops).tolist():
+                self._kernel(op)
+                idx = np.flatnonzero(ops == op)
+                part = np.zeros(idx.size, dtype=np.float64)
+                part_errors = np.zeros(idx.size, dtype=np.int8)
+                self._apply(op, a[idx], b[idx], part, part_errors)
+                out[idx] = part
+                errors[idx] = part_errors
+        return out, errors
+
+    def batch(self, op: str, a: list[float], b: list[float]) -> dict:
+        """
+        Apply one operation element-wise to two lists of numbers.
+
+        Parameters:
+            op (str): One of "add", "subtract", "multiply", "divide", "power".
+            a (list[float]): Left-hand operands.
+            b (list[float]): Right-hand operands (same length as a, or a single value).
+
+        Returns:
+            dict: {"results": [...], "errors": [{"index": i, "error": msg}, ...]}
+                  where failed elements have a result of None.
+
+        Raises:
+            ValueError: If the operation is unknown or the lengths do not match.
+        """
+        return self._package(*self.compute(op, a, b))
+
+    def batch_mixed(self, ops: list[str], a: list[float], b: list[float]) -> dict:
+        """
+        Apply a different operation to each pair of numbers.
+
+        Parameters:
+            ops (list[str]): Operation name for each element.
+            a (list[float]): Left-hand operands.
+            b (list[float]): Right-hand operands.
+
+        Returns:
+            dict: Same shape as batch().
+
+        Raises:
+            ValueError: If an operation is unknown or the lengths do not match.
+        """
+        return self._package(*self.compute_mixed(ops, a, b))
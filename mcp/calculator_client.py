@@ -1,9 +1,6 @@
 # Import the MCP framework
 import mcp
 
-# Import the stdio-based client for interacting with MCP servers via subprocess/stdin/stdout
-from mcp.client.stdio import stdio_client
-
 # Parameters to define how to launch the calculator server process
 from mcp import StdioServerParameters
 
@@ -13,6 +10,24 @@ from agents import FunctionTool
 # JSON is used for parsing arguments into proper dictionaries
 import json
 
+# os locates the server module next to this file
+import os
+
+# asyncio is used to remember which event loop owns the shared session pool
+import asyncio
+
+# A pool of warm, long-lived MCP sessions so each tool call skips process start-up
+from session_pool import MCPSessionPool, open_transport
+
+# Turns results requested with compact=True back into their usual shape
+from compact import expand_result
+
+# Runs the independent tool calls of one agent turn concurrently, with a per-server cap
+from dispatcher import get_dispatcher
+
+# On-disk cache of the tool listing, so agent start-up does not spawn a server
+from tool_cache import ToolListCache
+
 # -------------------- MCP Server Launch Parameters --------------------
 
 # Define the server process launch configuration
@@ -24,17 +39,76 @@ params = StdioServerParameters(
     env=None
 )
 
+# URL of a long-lived calculator server started with an HTTP transport, e.g.
+# "python calculator_server.py --transport streamable-http" -> http://127.0.0.1:8000/mcp
+# When set, clients connect to it instead of launching their own server processes.
+SERVER_URL = os.environ.get("CALCULATOR_SERVER_URL")
+
+# What the pool and tool listing connect to: the shared HTTP server, or a stdio subprocess
+server = SERVER_URL or params
+
+# The server module whose contents key the tool listing cache
+SERVER_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calculator_server.py")
+
+# Cached tool listing for this server (see tool_cache.py)
+tool_cache = ToolListCache("calculator", server, SERVER_MODULE)
+
+# -------------------- Shared Session Pool --------------------
+
+# Number of warm calculator server processes kept open for tool calls
+POOL_SIZE = 4
+
+_pool = None
+_pool_loop = None
+
+
+async def get_calculator_pool():
+    """
+    Return the shared session pool for the calculator server, starting it on first use.
+
+    The pool is tied to the event loop that created it, so a new one is built if the
+    caller is running on a different loop (e.g. a second `asyncio.run()`).
+
+    Returns:
+        MCPSessionPool: A started pool of warm calculator sessions.
+    """
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = MCPSessionPool(server, size=POOL_SIZE)
+        _pool_loop = loop
+    pool = await _pool.start()
+    # A session is open now anyway, so check the cached tool listing against it
+    tool_cache.revalidate_in_background(pool.list_tools)
+    return pool
+
+
+async def close_calculator_pool():
+    """Shut down the shared calculator session pool and its server processes."""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+    _pool_loop = None
+
 # -------------------- List Available Tools from the Calculator Server --------------------
 
 async def list_calculator_tools():
     """
-    Connect to the calculator MCP server and retrieve the list of available tools.
+    Return the calculator server's tools, from the on-disk cache when it is current.
+
+    Only a cache miss (first run, or the server module changed) starts a server.
 
     Returns:
         List of Tool objects describing each callable operation.
     """
-    # Open connection to subprocess using stdio
-    async with stdio_client(params) as streams:
+    return await tool_cache.get(_fetch_calculator_tools)
+
+
+async def _fetch_calculator_tools():
+    """Connect to the calculator MCP server and retrieve the live list of tools."""
+    # Open connection to a stdio subprocess, or to the HTTP server if SERVER_URL is set
+    async with open_transport(server) as streams:
         # Create an MCP client session using those streams
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()              # Initialize handshake with server
@@ -43,22 +117,23 @@ async def list_calculator_tools():
 
 # -------------------- Invoke a Specific Calculator Tool --------------------
 
-async def call_calculator_tool(tool_name, tool_args):
+async def call_calculator_tool(tool_name, tool_args, expand=True):
     """
     Call a specific calculator tool by name with given arguments.
 
     Args:
         tool_name (str): The name of the tool (e.g., "add", "multiply").
         tool_args (dict): Arguments for the tool.
+        expand (bool): Expand a compact result (compact=True) into the shape the
+            tool returns without it. Pass False to keep the compact payload.
 
     Returns:
         The result returned by the tool.
     """
-    async with stdio_client(params) as streams:
-        async with mcp.ClientSession(*streams) as session:
-            await session.initialize()
-            result = await session.call_tool(tool_name, tool_args)  # Invoke tool
-            return result
+    # Borrow an idle warm session instead of launching a new server process
+    pool = await get_calculator_pool()
+    result = await pool.call_tool(tool_name, tool_args)  # Invoke tool
+    return expand_result(result) if expand else result
 
 # -------------------- Convert Calculator Tools into OpenAI-compatible Tool Wrappers --------------------
 
@@ -71,8 +146,12 @@ async def get_calculator_tools_openai():
         List of FunctionTool objects.
     """
     openai_tools = []
+    tools = await list_calculator_tools()
+
+    # Let the shared dispatcher route these tool names to the calculator server
+    get_dispatcher().add_routes("calculator", [tool.name for tool in tools])
 
-    for tool in await list_calculator_tools():
+    for tool in tools:
         # Use the tool's input schema directly, disallowing extra properties
         schema = {
             **tool.inputSchema, 
@@ -84,9 +163,11 @@ async def get_calculator_tools_openai():
             name=tool.name,                    # Tool name (e.g., "add")
             description=tool.description,      # Tool description from server
             params_json_schema=schema,         # JSON schema for tool inputs
-            # Lambda used to actually call the MCP tool when invoked from the agent
-            on_invoke_tool=lambda ctx, args, toolname=tool.name: 
-                call_calculator_tool(toolname, json.loads(args))
+            # Lambda used to actually call the MCP tool when invoked from the agent.
+            # The agent runs a turn's tool calls concurrently; the dispatcher caps
+            # how many of them reach the calculator server at once.
+            on_invoke_tool=lambda ctx, args, toolname=tool.name:
+                get_dispatcher().call(toolname, json.loads(args), server="calculator")
         )
 
         openai_tools.append(openai_tool)
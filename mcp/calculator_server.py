@@ -1,13 +1,94 @@
+import os  # Reads the memoization settings from the environment
+
 # Import the FastMCP server framework
 from mcp.server.fastmcp import FastMCP
 
-# Import the Calculator class that provides arithmetic methods
-from calculator import Calculator
+# Import the Calculator class that provides arithmetic methods,
+# plus its vectorized counterpart used by the batch tools
+from calculator import ArrayCalculator, Calculator
+
+# Safe, cached expression compiler so a whole formula costs one tool call
+from expression import evaluate as evaluate_expression
+
+# Header-plus-rows encoding for large results (opt-in with compact=True)
+from compact import dumps, encode_table
+
+# Per-tool call counts, latency histograms and payload sizes
+from metrics import instrument
+
+# Bounded LRU cache used to memoize the pure tools and resources
+from cache import MISSING, LRUCache
+
+# Command-line transport selection (stdio, sse or streamable-http)
+from serve import run_server
+
+# Optional worker processes for CPU-heavy batch and expression work
+from worker_pool import CalculatorWorkers
 
 # Initialize an MCP server instance with the identifier "calculator_server"
 # This name is used to identify the toolset when consumed by agentic frameworks
 mcp = FastMCP("calculator_server")
 
+# Time and count every tool registered below; exposes the metrics://tools resource
+instrument(mcp)
+
+# ---------------------- SHARED STATE AND MEMOIZATION ----------------------
+
+# The calculators hold no state, so one instance of each serves every call
+calculator = Calculator()
+array_calculator = ArrayCalculator()
+
+# Every calculator tool is a pure function of its arguments, and agents often repeat
+# the same sub-computations across turns, so results are memoized.
+#   CALCULATOR_MEMO_SIZE     maximum cached results (0 turns memoization off)
+#   CALCULATOR_MEMO_DISABLE  comma-separated tool names not to memoize, or "all"
+MEMO_SIZE = int(os.environ.get("CALCULATOR_MEMO_SIZE", "4096"))
+memo = LRUCache(maxsize=max(MEMO_SIZE, 1))
+memo_disabled = {name.strip() for name in os.environ.get("CALCULATOR_MEMO_DISABLE", "").split(",") if name.strip()}
+
+
+# Set CALCULATOR_WORKERS to run batch tools and multi-input expressions on that many
+# worker processes instead of this server's event loop (0, the default, keeps them here).
+#   CALCULATOR_MAX_PENDING  calls allowed running or queued before callers have to wait
+WORKERS = int(os.environ.get("CALCULATOR_WORKERS", "0"))
+workers = (
+    CalculatorWorkers(WORKERS, max_pending=int(os.environ.get("CALCULATOR_MAX_PENDING", "0")) or None)
+    if WORKERS > 0 else None
+)
+
+
+def set_memoization(tool: str, enabled: bool):
+    """Turn memoization on or off for one tool (or "all") at runtime."""
+    if enabled:
+        memo_disabled.discard(tool)
+    else:
+        memo_disabled.add(tool)
+
+
+def _memo_enabled(tool: str) -> bool:
+    return MEMO_SIZE > 0 and tool not in memo_disabled and "all" not in memo_disabled
+
+
+def _norm(x) -> str:
+    # 2 and 2.0 share an entry; float.hex() keeps 0.0 and -0.0 apart, which == would not
+    return float(x).hex()
+
+
+def memoized(tool: str, key: tuple, compute):
+    """
+    Return the cached result for (tool, key), calling `compute()` on a miss.
+
+    Exceptions (e.g. division by zero) are not cached.
+    """
+    if not _memo_enabled(tool):
+        return compute()
+    full_key = (tool, *key)
+    value = memo.get(full_key)
+    if value is MISSING:
+        value = compute()
+        memo.set(full_key, value)
+    return value
+
 # ---------------------- TOOL DEFINITIONS ----------------------
 
 @mcp.tool()
@@ -22,7 +103,7 @@ async def add(a: float, b: float) -> float:
     Returns:
         float: The sum of a and b.
     """
-    return Calculator().add(a, b)
+    return memoized("add", (_norm(a), _norm(b)), lambda: calculator.add(a, b))
 
 @mcp.tool()
 async def subtract(a: float, b: float) -> float:
@@ -36,7 +117,7 @@ async def subtract(a: float, b: float) -> float:
     Returns:
         float: The result of a - b.
     """
-    return Calculator().subtract(a, b)
+    return memoized("subtract", (_norm(a), _norm(b)), lambda: calculator.subtract(a, b))
 
 @mcp.tool()
 async def multiply(a: float, b: float) -> float:
@@ -50,7 +131,7 @@ async def multiply(a: float, b: float) -> float:
     Returns:
         float: The product of a and b.
     """
-    return Calculator().multiply(a, b)
+    return memoized("multiply", (_norm(a), _norm(b)), lambda: calculator.multiply(a, b))
 
 @mcp.tool()
 async def divide(a: float, b: float) -> float:
@@ -67,7 +148,7 @@ async def divide(a: float, b: float) -> float:
     Raises:
         ValueError: If b is zero (handled inside Calculator).
     """
-    return Calculator().divide(a, b)
+    return memoized("divide", (_norm(a), _norm(b)), lambda: calculator.divide(a, b))
 
 @mcp.tool()
 async def power(a: float, b: float) -> float:
@@ -81,7 +162,92 @@ async def power(a: float, b: float) -> float:
     Returns:
         float: The result of a ** b.
     """
-    return Calculator().power(a, b)
+    return memoized("power", (_norm(a), _norm(b)), lambda: calculator.power(a, b))
+
+
+# ---------------------- BATCH TOOLS ----------------------
+
+def compact_batch(result: dict) -> str:
+    """
+    Serialize a {"results", "errors"} batch result for compact=True: no whitespace
+    between the numbers, and the errors as a table with dictionary-encoded messages.
+    """
+    errors = encode_table(result["errors"], ("index", "error"), dictionary=("error",))
+    return dumps({"results": result["results"], "errors": errors})
+
+@mcp.tool()
+async def batch_eval(op: str, a: list[float], b: list[float], compact: bool = False) -> dict | str:
+    """
+    Asynchronous MCP tool that applies one operation to many pairs of numbers at once.
+
+    Use this instead of calling add/subtract/multiply/divide/power repeatedly.
+
+    Args:
+        op (str): One of "add", "subtract", "multiply", "divide", "power".
+        a (list[float]): Left-hand operands.
+        b (list[float]): Right-hand operands (same length as a, or a single value).
+        compact (bool): Return the result as JSON text without whitespace, with the
+            errors as {"columns": ["index", "error"], "rows": [[i, code], ...],
+            "dictionaries": {"error": [msg, ...]}}. Much smaller for large batches.
+
+    Returns:
+        dict: {"results": [...], "errors": [{"index": i, "error": msg}, ...]}.
+              Elements that failed (e.g. division by zero) have a result of null.
+    """
+    if workers is not None:
+        result = await workers.batch(op, a, b)
+    else:
+        result = array_calculator.batch(op, a, b)
+    return compact_batch(result) if compact else result
+
+@mcp.tool()
+async def batch_eval_mixed(ops: list[str], a: list[float], b: list[float], compact: bool = False) -> dict | str:
+    """
+    Asynchronous MCP tool that applies a different operation to each pair of numbers.
+
+    Args:
+        ops (list[str]): Operation name for each element ("add", "subtract", ...).
+        a (list[float]): Left-hand operands.
+        b (list[float]): Right-hand operands.
+        compact (bool): Return a compact result (see batch_eval).
+
+    Returns:
+        dict: {"results": [...], "errors": [{"index": i, "error": msg}, ...]}.
+    """
+    if workers is not None:
+        result = await workers.batch_mixed(ops, a, b)
+    else:
+        result = array_calculator.batch_mixed(ops, a, b)
+    return compact_batch(result) if compact else result
+
+@mcp.tool()
+async def evaluate(expression: str, variables: dict[str, float] | list[dict[str, float]] | None = None,
+                   compact: bool = False) -> dict | str:
+    """
+    Asynchronous MCP tool that evaluates a whole arithmetic expression in one call.
+
+    Supports numbers, variables, + - * / // % ** and parentheses, the constants
+    pi and e, and abs, sqrt, exp, log, sin, cos, tan, min, max.
+
+    Args:
+        expression (str): The expression, e.g. "2*(3+4)**2" or "price * (1 + rate)".
+        variables (dict | list[dict] | None): Values for the variables. Pass a list
+            of mappings to evaluate the same expression for many inputs at once.
+        compact (bool): With a list of mappings, return a compact result (see batch_eval).
+
+    Returns:
+        dict: {"result": value} for a single mapping, or
+              {"results": [...], "errors": [...]} when a list is given.
+    """
+    # A single mapping of variables is memoized; a list of mappings is already one vectorized call
+    if variables is None or isinstance(variables, dict):
+        key = (expression, *sorted((name, _norm(value)) for name, value in (variables or {}).items()))
+        return memoized("evaluate", key, lambda: evaluate_expression(expression, variables))
+    if workers is not None:
+        result = await workers.run(evaluate_expression, expression, variables)
+    else:
+        result = evaluate_expression(expression, variables)
+    return compact_batch(result) if compact else result
 
 
 #In MCP (Model Context Protocol), a resource is a piece of data that the client can request directly via a URI-like address.
@@ -93,10 +259,24 @@ async def get_square(number: float) -> float:
     Clients can fetch this by requesting:
     calculator://square/5
     """
-    return number * number
+    return memoized("square", (_norm(number),), lambda: number * number)
+
+
+@mcp.resource("calculator://cache/stats")
+async def memo_stats() -> dict:
+    """Hit/miss/eviction counters for the memoization cache and which tools bypass it."""
+    return {
+        **memo.stats(),
+        "enabled": MEMO_SIZE > 0,
+        "disabled_tools": sorted(memo_disabled),
+    }
 
 # ---------------------- SERVER ENTRY POINT ----------------------
 
+# Default port when serving over HTTP (see serve.py)
+HTTP_PORT = 8000
+
 if __name__ == "__main__":
-    # Start the MCP server using default transport ('stdio')
-    mcp.run()
+    # Start the MCP server; stdio by default, or e.g. --transport streamable-http
+    # to serve many clients from this one process
+    run_server(mcp, HTTP_PORT)
@@ -0,0 +1,113 @@
+import json  # Compact results travel as pre-serialized JSON text
+
+# FastMCP's own encoder, used to rebuild results exactly as an uncompacted tool would send them
+import pydantic_core
+
+from mcp.types import CallToolResult, TextContent
+
+
+# Marks a table in compact form; bumped if the layout ever changes
+COMPACT_VERSION = 1
+
+
+# ---------------------- ENCODING (server side) ----------------------
+
+def encode_table(rows: list, columns: tuple, dictionary: tuple = ()) -> dict:
+    """
+    Turn a list of row dicts into a header plus row arrays.
+
+    [{"id": 1, "role": "Analyst", ...}, ...] becomes
+    {"compact": 1, "columns": ["id", "role", ...], "rows": [[1, 0, ...], ...],
+     "dictionaries": {"role": ["Analyst", ...]}}
+
+    so the keys are sent once instead of once per row.
+
+    Args:
+        rows (list): Row dicts (or tuples already in `columns` order).
+        columns (tuple): Column names, in the order values appear in each row array.
+        dictionary (tuple): Columns whose values are replaced by an index into a
+            list of their distinct values, for repetitive strings such as role.
+
+    Returns:
+        dict: The compact table.
+    """
+    # Work column by column: each column is one list comprehension, which is
+    # much faster than touching every cell of every row in a Python loop
+    if rows and isinstance(rows[0], dict):
+        data = [[r[c] for r in rows] for c in columns]
+    elif rows:
+        data = [list(column) for column in zip(*rows)]
+    else:
+        data = [[] for _ in columns]
+    dictionaries = {}
+    for column in dictionary:
+        i = columns.index(column)
+        codes = {}
+        add = codes.setdefault   # Code of a value = position of its first appearance
+        data[i] = [add(value, len(codes)) for value in data[i]]
+        dictionaries[column] = list(codes)
+    table = {"compact": COMPACT_VERSION, "columns": list(columns), "rows": [list(r) for r in zip(*data)]}
+    if dictionaries:
+        table["dictionaries"] = dictionaries
+    return table
+
+
+def dumps(value) -> str:
+    """
+    Serialize a tool result without whitespace.
+
+    Tools return this string instead of the dict: FastMCP would otherwise encode
+    the result with indent=2, putting every array element on a line of its own.
+    Uses the same encoder FastMCP does, which is several times faster than json.dumps.
+    """
+    return pydantic_core.to_json(value, fallback=str).decode()
+
+
+# ---------------------- DECODING (client side) ----------------------
+
+def is_table(value) -> bool:
+    return isinstance(value, dict) and value.get("compact") == COMPACT_VERSION and "columns" in value
+
+
+def decode_table(table: dict) -> list:
+    """Turn a compact table back into a list of row dicts."""
+    columns = table["columns"]
+    lookups = [(columns.index(c), values) for c, values in table.get("dictionaries", {}).items()]
+    if lookups:
+        for row in table["rows"]:
+            for i, values in lookups:
+                row[i] = values[row[i]]
+    return [dict(zip(columns, row)) for row in table["rows"]]
+
+
+def expand(value):
+    """Replace every compact table inside a decoded JSON value with its list of dicts."""
+    if is_table(value):
+        return decode_table(value)
+    if isinstance(value, dict):
+        return {k: expand(v) for k, v in value.items()}
+    return value
+
+
+def expand_result(result: CallToolResult) -> CallToolResult:
+    """
+    Rewrite a CallToolResult holding a compact payload into the shape the tool
+    returns without compact=True, so callers cannot tell the difference.
+
+    Results without a compact payload are returned unchanged.
+    """
+    if result.isError or len(result.content) != 1 or not isinstance(result.content[0], TextContent):
+        return result
+    text = result.content[0].text
+    if '"compact":' not in text:
+        return result
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return result
+    expanded = expand(value)
+    # FastMCP sends a list as one content item per element, each JSON-encoded with indent=2
+    items = expanded if isinstance(expanded, list) else [expanded]
+    content = [TextContent(type="text", text=pydantic_core.to_json(item, fallback=str, indent=2).decode())
+               for item in items]
+    return result.model_copy(update={"content": content})
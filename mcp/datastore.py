@@ -1,34 +1,822 @@
+import csv
+import heapq
+import json
+import math
+import os
 import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np  # Column arrays for the columnar export format
+
+from cache import VersionedCache
+from sharding import create_shards, get_store, publish_store
+from sqlite_pool import ConnectionManager
+
+
+# One ConnectionManager per database file, shared by every EmployeeDB and Employee call
+_managers = {}
+_managers_lock = threading.Lock()
+
+# One read cache per database file, in front of Employee lookups
+READ_CACHE_SIZE = 4096
+READ_CACHE_TTL = 300.0
+# Seconds between data_version checks for commits from other processes; writes
+# made through this process invalidate the cache immediately
+READ_CACHE_POLL_INTERVAL = float(os.environ.get("EMPLOYEE_CACHE_POLL_MS", 50)) / 1000
+_read_caches = {}
+
+
+# ---------- Schema migrations ----------
+
+# Trigger bodies that keep role_stats in step with employees. Adding a row is a
+# constant-time upsert. Removing one recomputes min/max for that role through the
+# (role, salary) index, since a running minimum cannot be "un-applied".
+_ROLE_STATS_ADD = """
+            INSERT INTO role_stats (role, headcount, total_salary, min_salary, max_salary)
+            VALUES (new.role, 1, new.salary, new.salary, new.salary)
+            ON CONFLICT (role) DO UPDATE SET
+                headcount = headcount + 1,
+                total_salary = total_salary + excluded.total_salary,
+                min_salary = MIN(min_salary, excluded.min_salary),
+                max_salary = MAX(max_salary, excluded.max_salary);
+"""
+_ROLE_STATS_REMOVE = """
+            UPDATE role_stats SET
+                headcount = headcount - 1,
+                total_salary = total_salary - old.salary,
+                min_salary = COALESCE((SELECT MIN(salary) FROM employees WHERE role = old.role), 0),
+                max_salary = COALESCE((SELECT MAX(salary) FROM employees WHERE role = old.role), 0)
+            WHERE role = old.role;
+            DELETE FROM role_stats WHERE role = old.role AND headcount <= 0;
+"""
+
+# Keep employees_fts in step with employees. An external-content FTS5 table is told
+# about deletions with the special 'delete' command and the old column values.
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_employees_fts_insert AFTER INSERT ON employees
+    BEGIN
+        INSERT INTO employees_fts (rowid, name, role) VALUES (NEW.id, NEW.name, NEW.role);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_employees_fts_delete AFTER DELETE ON employees
+    BEGIN
+        INSERT INTO employees_fts (employees_fts, rowid, name, role) VALUES ('delete', OLD.id, OLD.name, OLD.role);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_employees_fts_update AFTER UPDATE OF name, role ON employees
+    BEGIN
+        INSERT INTO employees_fts (employees_fts, rowid, name, role) VALUES ('delete', OLD.id, OLD.name, OLD.role);
+        INSERT INTO employees_fts (rowid, name, role) VALUES (NEW.id, NEW.name, NEW.role);
+    END
+    """,
+]
+
+
+# Each entry upgrades the schema by one version. PRAGMA user_version records how
+# many have been applied, so every database is brought up to date exactly once.
+# Never edit an existing entry; append a new one instead.
+MIGRATIONS = [
+    # 1: the employees table
+    [
+        """
+        CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            role TEXT NOT NULL,
+            salary REAL NOT NULL
+        )
+        """,
+    ],
+    # 2: secondary indexes for search_employees (role + salary range, salary, name prefix)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_employees_role_salary ON employees (role, salary)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_salary ON employees (salary)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_name ON employees (name)",
+    ],
+    # 3: per-role summary table kept current by triggers, so aggregates are O(roles)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS role_stats (
+            role TEXT PRIMARY KEY,
+            headcount INTEGER NOT NULL,
+            total_salary REAL NOT NULL,
+            min_salary REAL NOT NULL,
+            max_salary REAL NOT NULL
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO role_stats (role, headcount, total_salary, min_salary, max_salary)
+        SELECT role, COUNT(*), SUM(salary), MIN(salary), MAX(salary) FROM employees GROUP BY role
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_role_stats_insert AFTER INSERT ON employees
+        BEGIN
+            {_ROLE_STATS_ADD}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_role_stats_delete AFTER DELETE ON employees
+        BEGIN
+            {_ROLE_STATS_REMOVE}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_role_stats_update AFTER UPDATE OF role, salary ON employees
+        BEGIN
+            {_ROLE_STATS_REMOVE}
+            {_ROLE_STATS_ADD}
+        END
+        """,
+    ],
+    # 4: full-text index over name and role for find_employees. External content
+    # (the text lives only in employees) and prefix indexes for 2- and 3-letter
+    # prefixes, so "shil*" is answered from the index without a scan.
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS employees_fts USING fts5(
+            name, role,
+            content='employees', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        "INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')",
+        *FTS_TRIGGERS,
+    ],
+    # 5: a counter bumped by every UPDATE or DELETE on employees. Appended rows are
+    # visible from MAX(id), but edits and deletions are not, so an in-memory replica
+    # compares this counter to notice them (see replica.py).
+    [
+        """
+        CREATE TABLE IF NOT EXISTS employees_changes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            changes INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO employees_changes (id, changes) VALUES (1, 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_employees_changes_update AFTER UPDATE ON employees
+        BEGIN
+            UPDATE employees_changes SET changes = changes + 1 WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_employees_changes_delete AFTER DELETE ON employees
+        BEGIN
+            UPDATE employees_changes SET changes = changes + 1 WHERE id = 1;
+        END
+        """,
+    ],
+    # 6: what bulk_add_employees(defer_indexes=True) dropped and still has to
+    # recreate, so a load that crashes part-way is repaired on the next open.
+    #   kind 'index': name is the index, sql its CREATE INDEX statement
+    #   kind 'fts':   sql is the highest ID already in employees_fts
+    [
+        """
+        CREATE TABLE IF NOT EXISTS deferred_restore (
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            sql TEXT NOT NULL,
+            PRIMARY KEY (kind, name)
+        )
+        """,
+    ],
+]
+
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Apply any migrations this database has not seen yet, and recreate indexes
+    left dropped by a bulk load that never finished.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        for sql in statements:
+            conn.execute(sql)
+        conn.execute(f"PRAGMA user_version = {number}")
+    restore_deferred(conn)
+
+
+def restore_deferred(conn: sqlite3.Connection):
+    """
+    Recreate everything listed in deferred_restore, in one transaction.
+
+    Safe to run while another bulk load is still going: its rows are indexed
+    either by the backfill here or by the triggers recreated here, and its own
+    restore then finds nothing left to do.
+    """
+    # Cheap enough to run on every open: a lookup in an almost always empty table
+    pending = conn.execute("SELECT kind, name, sql FROM deferred_restore").fetchall()
+    if not pending:
+        return
+    # The DELETE opens the transaction, so the CREATEs below commit together with it
+    conn.execute("DELETE FROM deferred_restore")
+    for kind, name, sql in pending:
+        if kind == "index":
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone():
+                conn.execute(sql)
+        elif kind == "fts":
+            # Index every row added while the triggers were off, then resume per-row syncing
+            conn.execute(
+                "INSERT INTO employees_fts (rowid, name, role) "
+                "SELECT id, name, role FROM employees WHERE id > ?",
+                (int(sql),),
+            )
+            for trigger in FTS_TRIGGERS:
+                conn.execute(trigger)
+
+
+def get_manager(db_file: str = "employees.db") -> ConnectionManager:
+    """Return the shared connection manager for a database file, creating it on first use."""
+    key = os.path.abspath(db_file)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_file, on_create=migrate)
+            _managers[key] = manager
+        return manager
+
+
+def get_read_cache(db_file: str = "employees.db") -> VersionedCache:
+    """
+    Return the read cache for a database file.
+
+    The cache empties itself when PRAGMA data_version changes, so commits from
+    other processes are picked up within READ_CACHE_POLL_INTERVAL seconds; writes
+    made here invalidate it directly. With an in-memory replica attached, it
+    follows the replica's version instead.
+    """
+    key = os.path.abspath(db_file)
+    # Every cached lookup comes through here, so the common case takes no lock
+    cache = _read_caches.get(key)
+    if cache is not None:
+        return cache
+    manager = get_manager(db_file)
+    with _managers_lock:
+        cache = _read_caches.get(key)
+        if cache is None:
+            cache = VersionedCache(manager.read_version, maxsize=READ_CACHE_SIZE, ttl=READ_CACHE_TTL,
+                                   poll_interval=READ_CACHE_POLL_INTERVAL)
+            _read_caches[key] = cache
+        return cache
+
+
+def invalidate_read_cache(db_file: str = "employees.db"):
+    """Drop cached reads for a database file after writing to it."""
+    key = os.path.abspath(db_file)
+    cache = _read_caches.get(key)
+    if cache is not None:
+        cache.invalidate()
+    # An in-memory replica picks up the new rows before its next read
+    manager = _managers.get(key)
+    if manager is not None and manager.replica is not None:
+        manager.replica.mark_stale()
+
+
+class BulkLoadError(ValueError):
+    """
+    A bulk load failed part-way. Chunks committed before the failure stay in the
+    database; `result` describes them like a successful load's return value.
+    """
+
+    def __init__(self, message: str, result: dict):
+        super().__init__(message)
+        self.result = result
+
 
 class EmployeeDB:
     def __init__(self, db_file: str = "employees.db"):
         self.db_file = db_file
+        self.manager = get_manager(db_file)
         self._create_table()
 
     def _create_table(self):
-        """Create employees table if it does not exist."""
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS employees (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    salary REAL NOT NULL
-                )
-            """)
-            conn.commit()
+        """Create employees table if it does not exist, and bring the schema up to date."""
+        with self.manager.writer() as conn:
+            migrate(conn)
 
     def add_employee(self, name: str, role: str, salary: float) -> int:
         """Insert a new employee and return the inserted ID."""
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO employees (name, role, salary)
-                VALUES (?, ?, ?)
-            """, (name, role, salary))
-            conn.commit()
-            return cursor.lastrowid
+        target, emp_id = self.db_file, None
+        store = get_store(self.db_file)
+        if store is not None:
+            emp_id = store.allocate_ids(1)[0]
+            target = store.shard_for(emp_id)
+        with get_manager(target).writer() as conn:
+            cursor = conn.execute("""
+                INSERT INTO employees (id, name, role, salary)
+                VALUES (?, ?, ?, ?)
+            """, (emp_id, name, role, salary))
+        invalidate_read_cache(target)
+        return cursor.lastrowid
+
+    def bulk_add_employees(self, employees: Iterable, chunk_size: int = 10000,
+                           defer_indexes: bool = False) -> dict:
+        """
+        Insert many employees quickly.
+
+        Rows are inserted with executemany() in chunks of `chunk_size`, one
+        transaction per chunk, instead of one transaction per row. Each chunk is
+        committed before the next is read, so a failure part-way through keeps the
+        chunks already loaded; BulkLoadError.result reports them.
+
+        Args:
+            employees (Iterable): Dicts with name/role/salary keys, or (name, role, salary)
+                tuples. May be a generator, e.g. load_employee_file(path).
+            chunk_size (int): Rows per transaction.
+            defer_indexes (bool): Drop secondary indexes and the full-text sync triggers
+                during the load and rebuild them once at the end, which is much faster
+                for large loads. What was dropped is recorded in the database, so if
+                the process dies mid-load it is recreated the next time the file is opened.
+
+        In a sharded database each chunk gets a block of global IDs and is split
+        over the shards, which are written in parallel, each in its own
+        transaction. A chunk is then not atomic: if one shard fails, the rows
+        the other shards committed stay, and BulkLoadError.result lists exactly
+        those IDs in "id_ranges".
+
+        Returns:
+            dict: {"inserted": n, "id_ranges": [[first, last], ...], "seconds": s, "rows_per_sec": r}
+
+        Raises:
+            BulkLoadError: If a row is invalid or an insert fails after the load started.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        start = time.perf_counter()
+        rows = _normalize_rows(employees)
+        inserted = 0
+        id_ranges = []
+
+        # A sharded database is loaded shard by shard in parallel; otherwise the
+        # only target is this file
+        store = get_store(self.db_file)
+        targets = [EmployeeDB(shard) for shard in store.shards] if store is not None else [self]
+        run = store.scatter if store is not None else (lambda fn, items: [fn(i) for i in items])
+        if defer_indexes:
+            run(lambda db: db._defer_indexes(), targets)
+        failure = None
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                if store is not None:
+                    # Each shard commits its part of the chunk on its own, so a
+                    # failing shard still leaves the other shards' rows committed:
+                    # they are recorded before the error is re-raised
+                    committed, error = self._insert_sharded(store, chunk)
+                    for first_id, last_id in _consecutive_runs(committed):
+                        _add_id_range(id_ranges, first_id, last_id)
+                    inserted += len(committed)
+                    if error is not None:
+                        raise error
+                    continue
+                with self.manager.writer() as conn:
+                    conn.executemany(
+                        "INSERT INTO employees (name, role, salary) VALUES (?, ?, ?)", chunk
+                    )
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                # A single writer inserting inside one transaction gets consecutive IDs
+                _add_id_range(id_ranges, last_id - len(chunk) + 1, last_id)
+                inserted += len(chunk)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            failure = e
+        finally:
+            for db in targets:
+                invalidate_read_cache(db.db_file)
+            if defer_indexes:
+                run(lambda db: db._restore_after_load(), targets)
+
+        seconds = time.perf_counter() - start
+        result = {
+            "inserted": inserted,
+            "id_ranges": id_ranges,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(inserted / seconds) if seconds > 0 else inserted,
+        }
+        if failure is not None:
+            raise BulkLoadError(f"Load stopped after {inserted} rows: {failure}", result) from failure
+        return result
+
+    @staticmethod
+    def _insert_sharded(store, chunk: list) -> tuple:
+        """
+        Give `chunk` consecutive global IDs and insert each row into its shard.
+
+        Returns:
+            tuple: (sorted IDs committed, first exception or None), see _insert_into_shards.
+        """
+        ids = store.allocate_ids(len(chunk))
+        return _insert_into_shards(store, [(emp_id, *row) for emp_id, row in zip(ids, chunk)])
+
+    def _restore_after_load(self):
+        """Recreate what bulk_add_employees(defer_indexes=True) dropped."""
+        with self.manager.writer() as conn:
+            restore_deferred(conn)
+
+    def _defer_indexes(self):
+        """
+        Drop every explicit index on employees and stop syncing employees_fts row by
+        row; bulk_add_employees backfills it instead.
+
+        What is dropped is recorded in deferred_restore in the same transaction
+        (the INSERTs come first and open it), so a crash can never lose it.
+        """
+        with self.manager.writer() as conn:
+            indexes = conn.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = 'employees' AND sql IS NOT NULL"
+            ).fetchall()
+            # OR IGNORE keeps the entries of a load that is already running, whose
+            # starting point for the full-text backfill is the earlier one
+            conn.execute(
+                "INSERT OR IGNORE INTO deferred_restore (kind, name, sql) "
+                "SELECT 'fts', 'employees_fts', COALESCE(MAX(id), 0) FROM employees"
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO deferred_restore (kind, name, sql) VALUES ('index', ?, ?)", indexes
+            )
+            for name, _ in indexes:
+                conn.execute(f'DROP INDEX "{name}"')
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_employees_fts_%'"
+            ).fetchall():
+                conn.execute(f'DROP TRIGGER "{name}"')
+
+
+# ---------- Bulk loading helpers ----------
+
+def _add_id_range(id_ranges: list, first_id: int, last_id: int):
+    """Append [first_id, last_id], merging it into the last range if they touch."""
+    if id_ranges and id_ranges[-1][1] == first_id - 1:
+        id_ranges[-1][1] = last_id
+    else:
+        id_ranges.append([first_id, last_id])
+
+
+def _consecutive_runs(ids: list) -> Iterator[tuple]:
+    """Yield (first, last) for each run of consecutive values in sorted `ids`."""
+    start = prev = None
+    for emp_id in ids:
+        if prev is not None and emp_id == prev + 1:
+            prev = emp_id
+            continue
+        if start is not None:
+            yield start, prev
+        start = prev = emp_id
+    if start is not None:
+        yield start, prev
+
+
+def _normalize_rows(employees: Iterable) -> Iterator[tuple]:
+    """Yield (name, role, salary) tuples, validating each input row."""
+    for n, row in enumerate(employees, start=1):
+        try:
+            if isinstance(row, dict):
+                name, role, salary = row["name"], row["role"], row["salary"]
+            else:
+                name, role, salary = row
+            name, role, salary = str(name), str(role), float(salary)
+        except KeyError as e:
+            raise ValueError(f"Row {n} is missing the {e.args[0]!r} field.")
+        except (TypeError, ValueError):
+            # The row itself is not echoed back: it may come from a file the caller cannot read
+            raise ValueError(f"Row {n} is not a valid employee: it needs a name, a role and a numeric salary.")
+        if not name or not role:
+            raise ValueError(f"Row {n} has an empty name or role.")
+        yield name, role, salary
+
+
+def import_dir(db_file: str = "employees.db") -> str:
+    """Directory bulk_add_employees(path=...) may read: EMPLOYEE_IMPORT_DIR, or "imports" next to the database."""
+    return os.environ.get("EMPLOYEE_IMPORT_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(db_file)), "imports"
+    )
+
+
+# Extensions load_employee_file understands
+IMPORT_EXTENSIONS = (".csv", ".ndjson", ".jsonl")
+
+
+def load_employee_file(path: str) -> Iterator[dict]:
+    """
+    Stream employee rows from a CSV (with a name,role,salary header) or NDJSON file.
+
+    The format is chosen by extension: .csv, or .ndjson/.jsonl.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif ext in (".ndjson", ".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported file type '{ext}'. Use .csv, .ndjson or .jsonl.")
+
+
+# ---------- Sharding ----------
+
+def _insert_into_shards(store, rows: list) -> tuple:
+    """
+    Insert (id, name, role, salary) rows into the shards owning their IDs, in parallel.
+
+    Every shard commits its rows in a transaction of its own, so the rows are not
+    inserted atomically: if one shard fails, the others' rows stay committed.
+
+    Returns:
+        tuple: (sorted IDs that were committed, the first exception raised or None)
+    """
+    by_shard = defaultdict(list)
+    for row in rows:
+        by_shard[store.shard_for(row[0])].append(row)
+
+    def insert(item):
+        shard, shard_rows = item
+        try:
+            with get_manager(shard).writer() as conn:
+                conn.executemany(
+                    "INSERT INTO employees (id, name, role, salary) VALUES (?, ?, ?, ?)", shard_rows
+                )
+        except (sqlite3.Error, OSError) as e:
+            return [], e
+        finally:
+            invalidate_read_cache(shard)
+        return [row[0] for row in shard_rows], None
+
+    outcomes = store.scatter(insert, by_shard.items())
+    errors = [error for _, error in outcomes if error is not None]
+    return sorted(chain.from_iterable(ids for ids, _ in outcomes)), (errors[0] if errors else None)
+
+
+def shard_database(db_file: str = "employees.db", shards: int = 4, chunk_size: int = 50_000) -> dict:
+    """
+    Split an existing employees database into `shards` files (see sharding.py).
+
+    Every row keeps its ID. The shards are filled with their indexes deferred and
+    only then is the manifest written, so until this returns every reader still
+    sees the original file. Afterwards that file is left in place but no longer
+    used by this code.
+
+    Args:
+        db_file (str): The database to split.
+        shards (int): Number of shard files.
+        chunk_size (int): Rows read from the original file per round.
+
+    Returns:
+        dict: {"shards": [paths], "rows": n, "seconds": s}
+    """
+    start = time.perf_counter()
+    EmployeeDB(db_file)   # Make sure the original is migrated before it is read
+    with get_manager(db_file).reader() as conn:
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM employees").fetchone()[0]
+    store = create_shards(db_file, shards, next_id=max_id + 1, publish=False)
+
+    targets = [EmployeeDB(shard) for shard in store.shards]
+    store.scatter(lambda db: db._defer_indexes(), targets)
+    rows = 0
+    try:
+        for batch in _iter_batches(db_file, chunk_size):
+            # The manifest is not published yet, so a failure leaves nothing visible to undo
+            _, error = _insert_into_shards(store, batch)
+            if error is not None:
+                raise error
+            rows += len(batch)
+    finally:
+        store.scatter(lambda db: db._restore_after_load(), targets)
+    publish_store(store)
+    return {"shards": store.shards, "rows": rows, "seconds": round(time.perf_counter() - start, 3)}
+
+
+# ---------- Export ----------
+
+# Supported export formats and the extension of their files
+EXPORT_FORMATS = {"ndjson": ".ndjson", "csv": ".csv", "columnar": ".npz"}
+
+# Rows fetched from SQLite per round trip while exporting
+EXPORT_BATCH_SIZE = 10_000
+
+
+def export_dir(db_file: str = "employees.db") -> str:
+    """Directory exports are written to: EMPLOYEE_EXPORT_DIR, or "exports" next to the database."""
+    return os.environ.get("EMPLOYEE_EXPORT_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(db_file)), "exports"
+    )
+
+
+def _iter_batches(db_file: str, batch_size: int) -> Iterator[list]:
+    """
+    Yield every employee row in ID order, `batch_size` rows at a time.
+
+    Each batch is its own short keyset query ("id > last"), so an export never
+    holds a read transaction open for its whole duration, which would stop WAL
+    checkpoints while it runs.
+    """
+    store = get_store(db_file)
+    if store is not None:
+        # Merge the shards' ID-ordered streams (rows sort by their leading id)
+        rows = heapq.merge(*(chain.from_iterable(_iter_batches(shard, batch_size)) for shard in store.shards))
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    manager = get_manager(db_file)
+    last_id = 0
+    while True:
+        with manager.reader() as conn:
+            rows = conn.execute(
+                "SELECT id, name, role, salary FROM employees WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8", newline="\n")
+        self.roles = {}   # Few distinct roles, so their JSON encoding is reused
+
+    def write(self, rows: list):
+        dumps, roles = json.dumps, self.roles
+        lines = []
+        for id_, name, role, salary in rows:
+            role_json = roles.get(role)
+            if role_json is None:
+                role_json = roles[role] = dumps(role)
+            salary_json = repr(salary) if math.isfinite(salary) else "null"
+            lines.append(f'{{"id":{id_},"name":{dumps(name)},"role":{role_json},"salary":{salary_json}}}\n')
+        self.f.write("".join(lines))
+
+    def close(self):
+        self.f.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(["id", "name", "role", "salary"])
+
+    def write(self, rows: list):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+
+class _ColumnarWriter:
+    """
+    Buffers one file's rows as columns and writes them as a NumPy .npz archive:
+
+        id           int64[n]
+        salary       float64[n]
+        role_codes   uint16[n]   index into `roles` (dictionary encoding); uint32
+                                 once a file has more than 65,536 distinct roles
+        roles        str[k]
+        name_offsets int64[n+1]  name i is name_bytes[name_offsets[i]:name_offsets[i+1]]
+        name_bytes   uint8[...]  UTF-8 names, concatenated
+
+    Read it back with read_columnar_export().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids, self.salaries, self.codes, self.names = [], [], [], []
+        self.roles = {}
+
+    def write(self, rows: list):
+        roles = self.roles
+        ids, names, role_col, salaries = zip(*rows)
+        self.ids.append(np.fromiter(ids, dtype=np.int64, count=len(rows)))
+        self.salaries.append(np.fromiter(salaries, dtype=np.float64, count=len(rows)))
+        codes = [roles.setdefault(r, len(roles)) for r in role_col]
+        # Chosen after coding the batch, so its largest code always fits. np.concatenate
+        # promotes earlier uint16 batches once a later one needs uint32.
+        dtype = np.uint16 if len(roles) <= 1 << 16 else np.uint32
+        self.codes.append(np.array(codes, dtype=dtype))
+        self.names.extend(n.encode("utf-8") for n in names)
+
+    def close(self):
+        lengths = np.fromiter((len(n) for n in self.names), dtype=np.int64, count=len(self.names))
+        offsets = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        empty = np.zeros(0)
+        with open(self.path, "wb") as f:
+            np.savez(
+                f,
+                id=np.concatenate(self.ids) if self.ids else empty.astype(np.int64),
+                salary=np.concatenate(self.salaries) if self.salaries else empty,
+                role_codes=np.concatenate(self.codes) if self.codes else empty.astype(np.uint16),
+                roles=np.array(list(self.roles), dtype=str),
+                name_offsets=offsets,
+                name_bytes=np.frombuffer(b"".join(self.names), dtype=np.uint8),
+            )
+
+
+_WRITERS = {"ndjson": _NdjsonWriter, "csv": _CsvWriter, "columnar": _ColumnarWriter}
+
+
+def export_employees(db_file: str = "employees.db", fmt: str = "ndjson", out_dir: str | None = None,
+                     rows_per_file: int = 1_000_000, batch_size: int = EXPORT_BATCH_SIZE) -> dict:
+    """
+    Stream the employees table to one or more files.
+
+    Rows are read in ID order `batch_size` at a time and written straight out,
+    so memory use depends on the batch size, not the table size. The columnar
+    format buffers one output file's columns, so `rows_per_file` bounds it.
+    Every file is written under a temporary name and renamed once complete,
+    so a reader never sees a half-written chunk.
+
+    Args:
+        db_file (str): Path to the SQLite database file.
+        fmt (str): "ndjson", "csv" or "columnar" (NumPy .npz, see _ColumnarWriter).
+        out_dir (str | None): Output directory (default: export_dir(db_file)).
+        rows_per_file (int): Rows per output file before starting the next one.
+        batch_size (int): Rows fetched from SQLite per round trip.
+
+    Returns:
+        dict: {"format", "rows", "files": [{"path", "uri", "rows", "bytes"}], "seconds"}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+    if rows_per_file < 1 or batch_size < 1:
+        raise ValueError("rows_per_file and batch_size must be at least 1.")
+    batch_size = min(batch_size, rows_per_file)
+
+    start = time.perf_counter()
+    out_dir = out_dir or export_dir(db_file)
+    os.makedirs(out_dir, exist_ok=True)
+    stem = f"employees-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    files = []
+    writer, path, in_file = None, None, 0
+
+    def finish():
+        writer.close()
+        final = path[:-len(".part")]
+        os.replace(path, final)
+        files.append({"path": final, "uri": Path(final).as_uri(), "rows": in_file,
+                      "bytes": os.path.getsize(final)})
+
+    try:
+        for rows in _iter_batches(db_file, batch_size):
+            while rows:
+                if writer is None:
+                    path = os.path.join(out_dir, f"{stem}-{len(files):05d}{EXPORT_FORMATS[fmt]}.part")
+                    writer, in_file = _WRITERS[fmt](path), 0
+                take = rows[:rows_per_file - in_file]
+                rows = rows[len(take):]
+                writer.write(take)
+                in_file += len(take)
+                if in_file == rows_per_file:
+                    finish()
+                    writer = None
+        if writer is not None:
+            finish()
+            writer = None
+    finally:
+        if writer is not None:
+            # Failed part-way: remove the incomplete chunk, keep the finished ones
+            writer.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "format": fmt,
+        "rows": sum(f["rows"] for f in files),
+        "files": files,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def read_columnar_export(path: str) -> Iterator[dict]:
+    """Yield the employees stored in a columnar (.npz) export file as dicts."""
+    with np.load(path) as data:
+        ids, salaries = data["id"].tolist(), data["salary"].tolist()
+        roles = data["roles"].tolist()
+        codes = data["role_codes"].tolist()
+        offsets = data["name_offsets"].tolist()
+        name_bytes = data["name_bytes"].tobytes()
+    for i, id_ in enumerate(ids):
+        name = name_bytes[offsets[i]:offsets[i + 1]].decode("utf-8")
+        yield {"id": id_, "name": name, "role": roles[codes[i]], "salary": salaries[i]}
 
 
 # ---------- Example usage ----------
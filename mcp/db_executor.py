@@ -0,0 +1,102 @@
+import asyncio  # The MCP server runs on an asyncio event loop
+import contextvars  # Carry request-scoped context into worker threads
+from concurrent.futures import ThreadPoolExecutor  # Where blocking sqlite3 calls actually run
+from dataclasses import dataclass
+
+
+@dataclass
+class Lane:
+    """Settings for one class of database work."""
+    workers: int            # Threads dedicated to this lane
+    max_pending: int        # Calls allowed in flight or queued before new ones wait
+    timeout: float | None   # Seconds before the caller gets a timeout error
+    # Writes cannot be called off once a thread has started them, and a caller told
+    # "timed out" would retry and write twice. For such lanes the timeout only
+    # covers waiting for a slot; once submitted, the caller waits for the outcome.
+    writes: bool = False
+
+
+# Point lookups, full scans and writes each get their own threads, so a slow
+# get_all_employees can only ever occupy the scan threads and never delays a
+# get_employee_by_id. Open reader connections are bounded separately, by the
+# ConnectionManager's pool (max_readers).
+DEFAULT_LANES = {
+    "point": Lane(workers=6, max_pending=64, timeout=5.0),
+    "scan": Lane(workers=2, max_pending=8, timeout=30.0),
+    "write": Lane(workers=1, max_pending=64, timeout=10.0, writes=True),
+}
+
+
+# Marks "use the lane's timeout", so that None can mean "no timeout"
+_LANE_DEFAULT = object()
+
+
+class DBExecutor:
+    """
+    Runs blocking database calls on bounded thread pools, off the event loop.
+
+    Each lane has its own thread pool, a limit on how many calls may be in
+    flight, and a default timeout. When a call times out the caller gets an
+    error right away. The worker thread still finishes its query, because
+    sqlite3 calls cannot be cancelled from another thread. Its lane slot is only
+    released when it does, so timed-out work still counts against the limit.
+    On write lanes only the wait for a slot can time out (see Lane.writes), so a
+    timeout there always means nothing was written.
+    """
+
+    def __init__(self, lanes: dict | None = None):
+        self.lanes = dict(lanes or DEFAULT_LANES)
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=lane.workers, thread_name_prefix=f"db-{name}")
+            for name, lane in self.lanes.items()
+        }
+        self._slots = {}   # Created lazily, so they bind to the running event loop
+
+    def _slot(self, lane: str) -> asyncio.Semaphore:
+        if lane not in self._slots:
+            self._slots[lane] = asyncio.Semaphore(self.lanes[lane].max_pending)
+        return self._slots[lane]
+
+    async def run(self, fn, *args, lane: str = "point", timeout=_LANE_DEFAULT):
+        """
+        Run `fn(*args)` on the given lane's thread pool and return its result.
+
+        Args:
+            fn (callable): Blocking function to call.
+            lane (str): "point", "scan" or "write".
+            timeout (float | None): Overrides the lane's default timeout; None waits forever.
+
+        Raises:
+            TimeoutError: If the call (including time spent queued) takes too long.
+                On a write lane, only if no slot became free in time; the call
+                has then not been started.
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown lane '{lane}'.")
+        if timeout is _LANE_DEFAULT:
+            timeout = self.lanes[lane].timeout
+        slot = self._slot(lane)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        try:
+            await asyncio.wait_for(slot.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Database is busy: no '{lane}' slot became free within {timeout}s.")
+
+        # Copy the caller's context so context variables (e.g. metrics) work in the thread
+        ctx = contextvars.copy_context()
+        future = loop.run_in_executor(self._pools[lane], ctx.run, fn, *args)
+        future.add_done_callback(lambda _: slot.release())
+        remaining = max(deadline - loop.time(), 0) if deadline is not None else None
+        if self.lanes[lane].writes:
+            remaining = None   # Started writes always run to completion; report their real outcome
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), remaining)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Database call timed out after {timeout}s.")
+
+    def shutdown(self):
+        """Stop every worker thread once its current call finishes."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
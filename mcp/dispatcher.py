@@ -0,0 +1,151 @@
+# asyncio runs the independent tool calls of one turn at the same time
+import asyncio
+
+# JSON is used to parse OpenAI-style tool call arguments
+import json
+
+from dataclasses import dataclass, field
+
+
+# -------------------- Tool Call Description --------------------
+
+@dataclass
+class ToolCall:
+    """One tool call requested by the model."""
+    tool: str                                  # Tool name, e.g. "get_employee_by_id"
+    args: dict = field(default_factory=dict)   # Tool arguments
+    server: str | None = None                  # Server name; looked up from the tool name if None
+
+
+# -------------------- Dispatcher --------------------
+
+class ToolDispatcher:
+    """
+    Runs the independent tool calls from one model turn concurrently.
+
+    Each registered server has an async `caller(tool_name, tool_args)` (normally
+    backed by a pool of warm sessions) and a concurrency cap, so a turn asking
+    for twenty lookups cannot flood one server. Results come back in the same
+    order as the calls, and a failing call does not cancel the others, so a
+    turn costs roughly as long as its slowest call.
+
+    Usage:
+        dispatcher = ToolDispatcher()
+        dispatcher.register("calculator", call_calculator_tool, limit=4, tools=["add", "divide"])
+        results = await dispatcher.dispatch([ToolCall("add", {"a": 1, "b": 2}),
+                                             ToolCall("divide", {"a": 1, "b": 4})])
+    """
+
+    def __init__(self):
+        self._callers = {}   # server name -> async caller(tool_name, tool_args)
+        self._limits = {}    # server name -> maximum calls in flight
+        self._routes = {}    # tool name -> server name
+        self._slots = {}     # server name -> asyncio.Semaphore for the current loop
+        self._loop = None
+
+    def register(self, server: str, caller, limit: int = 4, tools=None):
+        """
+        Add a server the dispatcher can send calls to.
+
+        Args:
+            server (str): Name used in ToolCall.server.
+            caller (callable): `async caller(tool_name, tool_args)` returning the tool result.
+            limit (int): Maximum concurrent calls to this server.
+            tools (iterable[str] | None): Tool names to route to this server by default.
+        """
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1.")
+        self._callers[server] = caller
+        self._limits[server] = limit
+        self._slots.pop(server, None)
+        if tools:
+            self.add_routes(server, tools)
+
+    def add_routes(self, server: str, tools):
+        """Route calls to the given tool names to `server` when ToolCall.server is not set."""
+        for name in tools:
+            self._routes[name] = server
+
+    def _slot(self, server: str) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; rebuild them after a new asyncio.run()
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._slots = {}
+            self._loop = loop
+        if server not in self._slots:
+            self._slots[server] = asyncio.Semaphore(self._limits[server])
+        return self._slots[server]
+
+    def _resolve(self, call: ToolCall) -> str:
+        server = call.server or self._routes.get(call.tool)
+        if server is None:
+            raise LookupError(f"No server registered for tool '{call.tool}'.")
+        if server not in self._callers:
+            raise LookupError(f"Unknown server '{server}'.")
+        return server
+
+    async def call(self, tool: str, args: dict, server: str | None = None):
+        """Run one tool call, waiting for a free slot on its server."""
+        call = ToolCall(tool, args, server)
+        server = self._resolve(call)
+        async with self._slot(server):
+            return await self._callers[server](call.tool, call.args)
+
+    async def dispatch(self, calls, return_exceptions: bool = True) -> list:
+        """
+        Run all `calls` concurrently and return their results in the same order.
+
+        Args:
+            calls (iterable[ToolCall]): The tool calls of one turn.
+            return_exceptions (bool): Put a failing call's exception in its result slot
+                instead of raising it (the other calls still run to completion).
+
+        Returns:
+            list: One result (or exception) per call.
+        """
+        return await asyncio.gather(
+            *(self.call(c.tool, c.args, c.server) for c in calls),
+            return_exceptions=return_exceptions,
+        )
+
+    async def dispatch_openai(self, tool_calls, return_exceptions: bool = True) -> list:
+        """
+        Like dispatch(), for the `tool_calls` of an OpenAI chat completion message.
+
+        Accepts the SDK objects (`call.function.name`, `call.function.arguments`) or
+        the equivalent dicts.
+        """
+        calls = []
+        for tc in tool_calls:
+            fn = tc["function"] if isinstance(tc, dict) else tc.function
+            name = fn["name"] if isinstance(fn, dict) else fn.name
+            arguments = fn["arguments"] if isinstance(fn, dict) else fn.arguments
+            calls.append(ToolCall(name, json.loads(arguments or "{}")))
+        return await self.dispatch(calls, return_exceptions)
+
+
+# -------------------- Shared Dispatcher for the Bundled Servers --------------------
+
+_dispatcher = None
+
+
+def get_dispatcher() -> ToolDispatcher:
+    """
+    Return the process-wide dispatcher with the calculator and employee servers registered.
+
+    Each server's cap equals its session pool size, since a pooled session serves
+    one call at a time.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        # Imported here because the client modules use this dispatcher for their tool wrappers
+        import calculator_client
+        import employee_client
+
+        dispatcher = ToolDispatcher()
+        dispatcher.register("calculator", calculator_client.call_calculator_tool,
+                            limit=calculator_client.POOL_SIZE)
+        dispatcher.register("employee", employee_client.call_employee_tool,
+                            limit=employee_client.POOL_SIZE)
+        _dispatcher = dispatcher
+    return _dispatcher
@@ -1,7 +1,96 @@
 import sqlite3  # Standard Python library for interacting with SQLite databases
-from typing import List, Optional  # Type hints for better code readability and validation
+import base64  # Encodes pagination cursors as opaque, URL-safe strings
+import re  # Splits free-text search queries into words
+import heapq  # k-way merge of per-shard results that are already sorted
+import sys  # sys.maxunicode, the highest character a name prefix can end in
+from collections import defaultdict
+from contextlib import ExitStack  # Holds one snapshot per shard for the length of a query
+from operator import attrgetter, itemgetter
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple  # Type hints for better code readability and validation
 from pydantic import BaseModel  # Base class from Pydantic for data validation and parsing
 
+# Shared, pooled connections (WAL mode, tuned pragmas, schema created once per file)
+# and the read cache that sits in front of get_by_id / get_all
+from cache import MISSING
+from datastore import get_manager, get_read_cache, invalidate_read_cache
+
+# Routes calls for a sharded database to its shard files (see sharding.py)
+from sharding import get_store
+
+
+# get_all results larger than this are not cached, so one big table cannot fill memory
+MAX_CACHED_ROWS = 10000
+
+
+# Column list shared by every SELECT so row tuples always have the same layout
+COLUMNS = "id, name, role, salary"
+
+# bm25() column weights for employees_fts (name, role): a name hit outranks a role hit
+FTS_WEIGHTS = (2.0, 1.0)
+
+# Free-text queries longer than this many words are cut short
+MAX_QUERY_TERMS = 8
+
+
+def encode_cursor(last_id: int) -> str:
+    """Turn the last ID of a page into an opaque cursor string for the next request."""
+    return base64.urlsafe_b64encode(f"emp:{last_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Recover the last-seen ID from a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        prefix, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "emp":
+            raise ValueError(prefix)
+        return int(last_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
+
+
+def _sort_key(column: str, raw: bool):
+    """Key function reading `column` from result dicts (raw=True) or Employee objects."""
+    return itemgetter(column) if raw else attrgetter(column)
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    The smallest string greater than every string starting with `prefix`, or None
+    if there is none (the prefix is all U+10FFFF). SQLite compares text as UTF-8
+    bytes, which orders it by code point, so bumping the last character works.
+    """
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    following = ord(stripped[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000   # Surrogates cannot be encoded; skip to the next real character
+    return stripped[:-1] + chr(following)
+
+
+def row_to_dict(r: tuple) -> dict:
+    """
+    Turn an (id, name, role, salary) row straight into a plain dict.
+
+    This is the read fast path: rows come from our own table with a NOT NULL
+    schema, so re-validating them with Pydantic on the way out only costs time.
+    """
+    return {"id": r[0], "name": r[1], "role": r[2], "salary": r[3]}
+
+
+# Validates the fields of a new employee before it is written. The server's
+# read tools skip models entirely and return row_to_dict() results.
+class NewEmployee(BaseModel):
+    name: str
+    role: str
+    salary: float
+
 
 # Define an Employee model that represents one row in the "employees" table.
 # Inherits from Pydantic's BaseModel, so it automatically validates types and structures.
@@ -21,69 +110,498 @@ class Employee(BaseModel):
             db_file (str): Path to the SQLite database file. Defaults to "employees.db".
 
         Returns:
-            Employee object if found, otherwise None.
-        """
-        
-        # Open a connection to the SQLite database
-        conn = sqlite3.connect(db_file)
-        
-        # Create a cursor object to execute SQL queries
-        cursor = conn.cursor()
-        
-        # Execute a parameterized SQL query to prevent SQL injection.
-        # The `?` placeholder ensures safe substitution of `emp_id`.
-        cursor.execute(
-            "SELECT id, name, role, salary FROM employees WHERE id = ?", 
-            (emp_id,)  # Tuple is required here
-        )
-        
-        # Fetch the first matching row (or None if no match)
-        row = cursor.fetchone()
-        
-        # Close the database connection to free resources
-        conn.close()
-
-        # If a record is found, create an Employee instance from the row data
-        if row:
-            return cls(id=row[0], name=row[1], role=row[2], salary=row[3])
-        
-        # If no record found, return None
-        return None
+            Employee object if found, otherwise None. Results come from a shared
+            cache, so treat the returned object as read-only.
+        """
+        # In a sharded database only the shard that owns the ID is asked
+        store = get_store(db_file)
+        if store is not None:
+            return cls.get_by_id(emp_id, store.shard_for(emp_id))
+
+        # Serve repeated lookups from the read cache (emptied on any write)
+        cache = get_read_cache(db_file)
+        cached = cache.get(("id", emp_id))
+        if cached is not MISSING:
+            return cached
+        version = cache.version
+
+        # Borrow this thread's pooled read connection (opened once, reused across calls)
+        with get_manager(db_file).reader() as conn:
+            # Execute a parameterized SQL query to prevent SQL injection.
+            # The `?` placeholder ensures safe substitution of `emp_id`.
+            cursor = conn.execute(
+                f"SELECT {COLUMNS} FROM employees WHERE id = ?", 
+                (emp_id,)  # Tuple is required here
+            )
+            
+            # Fetch the first matching row (or None if no match)
+            row = cursor.fetchone()
+
+        # If a record is found, create an Employee instance from the row data,
+        # otherwise remember that the ID does not exist (None)
+        emp = cls(id=row[0], name=row[1], role=row[2], salary=row[3]) if row else None
+        cache.set(("id", emp_id), emp, version)
+        return emp
 
 
     @classmethod
-    def get_all(cls, db_file: str = "employees.db") -> List["Employee"]:
+    def _from_rows(cls, rows: List[tuple], raw: bool) -> list:
+        """Convert row tuples to plain dicts (raw=True) or Employee objects."""
+        if raw:
+            return [row_to_dict(r) for r in rows]
+        return [cls(id=r[0], name=r[1], role=r[2], salary=r[3]) for r in rows]
+
+    @classmethod
+    def get_all(cls, db_file: str = "employees.db", raw: bool = False) -> List["Employee"]:
         """
         Fetch all employee records from the database.
 
         Args:
             db_file (str): Path to the SQLite database file. Defaults to "employees.db".
+            raw (bool): Return plain dicts instead of Employee objects (fastest to serialize).
+
+        Returns:
+            List[Employee]: A list of Employee objects (or dicts when raw=True).
+        """
+        store = get_store(db_file)
+        if store is not None:
+            # Read every shard in parallel (each through its own cache), then merge by ID
+            parts = store.scatter(lambda shard: cls.get_all(shard, raw))
+            return list(heapq.merge(*parts, key=_sort_key("id", raw)))
+
+        cache = get_read_cache(db_file)
+        key = ("all", raw)
+        cached = cache.get(key)
+        if cached is not MISSING:
+            return list(cached)
+        version = cache.version
+
+        # Stream the table in batches and collect it; existing callers still get a list
+        employees = list(cls.iter_all(db_file=db_file, raw=raw))
+        if len(employees) <= MAX_CACHED_ROWS:
+            cache.set(key, employees, version)
+        return employees
+
+    @classmethod
+    def iter_all(cls, batch_size: int = 500, db_file: str = "employees.db",
+                 raw: bool = False) -> Iterator["Employee"]:
+        """
+        Stream every employee in ID order without loading the whole table.
+
+        Rows are pulled from SQLite `batch_size` at a time by ID range, so memory
+        use stays flat no matter how large the table is. No connection is held
+        between batches, so a slow consumer does not tie up a reader.
+
+        Args:
+            batch_size (int): Number of rows fetched from SQLite per round.
+            db_file (str): Path to the SQLite database file. Defaults to "employees.db".
+            raw (bool): Yield plain dicts instead of Employee objects.
+
+        Yields:
+            Employee: One employee (or dict) at a time.
+        """
+        store = get_store(db_file)
+        if store is not None:
+            # Stream every shard at once and interleave them back into ID order
+            yield from heapq.merge(*(cls.iter_all(batch_size, shard, raw) for shard in store.shards),
+                                   key=_sort_key("id", raw))
+            return
+
+        manager = get_manager(db_file)
+        after_id = 0
+        while True:
+            # The connection goes back to the pool before rows are yielded: the
+            # consumer may be slow, or resume this generator on another thread
+            with manager.reader() as conn:
+                rows = conn.execute(
+                    f"SELECT {COLUMNS} FROM employees WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch_size),
+                ).fetchall()
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            yield from cls._from_rows(rows, raw)
+
+    @classmethod
+    def get_page(cls, after_id: int = 0, limit: int = 100, db_file: str = "employees.db",
+                 raw: bool = False) -> Tuple[List["Employee"], Optional[str]]:
+        """
+        Fetch one page of employees using keyset pagination.
+
+        Instead of OFFSET (which rescans every skipped row), each page starts right
+        after the last ID of the previous one, so every page costs the same.
+
+        Args:
+            after_id (int): Return employees with an ID greater than this. 0 starts at the beginning.
+            limit (int): Maximum number of employees to return.
+            db_file (str): Path to the SQLite database file. Defaults to "employees.db".
+            raw (bool): Return plain dicts instead of Employee objects.
+
+        Returns:
+            Tuple[List[Employee], Optional[str]]: The page, and a cursor for the next
+            page (None when this is the last page).
+
+        Raises:
+            ValueError: If `limit` is less than 1.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+        store = get_store(db_file)
+        if store is not None:
+            # The page is the `limit` lowest IDs over all shards' pages
+            parts = store.scatter(lambda shard: cls.get_page(after_id, limit, shard, raw))
+            merged = list(heapq.merge(*(page for page, _ in parts), key=_sort_key("id", raw)))
+            page = merged[:limit]
+            has_more = len(merged) > limit or any(cursor for _, cursor in parts)
+            next_cursor = encode_cursor(_sort_key("id", raw)(page[-1])) if has_more and page else None
+            return page, next_cursor
+
+        with get_manager(db_file).reader() as conn:
+            # Ask for one extra row to find out whether another page exists
+            rows = conn.execute(
+                f"SELECT {COLUMNS} FROM employees WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit + 1)
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        page = cls._from_rows(rows[:limit], raw)
+        next_cursor = encode_cursor(rows[limit - 1][0]) if has_more else None
+        return page, next_cursor
+
+    @classmethod
+    def search(cls, role: Optional[str] = None, name_prefix: Optional[str] = None,
+               min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+               order_by: str = "id", limit: int = 50,
+               db_file: str = "employees.db", raw: bool = False) -> List["Employee"]:
+        """
+        Find employees matching all of the given filters.
+
+        Every filter maps onto a secondary index (see datastore.MIGRATIONS). Before
+        running, the query plan is checked and the search is refused if SQLite
+        would have to scan the whole table.
+
+        Args:
+            role (str, optional): Exact role, e.g. "ML Engineer".
+            name_prefix (str, optional): Case-sensitive start of the name.
+            min_salary (float, optional): Lowest salary to include.
+            max_salary (float, optional): Highest salary to include.
+            order_by (str): "id", "name", "role" or "salary"; prefix with "-" for descending.
+            limit (int): Maximum number of employees to return.
+            db_file (str): Path to the SQLite database file. Defaults to "employees.db".
+            raw (bool): Return plain dicts instead of Employee objects.
+
+        Returns:
+            List[Employee]: The matching employees.
+
+        Raises:
+            ValueError: On an invalid order_by, or if no index can serve the query.
+        """
+        column = order_by.lstrip("-")
+        if column not in ("id", "name", "role", "salary"):
+            raise ValueError(f"Cannot order by '{order_by}'.")
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+
+        store = get_store(db_file)
+        if store is not None:
+            # Each shard returns its own top `limit` in order; the first `limit` of
+            # their merge are the overall top `limit`
+            parts = store.scatter(lambda shard: cls.search(
+                role, name_prefix, min_salary, max_salary, order_by, limit, shard, raw))
+            merged = heapq.merge(*parts, key=_sort_key(column, raw), reverse=direction == "DESC")
+            return list(islice(merged, limit))
+
+        where, params = [], []
+        if role is not None:
+            where.append("role = ?")
+            params.append(role)
+        if name_prefix:
+            # A range on the raw value can use the name index, unlike LIKE 'x%'
+            upper = _prefix_upper_bound(name_prefix)
+            if upper is None:
+                where.append("name >= ?")
+                params.append(name_prefix)
+            else:
+                where.append("name >= ? AND name < ?")
+                params += [name_prefix, upper]
+        if min_salary is not None:
+            where.append("salary >= ?")
+            params.append(min_salary)
+        if max_salary is not None:
+            where.append("salary <= ?")
+            params.append(max_salary)
+
+        sql = f"SELECT {COLUMNS} FROM employees"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        params.append(limit)
+
+        with get_manager(db_file).reader() as conn:
+            query = f"{sql} ORDER BY {column} {direction} LIMIT ?"
+            if where and not cls._uses_index_search(conn, query, params):
+                # SQLite may prefer walking the ORDER BY index over searching by the
+                # filter. A unary "+" stops the ORDER BY column from using an index,
+                # so the filter's index is used and only the matches get sorted.
+                query = f"{sql} ORDER BY +{column} {direction} LIMIT ?"
+                if not cls._uses_index_search(conn, query, params):
+                    raise ValueError("This search would scan the whole employees table; "
+                                     "add a role, name_prefix or salary filter.")
+            rows = conn.execute(query, params).fetchall()
+
+        return cls._from_rows(rows, raw)
+
+    @staticmethod
+    def _fts_query(text: str, operator: str) -> str:
+        """
+        Turn free text into a safe FTS5 query where every word is a prefix match.
+
+        Each word is quoted, so characters with a meaning in FTS5 syntax (quotes,
+        *, -, NEAR, ...) are searched for literally instead of being interpreted.
+        """
+        words = re.findall(r"\w+", text)[:MAX_QUERY_TERMS]
+        return f" {operator} ".join(f'"{w}"*' for w in words)
+
+    @classmethod
+    def find(cls, query: str, limit: int = 10, db_file: str = "employees.db") -> List[dict]:
+        """
+        Ranked full-text lookup over employee names and roles.
+
+        Every word is matched as a prefix, so "shil" finds "shilpa" and
+        "data sci" finds "Data Scientist". Employees matching all the words are
+        returned if there are any; otherwise employees matching any of them,
+        so filler words such as "anyone in" do not empty the result. Hits are
+        ranked by bm25 with name matches weighted above role matches.
+
+        Args:
+            query (str): Free text, e.g. "shilpa" or "data science".
+            limit (int): Maximum number of employees to return.
+            db_file (str): Path to the SQLite database file. Defaults to "employees.db".
 
         Returns:
-            List[Employee]: A list of Employee objects.
-        """
-
-        # Open a connection to the SQLite database
-        conn = sqlite3.connect(db_file)
-        
-        # Create a cursor object
-        cursor = conn.cursor()
-        
-        # Execute a query to select all employees
-        cursor.execute("SELECT id, name, role, salary FROM employees")
-        
-        # Fetch all rows (list of tuples)
-        rows = cursor.fetchall()
-        
-        # Close the database connection
-        conn.close()
-
-        # Convert each tuple (row) into an Employee instance using list comprehension
+            List[dict]: Employees as dicts with an extra "score" (higher is better).
+            In a sharded database each shard scores against its own term
+            statistics, which is close to, but not exactly, the unsharded ranking.
+        """
+        store = get_store(db_file)
+        if store is not None:
+            parts = store.scatter(lambda shard: cls.find(query, limit, shard))
+            return list(islice(heapq.merge(*parts, key=itemgetter("score"), reverse=True), limit))
+
+        cache = get_read_cache(db_file)
+        key = ("find", query, limit)
+        cached = cache.get(key)
+        if cached is not MISSING:
+            return cached
+        version = cache.version
+
+        sql = (
+            f"SELECT e.id, e.name, e.role, e.salary, bm25(employees_fts, {FTS_WEIGHTS[0]}, {FTS_WEIGHTS[1]}) AS rank "
+            "FROM employees_fts JOIN employees e ON e.id = employees_fts.rowid "
+            "WHERE employees_fts MATCH ? ORDER BY rank LIMIT ?"
+        )
+        rows = []
+        with get_manager(db_file).reader() as conn:
+            for operator in ("AND", "OR"):
+                match = cls._fts_query(query, operator)
+                if not match:
+                    break
+                rows = conn.execute(sql, (match, limit)).fetchall()
+                if rows:
+                    break
+
+        # bm25() is lower for better matches; flip the sign so a higher score is better
+        result = [{**row_to_dict(r), "score": round(-r[4], 4)} for r in rows]
+        cache.set(key, result, version)
+        return result
+
+    # ---------------------- Aggregates ----------------------
+
+    @classmethod
+    def role_stats(cls, db_file: str = "employees.db") -> List[dict]:
+        """
+        Headcount and salary statistics per role.
+
+        Reads the role_stats summary table, which triggers keep current on every
+        insert, so the cost depends on the number of roles, not employees.
+
+        Returns:
+            List[dict]: One {"role", "count", "total_salary", "avg_salary",
+                        "min_salary", "max_salary"} entry per role.
+        """
+        store = get_store(db_file)
+        if store is not None:
+            # Counts and totals add up across shards; minimum and maximum combine
+            merged = defaultdict(lambda: {"count": 0, "total_salary": 0.0,
+                                          "min_salary": float("inf"), "max_salary": float("-inf")})
+            for part in store.scatter(cls.role_stats):
+                for stats in part:
+                    m = merged[stats["role"]]
+                    m["count"] += stats["count"]
+                    m["total_salary"] += stats["total_salary"]
+                    m["min_salary"] = min(m["min_salary"], stats["min_salary"])
+                    m["max_salary"] = max(m["max_salary"], stats["max_salary"])
+            return [
+                {"role": role, "count": m["count"], "total_salary": m["total_salary"],
+                 "avg_salary": m["total_salary"] / m["count"],
+                 "min_salary": m["min_salary"], "max_salary": m["max_salary"]}
+                for role, m in sorted(merged.items())
+            ]
+
+        with get_manager(db_file).reader() as conn:
+            rows = conn.execute(
+                "SELECT role, headcount, total_salary, min_salary, max_salary "
+                "FROM role_stats ORDER BY role"
+            ).fetchall()
         return [
-            cls(id=r[0], name=r[1], role=r[2], salary=r[3])
+            {"role": r[0], "count": r[1], "total_salary": r[2],
+             "avg_salary": r[2] / r[1], "min_salary": r[3], "max_salary": r[4]}
             for r in rows
         ]
 
+    @classmethod
+    def salary_percentiles(cls, percentiles: List[float], role: Optional[str] = None,
+                           db_file: str = "employees.db") -> dict:
+        """
+        Salary percentiles (linear interpolation), overall or for one role.
+
+        Each percentile is read by stepping through the salary index to its rank,
+        so no rows are loaded into Python.
+
+        Args:
+            percentiles (List[float]): Values between 0 and 100, e.g. [50, 90, 99].
+            role (str, optional): Restrict to a single role.
+
+        Returns:
+            dict: {"count": n, "percentiles": {"50": value, ...}}.
+        """
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100.")
+
+        where, params = ("WHERE role = ?", [role]) if role is not None else ("", [])
+        store = get_store(db_file)
+        if store is not None:
+            return cls._sharded_percentiles(store, percentiles, where, params)
+
+        # One snapshot for the count and every OFFSET query, so a concurrent delete
+        # cannot leave a rank pointing past the last row
+        with get_manager(db_file).snapshot() as conn:
+            count = conn.execute(
+                f"SELECT COALESCE(SUM(headcount), 0) FROM role_stats {where}", params
+            ).fetchone()[0]
+            result = {}
+            for p in percentiles:
+                rank = p / 100 * (count - 1)
+                below = int(rank)
+                values = [r[0] for r in conn.execute(
+                    f"SELECT salary FROM employees {where} ORDER BY salary LIMIT 2 OFFSET ?",
+                    params + [below]
+                )] if count else []
+                if not values:
+                    result[f"{p:g}"] = None
+                    continue
+                upper = values[1] if len(values) > 1 else values[0]
+                result[f"{p:g}"] = values[0] + (upper - values[0]) * (rank - below)
+        return {"count": count, "percentiles": result}
+
+    @classmethod
+    def _sharded_percentiles(cls, store, percentiles: List[float], where: str, params: list) -> dict:
+        """
+        salary_percentiles() over all shards: walk the k-way merge of every shard's
+        salary index up to the highest rank needed. Costs O(rank) like the
+        single-file version, but the stepping happens in Python.
+        """
+        with ExitStack() as stack:
+            # Each shard's count and salary scan come from one snapshot of that
+            # shard. Shards are always entered in the same order, so two callers
+            # cannot each hold a reader slot the other is waiting for.
+            conns = [stack.enter_context(get_manager(shard).snapshot()) for shard in store.shards]
+            total = sum(
+                conn.execute(f"SELECT COALESCE(SUM(headcount), 0) FROM role_stats {where}", params).fetchone()[0]
+                for conn in conns
+            )
+            if total == 0:
+                return {"count": 0, "percentiles": {f"{p:g}": None for p in percentiles}}
+
+            # Every rank whose value is needed, visited in one ordered pass
+            ranks = {p: p / 100 * (total - 1) for p in percentiles}
+            wanted = sorted({int(r) for r in ranks.values()} | {min(int(r) + 1, total - 1) for r in ranks.values()})
+            values, targets = {}, iter(wanted)
+            target = next(targets)
+            salaries = [(r[0] for r in conn.execute(f"SELECT salary FROM employees {where} ORDER BY salary", params))
+                        for conn in conns]
+            for position, salary in enumerate(heapq.merge(*salaries)):
+                while target == position:
+                    values[position] = salary
+                    target = next(targets, None)
+                if target is None:
+                    break
+
+        result = {}
+        for p, rank in ranks.items():
+            below = int(rank)
+            upper = values[min(below + 1, total - 1)]
+            result[f"{p:g}"] = values[below] + (upper - values[below]) * (rank - below)
+        return {"count": total, "percentiles": result}
+
+    @classmethod
+    def salary_histogram(cls, bins: int = 10, role: Optional[str] = None,
+                         db_file: str = "employees.db") -> dict:
+        """
+        Count employees in `bins` equal-width salary buckets, in a single SQL pass.
+
+        Args:
+            bins (int): Number of buckets between the lowest and highest salary.
+            role (str, optional): Restrict to a single role.
+
+        Returns:
+            dict: {"bins": [{"low", "high", "count"}, ...]}.
+        """
+        if bins < 1:
+            raise ValueError("bins must be at least 1.")
+
+        where, params = ("WHERE role = ?", [role]) if role is not None else ("", [])
+        bounds_sql = f"SELECT MIN(min_salary), MAX(max_salary) FROM role_stats {where}"
+        counts_sql = (f"SELECT MIN(CAST((salary - ?) / ? AS INTEGER), ?) AS bucket, COUNT(*) "
+                      f"FROM employees {where} GROUP BY bucket")
+
+        store = get_store(db_file)
+        if store is not None:
+            # Same buckets on every shard: global bounds first, then add up the counts
+            def bounds(shard):
+                with get_manager(shard).reader() as conn:
+                    return conn.execute(bounds_sql, params).fetchone()
+
+            found = [b for b in store.scatter(bounds) if b[0] is not None]
+            if not found:
+                return {"bins": []}
+            low, high = min(b[0] for b in found), max(b[1] for b in found)
+            width = (high - low) / bins or 1.0
+
+            def bucket_counts(shard):
+                with get_manager(shard).reader() as conn:
+                    return conn.execute(counts_sql, [low, width, bins - 1] + params).fetchall()
+
+            counts = defaultdict(int)
+            for part in store.scatter(bucket_counts):
+                for bucket, n in part:
+                    counts[bucket] += n
+        else:
+            with get_manager(db_file).reader() as conn:
+                low, high = conn.execute(bounds_sql, params).fetchone()
+                if low is None:
+                    return {"bins": []}
+                width = (high - low) / bins or 1.0
+                counts = dict(conn.execute(counts_sql, [low, width, bins - 1] + params).fetchall())
+        return {"bins": [
+            {"low": low + i * width, "high": low + (i + 1) * width, "count": counts.get(i, 0)}
+            for i in range(bins)
+        ]}
+
+    @staticmethod
+    def _uses_index_search(conn: sqlite3.Connection, sql: str, params: list) -> bool:
+        """Return True if SQLite's plan for `sql` looks rows up through an index."""
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        return any(step.startswith("SEARCH employees") for step in plan)
+
     @classmethod
     def add_employee(cls,  name: str, role: str, salary: float, db_file: str = "employees.db") -> bool:
         """
@@ -100,27 +618,26 @@ class Employee(BaseModel):
             bool: True if insertion successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(db_file)
-            cursor = conn.cursor()
-
-            # Create the table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS employees (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    salary REAL NOT NULL
-                )
-            """)
+            # Validate on the way in, so everything read back can skip validation
+            new = NewEmployee(name=name, role=role, salary=salary)
 
-            # Insert the new employee record using parameterized query
-            cursor.execute(
-                "INSERT INTO employees (name, role, salary) VALUES (?, ?, ?)",
-                (name, role, salary)
-            )
+            # A sharded database assigns the ID up front, which picks the shard;
+            # otherwise SQLite assigns it (id NULL)
+            target, emp_id = db_file, None
+            store = get_store(db_file)
+            if store is not None:
+                emp_id = store.allocate_ids(1)[0]
+                target = store.shard_for(emp_id)
 
-            conn.commit()  # Save changes
-            conn.close()
+            # The shared writer serializes inserts and commits when the block exits.
+            # The table is created once, when the manager first opens the file.
+            with get_manager(target).writer() as conn:
+                # Insert the new employee record using parameterized query
+                conn.execute(
+                    "INSERT INTO employees (id, name, role, salary) VALUES (?, ?, ?, ?)",
+                    (emp_id, new.name, new.role, new.salary)
+                )
+            invalidate_read_cache(target)
             return True
         except sqlite3.IntegrityError:
             # This will be raised if the employee ID already exists
@@ -1,10 +1,7 @@
 # Import the MCP framework
 import mcp
 
-# Import the stdio-based client for interacting with MCP servers via subprocess/stdin/stdout
-from mcp.client.stdio import stdio_client
-
-# Parameters to define how to launch the calculator server process
+# Parameters to define how to launch the employee server process
 from mcp import StdioServerParameters
 
 # FunctionTool is a wrapper class that allows MCP tools to be compatible with OpenAI-style tool use
@@ -13,6 +10,24 @@ from agents import FunctionTool
 # JSON is used for parsing arguments into proper dictionaries
 import json
 
+# os locates the server module next to this file
+import os
+
+# asyncio is used to remember which event loop owns the shared session pool
+import asyncio
+
+# A pool of warm, long-lived MCP sessions so each tool call skips process start-up
+from session_pool import MCPSessionPool, open_transport
+
+# Turns results requested with compact=True back into their usual shape
+from compact import expand_result
+
+# Runs the independent tool calls of one agent turn concurrently, with a per-server cap
+from dispatcher import get_dispatcher
+
+# On-disk cache of the tool listing, so agent start-up does not spawn a server
+from tool_cache import ToolListCache
+
 # -------------------- MCP Server Launch Parameters --------------------
 
 # Define the server process launch configuration
@@ -24,20 +39,134 @@ params = StdioServerParameters(
     env=None
 )
 
+# URL of a long-lived employee server started with an HTTP transport, e.g.
+# "python employee_server.py --transport streamable-http" -> http://127.0.0.1:8001/mcp
+# When set, clients connect to it instead of launching their own server processes.
+SERVER_URL = os.environ.get("EMPLOYEE_SERVER_URL")
+
+# What the pool and tool listing connect to: the shared HTTP server, or a stdio subprocess
+server = SERVER_URL or params
+
+# The server module whose contents key the tool listing cache
+SERVER_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "employee_server.py")
+
+# Cached tool listing for this server (see tool_cache.py)
+tool_cache = ToolListCache("employee", server, SERVER_MODULE)
+
 # -------------------- List Available Tools from the employee Server --------------------
 
 async def list_employee_tools():
     """
-    Connect to the employee MCP server and retrieve the list of available tools.
+    Return the employee server's tools, from the on-disk cache when it is current.
+
+    Only a cache miss (first run, or the server module changed) starts a server.
 
     Returns:
         List of Tool objects describing each callable operation.
     """
-    # Open connection to subprocess using stdio
-    async with stdio_client(params) as streams:
+    return await tool_cache.get(_fetch_employee_tools)
+
+
+async def _fetch_employee_tools():
+    """Connect to the employee MCP server and retrieve the live list of tools."""
+    # Open connection to a stdio subprocess, or to the HTTP server if SERVER_URL is set
+    async with open_transport(server) as streams:
         # Create an MCP client session using those streams
         async with mcp.ClientSession(*streams) as session:
             await session.initialize()              # Initialize handshake with server
             tools_result = await session.list_tools()  # Fetch the available tools
             return tools_result.tools                # Return the list of Tool objects
 
+
+# -------------------- Shared Session Pool --------------------
+
+# Number of warm employee server processes kept open for tool calls
+POOL_SIZE = 4
+
+_pool = None
+_pool_loop = None
+
+
+async def get_employee_pool():
+    """
+    Return the shared session pool for the employee server, starting it on first use.
+
+    The pool is tied to the event loop that created it, so a new one is built if the
+    caller is running on a different loop (e.g. a second `asyncio.run()`).
+
+    Returns:
+        MCPSessionPool: A started pool of warm employee sessions.
+    """
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = MCPSessionPool(server, size=POOL_SIZE)
+        _pool_loop = loop
+    pool = await _pool.start()
+    # A session is open now anyway, so check the cached tool listing against it
+    tool_cache.revalidate_in_background(pool.list_tools)
+    return pool
+
+
+async def close_employee_pool():
+    """Shut down the shared employee session pool and its server processes."""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+    _pool_loop = None
+
+# -------------------- Invoke a Specific Employee Tool --------------------
+
+async def call_employee_tool(tool_name, tool_args, expand=True):
+    """
+    Call a specific employee tool by name with given arguments.
+
+    Args:
+        tool_name (str): The name of the tool (e.g., "get_employee_by_id").
+        tool_args (dict): Arguments for the tool.
+        expand (bool): Expand a compact result (compact=True) into the shape the
+            tool returns without it. Pass False to keep the compact payload.
+
+    Returns:
+        The result returned by the tool.
+    """
+    # Borrow an idle warm session instead of launching a new server process
+    pool = await get_employee_pool()
+    result = await pool.call_tool(tool_name, tool_args)
+    return expand_result(result) if expand else result
+
+# -------------------- Convert Employee Tools into OpenAI-compatible Tool Wrappers --------------------
+
+async def get_employee_tools_openai():
+    """
+    Wrap all available employee tools as FunctionTool instances
+    so they can be used in OpenAI agent/tool interfaces.
+
+    Returns:
+        List of FunctionTool objects.
+    """
+    openai_tools = []
+    tools = await list_employee_tools()
+
+    # Let the shared dispatcher route these tool names to the employee server
+    get_dispatcher().add_routes("employee", [tool.name for tool in tools])
+
+    for tool in tools:
+        schema = {
+            **tool.inputSchema,
+            "additionalProperties": False
+        }
+
+        openai_tool = FunctionTool(
+            name=tool.name,
+            description=tool.description,
+            params_json_schema=schema,
+            # Several lookups in one turn run concurrently, capped at POOL_SIZE
+            on_invoke_tool=lambda ctx, args, toolname=tool.name:
+                get_dispatcher().call(toolname, json.loads(args), server="employee")
+        )
+
+        openai_tools.append(openai_tool)
+
+    return openai_tools
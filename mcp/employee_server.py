@@ -1,21 +1,97 @@
+import os  # Reads the EMPLOYEE_DB environment variable
+import asyncio  # Awaits group-commit results from the write queue's thread
+import sqlite3
+
 # Import the FastMCP class (a high-level MCP server wrapper) and the Server class from the MCP framework.
 # FastMCP makes it easier to register tools and run a server with minimal boilerplate.
 from mcp.server import FastMCP, Server
 
 # Import the Employee class we defined earlier.
 # This is our Pydantic model with database interaction methods (get_by_id, get_all, etc.).
-from employee import Employee
+from employee import Employee, decode_cursor
+
+# The storage layer provides the bulk loader and the CSV/NDJSON file reader.
+from datastore import (EXPORT_FORMATS, IMPORT_EXTENSIONS, BulkLoadError, EmployeeDB, export_dir, export_employees,
+                       get_read_cache, import_dir, load_employee_file)
+
+# Runs blocking sqlite3 work on bounded thread pools so the event loop stays free.
+from db_executor import DBExecutor
+
+# Optional in-memory copy of the database that serves every read
+from replica import enable_replica
+
+# Spreads a database over several files (see sharding.py)
+from sharding import get_store
+
+# Merges concurrent single-row inserts into one transaction (group commit)
+from write_queue import DURABILITY_MODES, get_write_queue
+
+# Header-plus-rows encoding for large results (opt-in with compact=True)
+from compact import dumps, encode_table
+
+# Per-tool call counts, latency histograms, SQLite time and payload sizes
+from metrics import instrument
+
+# Command-line transport selection (stdio, sse or streamable-http)
+from serve import run_server
 
 
 # Create an MCP server instance named "EmployeeServer".
 # This will be the logical name of the server when clients discover or interact with it.
 mcp = FastMCP("EmployeeServer")
 
+# Time and count every tool registered below; exposes the metrics://tools resource
+instrument(mcp)
+
+# Database file served by this process. Override with the EMPLOYEE_DB environment
+# variable, e.g. to point a benchmark run at a synthetic database.
+DB_FILE = os.environ.get("EMPLOYEE_DB", "employees.db")
+
+# A database split with datastore.shard_database() is detected from its manifest;
+# every tool below then works across the shard files transparently.
+store = get_store(DB_FILE)
+
+# Set EMPLOYEE_DB_REPLICA=1 to load the database (each shard, if sharded) into
+# memory at start-up and serve all reads from there. New rows are pulled in
+# whenever the file changes; writes still go to the file.
+replicas = []
+if os.environ.get("EMPLOYEE_DB_REPLICA", "") not in ("", "0"):
+    replicas = [enable_replica(f) for f in (store.shards if store is not None else [DB_FILE])]
+
+# Every tool below is async and hands its database work to this executor.
+# Point lookups, scans and writes run on separate lanes with their own threads,
+# concurrency limits and timeouts, so one large query cannot starve the rest.
+db = DBExecutor()
+
+# add_employee hands rows to a group-commit queue instead of one transaction each.
+# EMPLOYEE_WRITE_DURABILITY picks the default acknowledgement: "commit" (wait for
+# the row to be committed and return its ID) or "enqueue" (answer once queued).
+WRITE_DURABILITY = os.environ.get("EMPLOYEE_WRITE_DURABILITY", "commit")
+WRITE_TIMEOUT = 10.0
+writes = get_write_queue(DB_FILE)
+
+
+# Largest export file employees://exports/{filename} returns. A resource is sent
+# whole in one message (base64 for columnar files), so bigger files must be
+# re-exported in smaller chunks or fetched from the path directly.
+EXPORT_RESOURCE_MAX_BYTES = 128 * 1024 * 1024
+
+
+# Columns of an employee row in compact results. Roles repeat a lot, so they are
+# dictionary-encoded: sent once in "dictionaries" and referenced by index.
+EMPLOYEE_COLUMNS = ("id", "name", "role", "salary")
+DICTIONARY_COLUMNS = ("role",)
+
+
+def compact_employees(employees: list, columns: tuple = EMPLOYEE_COLUMNS) -> dict:
+    """Compact table of employee dicts (see compact.py)."""
+    return encode_table(employees, columns, DICTIONARY_COLUMNS)
+
 
 # Register an MCP tool (endpoint) that can be called remotely by MCP clients.
 # The decorator `@mcp.tool()` automatically exposes this function as an available MCP tool.
 @mcp.tool()
-def get_employee_by_id(emp_id: int) -> dict:
+async def get_employee_by_id(emp_id: int) -> dict:
     """
     Fetch a single employee by ID.
 
@@ -26,13 +102,14 @@ def get_employee_by_id(emp_id: int) -> dict:
         dict: Dictionary containing employee data if found, 
               or an error message if the ID does not exist.
     """
-    # Use the Employee model's class method to fetch data from the SQLite database.
-    emp = Employee.get_by_id(emp_id)
+    # Use the Employee model's class method to fetch data from the SQLite database,
+    # on a worker thread so other requests keep being served meanwhile.
+    emp = await db.run(Employee.get_by_id, emp_id, DB_FILE, lane="point")
     
     # If the employee exists, return their details as a dictionary.
-    # The .dict() method is provided by Pydantic's BaseModel for easy serialization.
+    # The model_dump() method is provided by Pydantic's BaseModel for easy serialization.
     if emp:
-        return emp.dict()
+        return emp.model_dump()
     
     # If no matching employee is found, return an error message in a dictionary format.
     return {"error": f"Employee with ID {emp_id} not found"}
@@ -40,42 +117,397 @@ def get_employee_by_id(emp_id: int) -> dict:
 
 # Register another MCP tool to fetch ALL employees.
 @mcp.tool()
-def get_all_employees() -> list:
+async def get_all_employees(compact: bool = False) -> list | str:
     """
     Fetch all employees from the database.
 
+    Args:
+        compact (bool): Return {"columns": [...], "rows": [[...], ...], "dictionaries":
+            {"role": [...]}} instead, where each row's role is an index into
+            dictionaries["role"]. Much smaller for large results.
+
     Returns:
         list: A list of dictionaries, where each dictionary contains an employee's details.
     """
     # Call Employee.get_all() to retrieve all employee records from the DB.
-    employees = Employee.get_all()
-    
-    # Convert each Employee object to a dictionary for easy JSON serialization.
-    return [emp.dict() for emp in employees]
+    # raw=True builds plain dicts straight from the rows, skipping per-row Pydantic
+    # objects. It runs on the "scan" lane, which cannot hold up point lookups.
+    def fetch():
+        employees = Employee.get_all(DB_FILE, raw=True)
+        return dumps(compact_employees(employees)) if compact else employees
+
+    return await db.run(fetch, lane="scan")
+
+
+# Register a paginated alternative to get_all_employees for large tables.
+@mcp.tool()
+async def get_employees_page(cursor: str | None = None, limit: int = 100, compact: bool = False) -> dict | str:
+    """
+    Fetch employees one page at a time, in ID order.
+
+    Args:
+        cursor (str | None): The `next_cursor` from the previous page, or None for the first page.
+        limit (int): Maximum number of employees to return (1-1000).
+        compact (bool): Return "employees" as a compact table (see get_all_employees).
+
+    Returns:
+        dict: {"employees": [...], "next_cursor": str or None}. Pass next_cursor back
+              to get the following page; it is None when there are no more employees.
+    """
+    if not 1 <= limit <= 1000:
+        return {"error": "limit must be between 1 and 1000"}
+
+    try:
+        after_id = decode_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        return {"error": str(e)}
+
+    def fetch():
+        employees, next_cursor = Employee.get_page(after_id, limit, DB_FILE, raw=True)
+        if compact:
+            return dumps({"employees": compact_employees(employees), "next_cursor": next_cursor})
+        return {"employees": employees, "next_cursor": next_cursor}
+
+    return await db.run(fetch, lane="point")
+
+
+# Register an MCP tool for filtered lookups, so agents never need the whole table.
+@mcp.tool()
+async def search_employees(role: str | None = None, name_prefix: str | None = None,
+                           min_salary: float | None = None, max_salary: float | None = None,
+                           order_by: str = "id", limit: int = 50, compact: bool = False) -> list | dict | str:
+    """
+    Search employees by role, name prefix and/or salary range.
+
+    Args:
+        role (str | None): Exact role, e.g. "ML Engineer".
+        name_prefix (str | None): Case-sensitive start of the employee's name.
+        min_salary (float | None): Lowest salary to include.
+        max_salary (float | None): Highest salary to include.
+        order_by (str): "id", "name", "role" or "salary"; prefix with "-" for descending
+                        (e.g. "-salary" for highest paid first).
+        limit (int): Maximum number of employees to return (1-1000).
+        compact (bool): Return a compact table (see get_all_employees).
+
+    Returns:
+        list: Matching employees as dictionaries, or a dict with an error message.
+    """
+    if not 1 <= limit <= 1000:
+        return {"error": "limit must be between 1 and 1000"}
+
+    def fetch():
+        employees = Employee.search(role, name_prefix, min_salary, max_salary, order_by, limit, DB_FILE, raw=True)
+        return dumps(compact_employees(employees)) if compact else employees
+
+    try:
+        return await db.run(fetch, lane="point")
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def find_employees(query: str, limit: int = 10, compact: bool = False) -> list | dict | str:
+    """
+    Find employees by (partial) name or role, best matches first.
+
+    Words match as prefixes and case-insensitively, so "shil" finds "shilpa" and
+    "data sci" finds Data Scientists. Prefer this over get_all_employees for lookups.
+
+    Args:
+        query (str): Free text, e.g. "shilpa", "ml engineer" or "anyone in data science".
+        limit (int): Maximum number of employees to return (1-100).
+        compact (bool): Return a compact table (see get_all_employees).
+
+    Returns:
+        list: Matching employees as dictionaries with a relevance "score", or a dict
+              with an error message.
+    """
+    if not 1 <= limit <= 100:
+        return {"error": "limit must be between 1 and 100"}
+    found = await db.run(Employee.find, query, limit, DB_FILE, lane="point")
+    return dumps(compact_employees(found, EMPLOYEE_COLUMNS + ("score",))) if compact else found
+
+
+# ---------------------- Analytics tools ----------------------
+# These compute answers inside the database so agents do not have to fetch every
+# employee and do the arithmetic one calculator call at a time.
+
+@mcp.tool()
+async def employee_stats_by_role(compact: bool = False) -> list | str:
+    """
+    Headcount and salary statistics for every role.
+
+    Args:
+        compact (bool): Return a compact table of columns and rows instead.
+
+    Returns:
+        list: One {"role", "count", "total_salary", "avg_salary", "min_salary",
+              "max_salary"} dictionary per role.
+    """
+    stats = await db.run(Employee.role_stats, DB_FILE, lane="point")
+    if compact:
+        columns = ("role", "count", "total_salary", "avg_salary", "min_salary", "max_salary")
+        return dumps(encode_table(stats, columns))
+    return stats
+
+
+@mcp.tool()
+async def employee_headcount(role: str | None = None) -> dict:
+    """
+    Number of employees, overall or for a single role.
+
+    Args:
+        role (str | None): Role to count, or None for everyone.
+
+    Returns:
+        dict: {"count": n}.
+    """
+    stats = await db.run(Employee.role_stats, DB_FILE, lane="point")
+    return {"count": sum(s["count"] for s in stats if role is None or s["role"] == role)}
+
+
+@mcp.tool()
+async def salary_percentiles(percentiles: list[float] | None = None, role: str | None = None) -> dict:
+    """
+    Salary percentiles, e.g. the median (50) or the 90th percentile.
+
+    Args:
+        percentiles (list[float] | None): Percentiles between 0 and 100. Defaults to [25, 50, 75, 90].
+        role (str | None): Restrict to a single role.
+
+    Returns:
+        dict: {"count": n, "percentiles": {"50": value, ...}}, or an error message.
+    """
+    try:
+        return await db.run(Employee.salary_percentiles, percentiles or [25, 50, 75, 90], role, DB_FILE, lane="scan")
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def salary_histogram(bins: int = 10, role: str | None = None) -> dict:
+    """
+    Distribution of salaries in equal-width buckets.
+
+    Args:
+        bins (int): Number of buckets (1-100).
+        role (str | None): Restrict to a single role.
+
+    Returns:
+        dict: {"bins": [{"low", "high", "count"}, ...]}, or an error message.
+    """
+    if not 1 <= bins <= 100:
+        return {"error": "bins must be between 1 and 100"}
+    return await db.run(Employee.salary_histogram, bins, role, DB_FILE, lane="scan")
 
 
 # Register an MCP tool to add a new employee to the database
 @mcp.tool()
-def add_employee(name: str, role: str, salary: float) -> dict:
+async def add_employee(name: str, role: str, salary: float, durability: str | None = None) -> dict:
     """
     Add a new employee to the database.
 
+    Concurrent calls are committed together in one transaction every few
+    milliseconds, so inserts keep up as the number of callers grows.
+
     Args:
-        emp_id (int): Unique employee ID.
         name (str): Employee's full name.
         role (str): Job title or role.
         salary (float): Employee's salary.
+        durability (str | None): "commit" waits until the row is committed and returns
+            its ID; "enqueue" returns as soon as the row is queued. Defaults to the
+            server's EMPLOYEE_WRITE_DURABILITY setting.
 
     Returns:
-        dict: A success message if added successfully, or an error message otherwise.
+        dict: A success message (with the new "id" once committed), or an error message.
+              If the commit is still running after the timeout, "pending" is True and
+              the row will be added: do not retry.
     """
-    success = Employee.add_employee(name, role, salary)
-    
-    if success:
-        return {"success": f"Employee {name} added successfully"}
-    else:
+    mode = durability or WRITE_DURABILITY
+    if mode not in DURABILITY_MODES:
+        return {"error": f"durability must be one of {', '.join(DURABILITY_MODES)}"}
+    try:
+        future = writes.submit(name, role, salary)
+    except (ValueError, RuntimeError) as e:
+        return {"error": f"Failed to add employee with name {name}: {e}"}
+
+    if mode == "enqueue":
+        # Only promise the row while a committer is alive to write it
+        if future.done() and future.exception() is not None:
+            return {"error": f"Failed to add employee with name {name}: {future.exception()}"}
+        if not future.done() and not writes.is_running():
+            return {"error": f"Failed to add employee with name {name}: the write queue is not running."}
+        return {"success": f"Employee {name} queued", "queued": True}
+    try:
+        emp_id = await asyncio.wait_for(asyncio.wrap_future(future), WRITE_TIMEOUT)
+    except asyncio.TimeoutError:
+        # The timeout cancels the row only if the queue had not started writing it yet
+        if future.cancelled():
+            return {"error": f"Adding employee {name} timed out after {WRITE_TIMEOUT}s; it was not added."}
+        if not future.done():
+            if writes.is_running():
+                return {"success": f"Employee {name} is being committed; it will be added", "pending": True}
+            return {"error": f"Adding employee {name} timed out after {WRITE_TIMEOUT}s and the write queue "
+                             f"stopped; check whether it was added before retrying."}
+        # The commit finished just after the timeout
+        return _add_employee_outcome(name, future)
+    except (sqlite3.Error, RuntimeError):
+        return {"error": f"Failed to add employee with name {name}.  there was a DB error."}
+    return {"success": f"Employee {name} added successfully", "id": emp_id}
+
+
+def _add_employee_outcome(name: str, future) -> dict:
+    """add_employee's reply for a write queue future that has settled."""
+    try:
+        emp_id = future.result()
+    except (sqlite3.Error, RuntimeError):
         return {"error": f"Failed to add employee with name {name}.  there was a DB error."}
+    return {"success": f"Employee {name} added successfully", "id": emp_id}
+
+
+# Register an MCP tool for loading many employees at once.
+@mcp.tool()
+async def bulk_add_employees(employees: list[dict] | None = None, path: str | None = None,
+                             chunk_size: int = 10000, defer_indexes: bool = False) -> dict:
+    """
+    Add many employees in one call.
+
+    Provide either `employees` (a list of {"name", "role", "salary"} objects) or
+    `path`, the name of a CSV file with a name,role,salary header or an NDJSON file
+    in the server's import directory.
+
+    Args:
+        employees (list[dict] | None): Employees to insert.
+        path (str | None): Name of a .csv, .ndjson or .jsonl file in the import
+            directory (EMPLOYEE_IMPORT_DIR, or "imports" next to the database).
+        chunk_size (int): Rows inserted per transaction.
+        defer_indexes (bool): Rebuild indexes once after the load instead of per row.
+
+    Returns:
+        dict: {"inserted", "id_ranges", "seconds", "rows_per_sec"}. If the load fails
+              part-way, the same keys describe the rows already committed, plus "error".
+    """
+    if (employees is None) == (path is None):
+        return {"error": "Provide exactly one of 'employees' or 'path'."}
+    # Only plain file names inside the import directory can be loaded
+    if path is not None and (os.path.basename(path) != path
+                             or os.path.splitext(path)[1].lower() not in IMPORT_EXTENSIONS):
+        return {"error": f"path must be the name of a {', '.join(IMPORT_EXTENSIONS)} file in the import directory."}
+    if path is not None and not os.path.isfile(os.path.join(import_dir(DB_FILE), path)):
+        return {"error": f"No file named {path!r} in the import directory."}
+
+    def load():
+        if employees is not None:
+            rows = employees
+        else:
+            rows = load_employee_file(os.path.join(import_dir(DB_FILE), path))
+        return EmployeeDB(DB_FILE).bulk_add_employees(rows, chunk_size=chunk_size, defer_indexes=defer_indexes)
+
+    try:
+        # Large loads can legitimately take minutes, so no timeout on this call
+        return await db.run(load, lane="write", timeout=None)
+    except BulkLoadError as e:
+        # Chunks committed before the failure stay; report them so a retry can skip them
+        return {"error": str(e), **e.result}
+    except (ValueError, OSError) as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def export_employees_file(format: str = "ndjson", rows_per_file: int = 1_000_000) -> dict:
+    """
+    Export every employee to files on the server instead of returning them inline.
+
+    Use this instead of get_all_employees when the whole table is needed by another
+    program. Rows are streamed, so memory stays flat however large the table is.
+
+    Args:
+        format (str): "ndjson" (one JSON object per line), "csv", or "columnar"
+                      (a compact NumPy .npz file with dictionary-encoded roles).
+        rows_per_file (int): Rows per output file; large exports are split into chunks.
+
+    Returns:
+        dict: {"format", "rows", "files": [{"path", "uri", "resource", "rows", "bytes"}], "seconds"},
+              where "resource" can be read through this server, or a dict with an error message.
+    """
+    def export():
+        result = export_employees(DB_FILE, format, rows_per_file=rows_per_file)
+        for f in result["files"]:
+            f["resource"] = f"employees://exports/{os.path.basename(f['path'])}"
+        return result
+
+    try:
+        # Exporting millions of rows can take a while, so no timeout on this call
+        return await db.run(export, lane="scan", timeout=None)
+    except (ValueError, OSError) as e:
+        return {"error": str(e)}
+
+
+@mcp.resource("employees://exports/{filename}")
+async def read_export(filename: str) -> str | bytes:
+    """
+    Contents of a file written by export_employees_file (text for ndjson/csv, bytes
+    for columnar), up to EXPORT_RESOURCE_MAX_BYTES.
+    """
+    # Only plain file names inside the export directory can be read
+    if os.path.basename(filename) != filename or os.path.splitext(filename)[1] not in EXPORT_FORMATS.values():
+        raise ValueError("Unknown export file.")
+    path = os.path.join(export_dir(DB_FILE), filename)
+
+    def read():
+        size = os.path.getsize(path)
+        if size > EXPORT_RESOURCE_MAX_BYTES:
+            raise ValueError(f"{filename} is {size} bytes, more than the {EXPORT_RESOURCE_MAX_BYTES} a "
+                             f"resource may return; export again with a smaller rows_per_file.")
+        if filename.endswith(EXPORT_FORMATS["columnar"]):
+            with open(path, "rb") as f:
+                return f.read()
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    # Reading a large file would stall every other request on the event loop
+    return await db.run(read, lane="scan", timeout=None)
+
+
+# Expose the read cache's hit/miss counters so its effectiveness can be monitored.
+@mcp.resource("cache://employees/stats")
+def employee_cache_stats() -> dict:
+    """Hit, miss, eviction and invalidation counters for the employee read cache."""
+    if store is None:
+        return get_read_cache(DB_FILE).stats()
+    # Sharded: lookups are cached per shard file, so report the totals and each shard
+    shards = [get_read_cache(shard).stats() for shard in store.shards]
+    totals = {key: sum(s[key] for s in shards)
+              for key in ("size", "maxsize", "hits", "misses", "evictions", "invalidations")}
+    lookups = totals["hits"] + totals["misses"]
+    return {
+        **totals,
+        "ttl": shards[0]["ttl"],
+        "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+        "shards": shards,
+    }
+
+
+# Group-commit counters: batches committed, rows, errors and average batch size.
+@mcp.resource("employees://writes/stats")
+def write_queue_stats() -> dict:
+    """Batch, row and error counters for the add_employee write queue."""
+    return writes.stats()
+
+
+# Load and refresh counters for the in-memory replica (EMPLOYEE_DB_REPLICA).
+@mcp.resource("employees://replica/stats")
+def replica_stats() -> dict:
+    """Load time, refresh and applied-row counters for the in-memory read replica."""
+    if not replicas:
+        return {"enabled": False}
+    if store is None:
+        return replicas[0].stats()
+    return {"enabled": True, "shards": [r.stats() for r in replicas]}
+
 
+# Default port when serving over HTTP (see serve.py)
+HTTP_PORT = 8001
 
 
 # Standard Python entry point check to ensure the server runs only when executed directly.
@@ -83,4 +515,5 @@ def add_employee(name: str, role: str, salary: float) -> dict:
 if __name__ == "__main__":
     # Start the MCP server and listen for incoming client requests.
     # This will block the main thread and keep the server running until stopped.
-    mcp.run()
+    # Pass --transport streamable-http (or sse) to serve many clients from one process.
+    run_server(mcp, HTTP_PORT)
@@ -0,0 +1,229 @@
+# ast lets us parse arithmetic with Python's own grammar without ever calling eval()
+import ast
+
+# lru_cache gives us the "compile once, reuse many times" cache keyed by expression text
+from functools import lru_cache
+
+# NumPy runs the compiled plan over whole columns of variable bindings at once
+import numpy as np
+
+
+# ---------------------- LIMITS ----------------------
+
+# Reject absurdly large inputs before parsing so a single request cannot hog the server
+MAX_EXPRESSION_LENGTH = 1000
+MAX_EXPRESSION_DEPTH = 50
+
+# Number of distinct compiled expressions kept in memory (least recently used are evicted)
+CACHE_SIZE = 256
+
+# Error codes used in the per-row error mask
+_DIVIDE_BY_ZERO = 1
+_NOT_FINITE = 2
+_MESSAGES = {
+    _DIVIDE_BY_ZERO: "Cannot divide by zero.",
+    _NOT_FINITE: "Result is not a finite number.",
+}
+
+# ---------------------- WHAT AN EXPRESSION MAY CONTAIN ----------------------
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Pow: np.power,
+}
+
+# Operators whose right operand must not be zero; a zero is reported as division by zero
+_DIVISION_OPS = {
+    ast.Div: np.divide,
+    ast.Mod: np.mod,
+    ast.FloorDiv: np.floor_divide,
+}
+
+_UNARY_OPS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+_FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+_CONSTANTS = {
+    "pi": np.pi,
+    "e": np.e,
+}
+
+
+class CompiledExpression:
+    """
+    An arithmetic expression parsed and compiled into a tree of closures.
+
+    Every closure takes `(env, errors)`, where `env` maps variable names to float64
+    arrays (one element per binding) and `errors` is an int8 mask that division
+    (/, // or %) marks when it meets a zero denominator. Evaluating one binding or
+    a hundred thousand runs the same plan; NumPy does the per-element work.
+    """
+
+    def __init__(self, text: str, plan, variables: frozenset):
+        self.text = text
+        self.variables = variables   # Names the expression expects to be bound
+        self._plan = plan
+
+    def evaluate(self, variables: dict | None = None) -> float:
+        """
+        Evaluate for a single set of variable values.
+
+        Raises:
+            ValueError: On a missing variable, division by zero or a non-finite result.
+        """
+        result = self.evaluate_many([variables or {}])
+        if result["errors"]:
+            raise ValueError(result["errors"][0]["error"])
+        return result["results"][0]
+
+    def evaluate_many(self, bindings: list[dict]) -> dict:
+        """
+        Evaluate for many sets of variable values in one vectorized pass.
+
+        Args:
+            bindings (list[dict]): One {name: value} mapping per evaluation.
+
+        Returns:
+            dict: {"results": [...], "errors": [{"index": i, "error": msg}, ...]}
+                  where failed rows have a result of None.
+        """
+        n = len(bindings)
+        env = {}
+        for name in self.variables:
+            try:
+                env[name] = np.fromiter((row[name] for row in bindings), dtype=np.float64, count=n)
+            except KeyError:
+                raise ValueError(f"Missing value for variable '{name}'.")
+        errors = np.zeros(n, dtype=np.int8)
+        with np.errstate(all="ignore"):
+            out = np.broadcast_to(self._plan(env, errors), (n,)).astype(np.float64)
+        errors[(errors == 0) & ~np.isfinite(out)] = _NOT_FINITE
+        results = out.tolist()
+        bad = np.flatnonzero(errors).tolist()
+        for i in bad:
+            results[i] = None
+        return {
+            "results": results,
+            "errors": [{"index": i, "error": _MESSAGES[int(errors[i])]} for i in bad],
+        }
+
+
+# ---------------------- COMPILER ----------------------
+
+def _compile_node(node, variables: set, depth: int = 0):
+    """Recursively turn an AST node into a closure, collecting variable names."""
+    if depth > MAX_EXPRESSION_DEPTH:
+        raise ValueError("Expression is nested too deeply.")
+    depth += 1
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = np.float64(node.value)
+        return lambda env, errors: value
+
+    if isinstance(node, ast.Name):
+        if node.id in _CONSTANTS:
+            value = np.float64(_CONSTANTS[node.id])
+            return lambda env, errors: value
+        name = node.id
+        variables.add(name)
+        return lambda env, errors: env[name]
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        fn = _UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand, variables, depth)
+        return lambda env, errors: fn(operand(env, errors))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _DIVISION_OPS:
+        fn = _DIVISION_OPS[type(node.op)]
+        left = _compile_node(node.left, variables, depth)
+        right = _compile_node(node.right, variables, depth)
+
+        def divide(env, errors):
+            numerator = left(env, errors)
+            denominator = right(env, errors)
+            zero = np.broadcast_to(denominator == 0, errors.shape)
+            errors[zero & (errors == 0)] = _DIVIDE_BY_ZERO
+            return fn(numerator, np.where(denominator == 0, np.nan, denominator))
+        return divide
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        fn = _BINARY_OPS[type(node.op)]
+        left = _compile_node(node.left, variables, depth)
+        right = _compile_node(node.right, variables, depth)
+        return lambda env, errors: fn(left(env, errors), right(env, errors))
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS and not node.keywords):
+        fn = _FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, variables, depth) for arg in node.args]
+        if len(args) != (2 if node.func.id in ("min", "max") else 1):
+            raise ValueError(f"Wrong number of arguments to {node.func.id}().")
+        return lambda env, errors: fn(*(arg(env, errors) for arg in args))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id not in _FUNCTIONS:
+        raise ValueError(f"Unknown function '{node.func.id}'.")
+    raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(text: str) -> CompiledExpression:
+    """
+    Parse and compile an arithmetic expression, reusing earlier compilations.
+
+    Supports numbers, variables, + - * / // % ** and unary minus, the constants
+    pi and e, and the functions abs, sqrt, exp, log, sin, cos, tan, min and max.
+    Anything else (attribute access, names of Python builtins, comprehensions...)
+    is rejected, so the input is never executed as code.
+
+    Args:
+        text (str): The expression, e.g. "2*(x+4)**2".
+
+    Returns:
+        CompiledExpression: The reusable compiled plan.
+
+    Raises:
+        ValueError: If the expression is too long, malformed or uses unsupported syntax.
+    """
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters.")
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+    variables = set()
+    plan = _compile_node(tree.body, variables)
+    return CompiledExpression(text, plan, frozenset(variables))
+
+
+def evaluate(expression: str, variables: dict | list[dict] | None = None) -> dict:
+    """
+    Evaluate an expression for one set of variables or many.
+
+    Args:
+        expression (str): The arithmetic expression.
+        variables (dict | list[dict] | None): A single {name: value} mapping, or a
+            list of them to evaluate in bulk.
+
+    Returns:
+        dict: {"result": value} for a single mapping, or
+              {"results": [...], "errors": [...]} for a list.
+    """
+    compiled = compile_expression(expression)
+    if isinstance(variables, list):
+        return compiled.evaluate_many(variables)
+    return {"result": compiled.evaluate(variables)}
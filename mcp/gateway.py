@@ -0,0 +1,178 @@
+import importlib  # Loads the mounted servers' modules by name
+import os  # Reads GATEWAY_SERVERS
+
+# Import the FastMCP server framework
+from mcp.server.fastmcp import FastMCP
+
+# Per-tool call counts, latency histograms and payload sizes
+from metrics import instrument
+
+# Command-line transport selection (stdio, sse or streamable-http)
+from serve import run_server
+
+
+# Servers mounted by default: tool-name prefix -> module defining a FastMCP `mcp`.
+# Override with GATEWAY_SERVERS, e.g. "calculator=calculator_server,employee=employee_server".
+DEFAULT_SERVERS = {"calculator": "calculator_server", "employee": "employee_server"}
+
+# Joins a server's prefix to its tool names: calculator_add, employee_get_all_employees.
+# OpenAI-style function names allow only letters, digits, "_" and "-".
+SEPARATOR = "_"
+
+
+class Gateway:
+    """
+    One MCP server exposing the tools, resources and prompts of several others.
+
+    Each mounted FastMCP app is imported into this process, so a client needs one
+    server process, one handshake and one pipe (or HTTP connection) for all of
+    them. Everything the servers keep at module level (database executors and
+    connection pools, read caches, the calculator memo, worker processes and the
+    metrics registry) exists once and is shared by every client of the gateway.
+
+    Tools are renamed "<prefix>_<tool>" so servers cannot clash. Resources keep
+    their URIs, which are namespaced by scheme already (calculator://, employees://).
+    """
+
+    def __init__(self, name: str = "gateway"):
+        self.mcp = FastMCP(name)
+        # Mounted tools were instrumented by their own server; registering them
+        # through the plain add_tool keeps them from being counted twice
+        self._add_tool = self.mcp.add_tool
+        # The gateway's metrics://tools covers every server in the process
+        instrument(self.mcp, all_servers=True)
+        self.servers = {}
+
+    def mount(self, prefix: str, server: FastMCP):
+        """
+        Expose every tool, resource and prompt of `server` through the gateway.
+
+        Args:
+            prefix (str): Namespace for the server's tool and prompt names.
+            server (FastMCP): The app to mount, e.g. calculator_server.mcp.
+
+        Raises:
+            ValueError: If `prefix` is already mounted.
+        """
+        if prefix in self.servers:
+            raise ValueError(f"A server is already mounted as {prefix!r}.")
+        self.servers[prefix] = server
+
+        for tool in server._tool_manager.list_tools():
+            self._add_tool(tool.fn, name=f"{prefix}{SEPARATOR}{tool.name}",
+                           description=tool.description, annotations=tool.annotations)
+
+        # Resources with a URI the gateway already serves are skipped; in practice
+        # that is each server's metrics://tools, which the gateway's own replaces
+        resources = self.mcp._resource_manager
+        uris = {str(r.uri) for r in resources.list_resources()}
+        for resource in server._resource_manager.list_resources():
+            if str(resource.uri) not in uris:
+                resources.add_resource(resource)
+        templates = {t.uri_template for t in resources.list_templates()}
+        for template in server._resource_manager.list_templates():
+            if template.uri_template not in templates:
+                resources.add_template(template.fn, template.uri_template, name=template.name,
+                                       description=template.description, mime_type=template.mime_type)
+
+        for prompt in server._prompt_manager.list_prompts():
+            self.mcp.add_prompt(prompt.model_copy(update={"name": f"{prefix}{SEPARATOR}{prompt.name}"}))
+
+    async def call(self, name: str, arguments: dict | None = None, **kwargs):
+        """
+        Call a mounted tool in-process, without a JSON-RPC round trip.
+
+        The arguments are validated exactly as for a client's call and the call
+        shows up in the tool's metrics, but the result is the tool's own Python
+        value rather than serialized content.
+
+        Args:
+            name (str): Gateway tool name, e.g. "calculator_evaluate".
+            arguments (dict | None): Tool arguments; keyword arguments are merged in.
+
+        Returns:
+            Whatever the tool returns.
+
+        Raises:
+            ValueError: If there is no such tool.
+            ToolError: If the arguments are invalid or the tool raises.
+        """
+        tool = self.mcp._tool_manager.get_tool(name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return await tool.run({**(arguments or {}), **kwargs})
+
+
+def parse_servers(text: str) -> dict:
+    """Parse "calculator=calculator_server,employee=employee_server" into {prefix: module}."""
+    servers = {}
+    for part in text.split(","):
+        prefix, _, module = part.partition("=")
+        if prefix.strip():
+            servers[prefix.strip()] = module.strip() or prefix.strip()
+    return servers
+
+
+# ---------------------- GATEWAY INSTANCE ----------------------
+
+gateway = Gateway()
+
+servers = parse_servers(os.environ["GATEWAY_SERVERS"]) if os.environ.get("GATEWAY_SERVERS") else DEFAULT_SERVERS
+for prefix, module in servers.items():
+    gateway.mount(prefix, importlib.import_module(module).mcp)
+
+# `mcp run gateway.py` and run_server() look for the app under this name
+mcp = gateway.mcp
+
+
+# ---------------------- CROSS-SERVER TOOLS ----------------------
+
+# Tools that combine several servers' tools. They call them through gateway.call(),
+# so the employee data and the salary math never leave this process.
+@mcp.tool()
+async def payroll_projection(percent: float) -> dict:
+    """
+    Project each role's total payroll after a raise of `percent` percent.
+
+    Args:
+        percent (float): The raise, e.g. 3.5 for 3.5%.
+
+    Returns:
+        dict: {"percent", "total_salary", "projected_total_salary", "roles": [{"role",
+              "count", "total_salary", "projected_total_salary"}, ...]}, or a dict with
+              an error message if the employee or calculator server is not mounted.
+    """
+    for tool in ("employee_employee_stats_by_role", "calculator_evaluate"):
+        if mcp._tool_manager.get_tool(tool) is None:
+            return {"error": f"payroll_projection needs the {tool} tool."}
+
+    stats = await gateway.call("employee_employee_stats_by_role")
+    # One vectorized evaluation for every role instead of one multiply call each
+    projected = await gateway.call(
+        "calculator_evaluate",
+        expression="total * (1 + percent / 100)",
+        variables=[{"total": s["total_salary"], "percent": percent} for s in stats],
+    )
+    roles = [
+        {"role": s["role"], "count": s["count"], "total_salary": s["total_salary"],
+         "projected_total_salary": value}
+        for s, value in zip(stats, projected["results"])
+    ]
+    return {
+        "percent": percent,
+        "total_salary": sum(s["total_salary"] for s in stats),
+        "projected_total_salary": sum(r["projected_total_salary"] or 0.0 for r in roles),
+        "roles": roles,
+    }
+
+
+# ---------------------- SERVER ENTRY POINT ----------------------
+
+# Default port when serving over HTTP (see serve.py); the calculator and employee
+# servers default to 8000 and 8001
+HTTP_PORT = 8002
+
+if __name__ == "__main__":
+    # One process for every mounted server; stdio by default, or e.g.
+    # --transport streamable-http to serve many clients from it
+    run_server(mcp, HTTP_PORT)
@@ -23,8 +23,11 @@ async def chat():
     # Explicitly set the OpenAI API key in the environment
     os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
-    # Path to the MCP client configuration file (points to your MCP server setup)
-    config_file = "mcp/server_config.json"
+    # Path to the MCP client configuration file (points to your MCP server setup).
+    # Set MCP_CONFIG=mcp/server_config_http.json to use servers already running
+    # with --transport streamable-http instead of launching one process per client,
+    # or MCP_CONFIG=mcp/server_config_gateway.json to run both tool sets in one process.
+    config_file = os.environ.get("MCP_CONFIG", "mcp/server_config.json")
 
     print("Initializing chat...")
 
@@ -0,0 +1,245 @@
+import contextvars  # Per-call accumulator that follows the call into worker threads
+import functools  # wraps() keeps the tool's name, docstring and signature for FastMCP
+import inspect
+import os
+import threading
+import time
+
+import pydantic_core  # The same JSON encoder FastMCP uses for tool results
+
+
+# Latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+# Payload sizes are measured by serializing the arguments and result, which costs
+# as much as the serialization FastMCP does anyway. Only every Nth call is sampled.
+PAYLOAD_SAMPLE_EVERY = 10
+
+# Minimum seconds between Prometheus file dumps
+PROMETHEUS_DUMP_INTERVAL = 5.0
+
+# Seconds spent inside SQLite during the current tool call (None outside a call)
+_sqlite_seconds = contextvars.ContextVar("sqlite_seconds", default=None)
+
+
+def add_sqlite_time(seconds: float):
+    """Credit `seconds` of SQLite work to the tool call currently running, if any."""
+    acc = _sqlite_seconds.get()
+    if acc is not None:
+        acc[0] += seconds
+
+
+class ToolStats:
+    """Counters for one tool. Updated under the registry lock."""
+
+    def __init__(self, server: str, tool: str):
+        self.server = server
+        self.tool = tool
+        self.calls = 0
+        self.errors = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+        self.sqlite_ms = 0.0
+        self.samples = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.serialize_ms = 0.0
+
+    def snapshot(self) -> dict:
+        sampled = self.samples or 1
+        return {
+            "server": self.server,
+            "tool": self.tool,
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_avg_ms": round(self.latency_sum_ms / self.calls, 3) if self.calls else 0.0,
+            "latency_max_ms": round(self.latency_max_ms, 3),
+            "latency_histogram_ms": {
+                ("+Inf" if b == float("inf") else f"{b:g}"): n
+                for b, n in zip(LATENCY_BUCKETS_MS, self.buckets)
+            },
+            "sqlite_ms_total": round(self.sqlite_ms, 3),
+            "sqlite_ms_avg": round(self.sqlite_ms / self.calls, 3) if self.calls else 0.0,
+            "serialize_ms_avg": round(self.serialize_ms / sampled, 3),
+            "request_bytes_avg": round(self.request_bytes / sampled),
+            "response_bytes_avg": round(self.response_bytes / sampled),
+            "payload_samples": self.samples,
+        }
+
+
+class MetricsRegistry:
+    """All tool statistics in this process, keyed by (server, tool)."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+        self.prometheus_file = os.environ.get("MCP_METRICS_FILE")
+
+    def _get(self, server: str, tool: str) -> ToolStats:
+        key = (server, tool)
+        if key not in self._stats:
+            self._stats[key] = ToolStats(server, tool)
+        return self._stats[key]
+
+    def record(self, server: str, tool: str, ms: float, failed: bool, sqlite_seconds: float,
+               payload: tuple | None = None):
+        """Add one finished call. `payload` is (request_bytes, response_bytes, serialize_ms) when sampled."""
+        with self._lock:
+            stats = self._get(server, tool)
+            stats.calls += 1
+            stats.errors += failed
+            stats.latency_sum_ms += ms
+            stats.latency_max_ms = max(stats.latency_max_ms, ms)
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if ms <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.sqlite_ms += sqlite_seconds * 1000
+            if payload is not None:
+                stats.samples += 1
+                stats.request_bytes += payload[0]
+                stats.response_bytes += payload[1]
+                stats.serialize_ms += payload[2]
+        self._maybe_dump()
+
+    def should_sample(self, server: str, tool: str) -> bool:
+        with self._lock:
+            return self._get(server, tool).calls % PAYLOAD_SAMPLE_EVERY == 0
+
+    def snapshot(self, server: str | None = None) -> list:
+        """Every tool's statistics (optionally for one server only), busiest first."""
+        with self._lock:
+            stats = [s.snapshot() for s in self._stats.values() if server in (None, s.server)]
+        return sorted(stats, key=lambda s: s["calls"], reverse=True)
+
+    def render_prometheus(self) -> str:
+        """All statistics in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE mcp_tool_calls_total counter",
+            "# TYPE mcp_tool_errors_total counter",
+            "# TYPE mcp_tool_latency_ms histogram",
+            "# TYPE mcp_tool_sqlite_ms_total counter",
+            "# TYPE mcp_tool_response_bytes_avg gauge",
+        ]
+        with self._lock:
+            for s in self._stats.values():
+                labels = f'server="{s.server}",tool="{s.tool}"'
+                lines.append(f"mcp_tool_calls_total{{{labels}}} {s.calls}")
+                lines.append(f"mcp_tool_errors_total{{{labels}}} {s.errors}")
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS_MS, s.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'mcp_tool_latency_ms_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"mcp_tool_latency_ms_sum{{{labels}}} {s.latency_sum_ms:.3f}")
+                lines.append(f"mcp_tool_latency_ms_count{{{labels}}} {s.calls}")
+                lines.append(f"mcp_tool_sqlite_ms_total{{{labels}}} {s.sqlite_ms:.3f}")
+                if s.samples:
+                    lines.append(f"mcp_tool_response_bytes_avg{{{labels}}} {s.response_bytes / s.samples:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def dump_prometheus(self, path: str):
+        """Atomically write the Prometheus text to `path`."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def _maybe_dump(self):
+        if not self.prometheus_file:
+            return
+        now = time.monotonic()
+        if now - self._last_dump >= PROMETHEUS_DUMP_INTERVAL:
+            self._last_dump = now
+            try:
+                self.dump_prometheus(self.prometheus_file)
+            except OSError:
+                pass
+
+
+# The process-wide registry used by instrument()
+REGISTRY = MetricsRegistry()
+
+
+def _payload(args: dict, result) -> tuple:
+    t0 = time.perf_counter()
+    response = len(pydantic_core.to_json(result, fallback=str))
+    serialize_ms = (time.perf_counter() - t0) * 1000
+    return len(pydantic_core.to_json(args, fallback=str)), response, serialize_ms
+
+
+def instrumented(server: str, fn, registry: MetricsRegistry = REGISTRY, name: str | None = None):
+    """Wrap a tool function so every call is timed and counted (as `name`, default fn's name)."""
+    tool = name or fn.__name__
+
+    def finish(start, acc, failed, kwargs, result, sample):
+        ms = (time.perf_counter() - start) * 1000
+        payload = _payload(kwargs, result) if sample and not failed else None
+        registry.record(server, tool, ms, failed, acc[0], payload)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            acc = [0.0]
+            token = _sqlite_seconds.set(acc)
+            sample = registry.should_sample(server, tool)
+            start = time.perf_counter()
+            result, failed = None, True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = isinstance(result, dict) and "error" in result
+                return result
+            finally:
+                _sqlite_seconds.reset(token)
+                finish(start, acc, failed, kwargs, result, sample)
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            acc = [0.0]
+            token = _sqlite_seconds.set(acc)
+            sample = registry.should_sample(server, tool)
+            start = time.perf_counter()
+            result, failed = None, True
+            try:
+                result = fn(*args, **kwargs)
+                failed = isinstance(result, dict) and "error" in result
+                return result
+            finally:
+                _sqlite_seconds.reset(token)
+                finish(start, acc, failed, kwargs, result, sample)
+
+    return wrapper
+
+
+def instrument(mcp, registry: MetricsRegistry = REGISTRY, all_servers: bool = False):
+    """
+    Record metrics for every tool later registered on a FastMCP server.
+
+    Call this right after creating the server. Tools keep using the normal
+    `@mcp.tool()` decorator; their functions are wrapped as they are registered.
+    Also adds a `metrics://tools` resource returning the current statistics
+    (of every server in the process with all_servers=True, as the gateway does).
+    Set MCP_METRICS_FILE to also write Prometheus text to that file.
+    """
+    add_tool = mcp.add_tool
+
+    def add_instrumented_tool(fn, *args, **kwargs):
+        # Everything is passed on untouched, since add_tool's parameters differ
+        # between mcp releases (annotations, title, structured_output, ...).
+        # Only the tool name is needed here, and it always comes first.
+        name = kwargs.get("name", args[0] if args else None)
+        wrapped = instrumented(mcp.name, fn, registry, name)
+        if name is not None:
+            wrapped.__name__ = name
+        add_tool(wrapped, *args, **kwargs)
+
+    mcp.add_tool = add_instrumented_tool
+
+    @mcp.resource("metrics://tools")
+    def tool_metrics() -> list:
+        """Per-tool call counts, errors, latency histograms, SQLite time and payload sizes."""
+        return registry.snapshot(None if all_servers else mcp.name)
+
+    return mcp
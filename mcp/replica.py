@@ -0,0 +1,287 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path  # Builds the read-only URI of the disk file
+
+from datastore import get_manager
+from sqlite_pool import STATEMENT_CACHE_SIZE
+
+
+# Cheap summary compared between the replica and the disk file after each refresh.
+# Both role_stats tables are kept by the same triggers, so the headcount is O(roles)
+# to read, MAX(id) is a single index probe, and employees_changes is bumped by a
+# trigger on every UPDATE or DELETE (schema migration 5). A mismatch means the disk
+# file changed in some way other than appended rows, and the replica is reloaded.
+_FINGERPRINT_SQL = """
+    SELECT COALESCE((SELECT SUM(headcount) FROM {db}.role_stats), 0),
+           COALESCE((SELECT MAX(id) FROM {db}.employees), 0),
+           COALESCE((SELECT changes FROM {db}.employees_changes), 0)
+"""
+
+
+# Seconds between PRAGMA data_version checks for changes made by other processes.
+# Checking costs about as much as a primary-key lookup, so it is not done on every
+# read; writes from this process mark the replica stale and are seen immediately.
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+class MemoryReplica:
+    """
+    An in-memory copy of an employees database that serves all reads.
+
+    The whole file is copied into a shared-cache in-memory database with SQLite's
+    backup API, indexes and full-text index included, so every existing query runs
+    unchanged against it. Reader threads each get their own connection to it.
+
+    Before a read the replica checks whether this process wrote (see mark_stale)
+    and, at most every `poll_interval` seconds, PRAGMA data_version for commits
+    from other processes. If the file changed, new rows are appended
+    from the disk file in one statement; the triggers in the copy keep role_stats
+    and the full-text index current. If the file changed in any other way (rows
+    deleted or edited by another process), the replica is rebuilt from a fresh
+    backup by the reading thread that noticed, which waits for the whole copy.
+    Other readers keep using the old copy meanwhile, except those that also need
+    to catch up: they wait for the rebuild. The new copy is then swapped in.
+    """
+
+    def __init__(self, db_file: str, data_version, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Args:
+            db_file (str): Path to the SQLite database file.
+            data_version (callable): Returns the file's current PRAGMA data_version.
+            poll_interval (float): Seconds between data_version checks (0 checks every read).
+        """
+        self.db_file = os.path.abspath(db_file)
+        self._data_version = data_version
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+        self._cond = threading.Condition()   # Readers share the copy; refreshes need it alone
+        self._readers = 0
+        self._writing = False
+        self._waiting = 0
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()      # This thread's connection to the current copy
+        self._depth = {}                     # Thread ident -> nesting depth of its reads
+        self._anchor = None                  # Keeps the in-memory database alive
+        self._connections = []               # Reader connections to the current copy
+        self._generation = 0
+        self._version = None
+        self._stale = True
+        self.loads = 0
+        self.refreshes = 0
+        self.rows_applied = 0
+        self.last_load_seconds = 0.0
+        self._reload(data_version())
+
+    # ---------------------- Reading ----------------------
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow this thread's connection to the replica, refreshing it first if the
+        disk file has changed.
+
+        Yields:
+            sqlite3.Connection: A read-only connection to the in-memory copy.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release()
+
+    def acquire(self) -> sqlite3.Connection:
+        """Non-context-manager form of reader(); every call must be paired with release()."""
+        owner = threading.get_ident()
+        depth = self._depth.get(owner, 0)
+        if depth:
+            # Nested read on this thread: it already holds the replica
+            self._depth[owner] = depth + 1
+            return self._local.conn
+
+        self._catch_up()
+        with self._cond:
+            while self._writing or self._waiting:
+                self._cond.wait()
+            self._readers += 1
+        self._depth[owner] = 1
+        return self._connection()
+
+    def current_version(self) -> int:
+        """
+        The data_version the replica's contents correspond to, after catching up
+        with the file if due. Used as the read cache's version while a replica
+        serves reads, so cached results never run ahead of (or behind) the replica.
+        """
+        if not self._depth.get(threading.get_ident()):
+            self._catch_up()
+        return self._version
+
+    def _catch_up(self):
+        if self._stale:
+            self.refresh()
+        elif time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_interval
+            if self._data_version() != self._version:
+                self.refresh()
+
+    def release(self, owner: int | None = None):
+        """
+        Undo one acquire(). `owner` is the ident of the thread that called acquire(),
+        for when the read is finished from another thread (defaults to this one).
+        """
+        owner = threading.get_ident() if owner is None else owner
+        depth = self._depth[owner] - 1
+        if depth:
+            self._depth[owner] = depth
+            return
+        del self._depth[owner]
+        with self._cond:
+            self._readers -= 1
+            if not self._readers and self._waiting:
+                self._cond.notify_all()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, "generation", None) != self._generation:
+            conn = self._open()
+            conn.execute("PRAGMA query_only = ON")
+            # Readers skip shared-cache table locks; the exclusive lock above
+            # already keeps them away from refreshes
+            conn.execute("PRAGMA read_uncommitted = ON")
+            self._local.conn = conn
+            self._local.generation = self._generation
+            self._connections.append(conn)
+        return self._local.conn
+
+    def _open(self, uri: str | None = None) -> sqlite3.Connection:
+        return sqlite3.connect(
+            uri or self._uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+
+    @contextmanager
+    def _exclusive(self):
+        with self._cond:
+            self._waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    # ---------------------- Refreshing ----------------------
+
+    def mark_stale(self):
+        """Refresh before the next read (called after this process writes to the file)."""
+        self._stale = True
+
+    def refresh(self):
+        """Bring the replica up to date with the disk file."""
+        with self._refresh_lock:
+            version = self._data_version()
+            if version == self._version and not self._stale:
+                return   # Another thread refreshed while we waited
+            # Cleared first, so a write landing during the refresh marks it again
+            self._stale = False
+            with self._exclusive():
+                anchor = self._anchor
+                try:
+                    last_id = anchor.execute("SELECT COALESCE(MAX(id), 0) FROM main.employees").fetchone()[0]
+                    # One transaction, so the copy and the check below see the same disk snapshot
+                    cursor = anchor.execute(
+                        "INSERT INTO main.employees (id, name, role, salary) "
+                        "SELECT id, name, role, salary FROM disk.employees WHERE id > ? ORDER BY id",
+                        (last_id,),
+                    )
+                    applied = cursor.rowcount
+                    in_step = (anchor.execute(_FINGERPRINT_SQL.format(db="main")).fetchone()
+                               == anchor.execute(_FINGERPRINT_SQL.format(db="disk")).fetchone())
+                    anchor.commit()
+                except sqlite3.Error:
+                    anchor.rollback()
+                    in_step = False
+            self.refreshes += 1
+            if in_step:
+                self.rows_applied += applied
+                self._version = version
+            else:
+                self._reload(version)
+
+    def _reload(self, version: int):
+        """Copy the whole file into a new in-memory database and swap it in."""
+        start = time.perf_counter()
+        uri = f"file:employees-replica-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        anchor = self._open(uri)
+        disk = sqlite3.connect(self.db_file)
+        try:
+            disk.backup(anchor)
+        finally:
+            disk.close()
+        # Appends are read straight from the file through this attachment
+        anchor.execute("ATTACH DATABASE ? AS disk", (Path(self.db_file).as_uri() + "?mode=ro",))
+
+        with self._exclusive():
+            old_anchor, old_connections = self._anchor, self._connections
+            self._uri, self._anchor, self._connections = uri, anchor, []
+            self._generation += 1
+            self._version = version
+        # No reader holds the old copy any more; closing its last connection frees it
+        for conn in old_connections:
+            conn.close()
+        if old_anchor is not None:
+            old_anchor.close()
+        self.loads += 1
+        self.last_load_seconds = time.perf_counter() - start
+
+    # ---------------------- Lifecycle ----------------------
+
+    def close(self):
+        """Close every connection to the in-memory copy, freeing it."""
+        with self._exclusive():
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+            self._generation += 1
+
+    def stats(self) -> dict:
+        """Counters suitable for returning from an MCP resource."""
+        return {
+            "enabled": True,
+            "data_version": self._version,
+            "poll_interval": self.poll_interval,
+            "loads": self.loads,
+            "last_load_seconds": round(self.last_load_seconds, 3),
+            "refreshes": self.refreshes,
+            "rows_applied": self.rows_applied,
+            "reader_connections": len(self._connections),
+        }
+
+
+def enable_replica(db_file: str = "employees.db") -> MemoryReplica:
+    """
+    Serve every read of `db_file` in this process from an in-memory replica.
+
+    Loads the replica now (so call it at start-up) and attaches it to the file's
+    shared ConnectionManager; writes still go to the disk file. The polling
+    interval can be set with EMPLOYEE_DB_REPLICA_POLL_MS.
+    """
+    manager = get_manager(db_file)
+    if manager.replica is None:
+        with manager.writer():
+            pass   # Creates or migrates the schema before it is copied
+        poll = float(os.environ.get("EMPLOYEE_DB_REPLICA_POLL_MS", DEFAULT_POLL_INTERVAL * 1000)) / 1000
+        manager.replica = MemoryReplica(db_file, manager.data_version, poll)
+    return manager.replica
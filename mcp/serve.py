@@ -0,0 +1,48 @@
+# argparse reads the transport options from the command line
+import argparse
+import os
+
+
+# Transports FastMCP can serve. stdio runs one server process per client; the two
+# HTTP transports let one long-lived process serve many clients, sharing its
+# connection pools, caches and metrics between them.
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+
+def parse_args(default_port: int, argv=None) -> argparse.Namespace:
+    """
+    Parse --transport/--host/--port, with MCP_TRANSPORT, MCP_HOST and MCP_PORT as defaults.
+
+    Args:
+        default_port (int): Port used when neither --port nor MCP_PORT is given.
+        argv (list[str] | None): Arguments to parse instead of sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Run this MCP server.")
+    parser.add_argument("--transport", choices=TRANSPORTS, default=os.environ.get("MCP_TRANSPORT", "stdio"),
+                        help="stdio (default), sse (served at /sse) or streamable-http (served at /mcp).")
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"),
+                        help="Interface to listen on for the HTTP transports.")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", default_port)),
+                        help="Port to listen on for the HTTP transports.")
+    parser.add_argument("--stream-responses", action="store_true",
+                        help="streamable-http only: answer every request with an SSE stream instead of "
+                             "a plain JSON body (only needed for progress/log notifications).")
+    return parser.parse_args(argv)
+
+
+def run_server(mcp, default_port: int, argv=None):
+    """
+    Run a FastMCP server on the transport chosen on the command line.
+
+    Usage:
+        python calculator_server.py                                    # stdio
+        python calculator_server.py --transport streamable-http --port 8000
+    """
+    args = parse_args(default_port, argv)
+    if args.transport != "stdio":
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        # None of our tools stream notifications, and a plain JSON response per request
+        # avoids opening an SSE stream for every call (roughly 1.5x the throughput)
+        mcp.settings.json_response = not args.stream_responses
+    mcp.run(transport=args.transport)
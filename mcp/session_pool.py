@@ -0,0 +1,319 @@
+# Import asyncio for tasks, queues and timeouts
+import asyncio
+
+# contextlib gives us an easy way to build "async with pool.session()" helpers
+from contextlib import asynccontextmanager
+
+# timedelta is what ClientSession expects for per-request read timeouts
+from datetime import timedelta
+
+# anyio raises these stream errors when the server process on the other end dies
+from anyio import BrokenResourceError, ClosedResourceError, EndOfStream
+
+# Import the MCP framework
+import mcp
+
+# httpx raises these when an HTTP server goes away; its status codes name the MCP read timeout
+from httpx import TransportError, codes
+
+# Raised by ClientSession for JSON-RPC errors, including timeouts and dropped connections
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+# Import the stdio-based client for interacting with MCP servers via subprocess/stdin/stdout
+from mcp.client.stdio import stdio_client
+
+# HTTP clients for servers started with --transport streamable-http or sse
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+
+# Seconds a tool call may take before its session is written off as stuck
+DEFAULT_CALL_TIMEOUT = 60.0
+
+# Errors meaning the connection itself is broken, rather than the call failing
+TRANSPORT_ERRORS = (ConnectionError, OSError, asyncio.TimeoutError, TransportError,
+                    BrokenResourceError, ClosedResourceError, EndOfStream)
+
+# ClientSession errors that leave a session unusable: the server did not answer in
+# time (it may be wedged) or the connection dropped while waiting
+_FATAL_MCP_ERRORS = (codes.REQUEST_TIMEOUT, CONNECTION_CLOSED)
+
+
+# -------------------- Connecting to a Server --------------------
+
+@asynccontextmanager
+async def open_transport(server):
+    """
+    Open the read/write streams to an MCP server.
+
+    Args:
+        server (StdioServerParameters | str): Launch parameters for a stdio server, or the
+            URL of a running one ("http://host:port/mcp" for streamable HTTP,
+            ".../sse" for SSE).
+
+    Yields:
+        tuple: (read_stream, write_stream) for mcp.ClientSession.
+    """
+    if isinstance(server, str):
+        if server.rstrip("/").endswith("/sse"):
+            async with sse_client(server) as (read, write):
+                yield read, write
+        else:
+            async with streamablehttp_client(server) as (read, write, _get_session_id):
+                yield read, write
+    else:
+        async with stdio_client(server) as streams:
+            yield streams
+
+
+# -------------------- A Single Warm Session --------------------
+
+class _PooledSession:
+    """
+    One long-lived MCP ClientSession, backed by its own server process (stdio) or
+    its own connection to a shared HTTP server.
+
+    The stdio transport and ClientSession are anyio context managers, which must be
+    entered and exited from the same task. So every pooled session owns a small
+    runner task that opens the connection, performs the handshake, and then simply
+    waits until it is asked to stop.
+    """
+
+    def __init__(self, server_params, connect_timeout: float):
+        self.server_params = server_params
+        self.connect_timeout = connect_timeout
+        self.session = None          # The live ClientSession (None while down)
+        self.in_use = False          # True while a caller holds this session
+        self.healthy = False         # False until the handshake completes
+        self._runner = None
+        self._ready = None
+        self._stop = None
+
+    async def start(self):
+        """Launch the server process (or connect) and wait for the MCP handshake to finish."""
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+        await asyncio.wait_for(self._ready.wait(), self.connect_timeout)
+        if not self.healthy:
+            raise ConnectionError("MCP server failed to start or complete the handshake.")
+
+    async def _run(self):
+        try:
+            async with open_transport(self.server_params) as streams:
+                async with mcp.ClientSession(*streams) as session:
+                    await session.initialize()
+                    self.session = session
+                    self.healthy = True
+                    self._ready.set()
+                    # Keep the connection open until stop() is called
+                    await self._stop.wait()
+        except Exception:
+            # A crashed server simply leaves this slot unhealthy; the pool restarts it
+            pass
+        finally:
+            self.session = None
+            self.healthy = False
+            self._ready.set()
+
+    async def stop(self):
+        """Close the session and terminate its server process."""
+        if self._runner is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._runner, self.connect_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._runner.cancel()
+        self._runner = None
+
+    async def restart(self):
+        """Throw away the current server process and start a fresh one."""
+        await self.stop()
+        await self.start()
+
+    async def ping(self, timeout: float) -> bool:
+        """Return True if the server answers a ping within `timeout` seconds."""
+        if not self.healthy or self.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            self.healthy = False
+            return False
+
+
+# -------------------- The Session Pool --------------------
+
+class MCPSessionPool:
+    """
+    A pool of warm MCP client sessions for one server.
+
+    Instead of spawning a server process and repeating the handshake for every
+    tool call, the pool keeps `size` sessions open and hands each call to an idle
+    one. Crashed sessions are restarted transparently and a background task pings
+    idle sessions so dead servers are noticed before a caller hits them. A call
+    that finds its server dead is retried once on a fresh session; a call that
+    times out is not retried, but its session is restarted before it is used again.
+
+    Usage:
+        async with MCPSessionPool(params, size=4) as pool:
+            result = await pool.call_tool("add", {"a": 1, "b": 2})
+    """
+
+    def __init__(
+        self,
+        server_params,
+        size: int = 4,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        connect_timeout: float = 60.0,
+        call_timeout: float | None = DEFAULT_CALL_TIMEOUT,
+    ):
+        """
+        Args:
+            server_params (StdioServerParameters | str): How to launch the MCP server,
+                or the URL of a server already running with an HTTP transport.
+            size (int): Number of warm sessions to keep open.
+            health_check_interval (float): Seconds between background pings (0 disables).
+            ping_timeout (float): Seconds to wait for a ping reply before restarting.
+            connect_timeout (float): Seconds allowed for server start-up and handshake.
+            call_timeout (float | None): Seconds to wait for each call's reply
+                (None waits forever, so a hung server holds its session for good).
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.server_params = server_params
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        self._slots = []
+        self._idle = None
+        self._health_task = None
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    # -------------------- Lifecycle --------------------
+
+    async def start(self):
+        """Start all sessions concurrently and launch the health checker."""
+        async with self._start_lock:
+            if self._started:
+                return self
+            self._idle = asyncio.Queue()
+            self._slots = [_PooledSession(self.server_params, self.connect_timeout) for _ in range(self.size)]
+            results = await asyncio.gather(*(slot.start() for slot in self._slots), return_exceptions=True)
+            failures = [r for r in results if isinstance(r, BaseException)]
+            if len(failures) == len(self._slots):
+                await asyncio.gather(*(slot.stop() for slot in self._slots), return_exceptions=True)
+                raise ConnectionError(f"Could not start any MCP session: {failures[0]!r}")
+            # Slots that failed to start stay unhealthy and are restarted on first borrow
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+            if self.health_check_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+            self._started = True
+            return self
+
+    async def close(self):
+        """Stop the health checker and shut down every server process."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(*(slot.stop() for slot in self._slots), return_exceptions=True)
+        self._slots = []
+        self._started = False
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # -------------------- Checking Sessions In and Out --------------------
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Borrow an idle session for the duration of an `async with` block.
+
+        Yields:
+            mcp.ClientSession: A ready-to-use, initialized session.
+        """
+        if not self._started:
+            await self.start()
+        slot = await self._idle.get()
+        slot.in_use = True
+        try:
+            if not slot.healthy:
+                await slot.restart()
+            yield slot.session
+        except TRANSPORT_ERRORS:
+            # Transport-level failure: the server is gone, bring up a new one
+            slot.healthy = False
+            raise
+        except McpError as e:
+            if e.error.code in _FATAL_MCP_ERRORS:
+                slot.healthy = False
+            raise
+        finally:
+            slot.in_use = False
+            self._idle.put_nowait(slot)
+
+    async def _request(self, send):
+        """
+        Run `await send(session)` on an idle session. If the session turns out to be
+        dead (its server exited since it was last used), the request is sent once
+        more on a freshly started one.
+        """
+        try:
+            async with self.session() as session:
+                return await send(session)
+        except TRANSPORT_ERRORS:
+            pass
+        except McpError as e:
+            if e.error.code != CONNECTION_CLOSED:
+                raise
+        async with self.session() as session:
+            return await send(session)
+
+    async def call_tool(self, tool_name: str, tool_args: dict):
+        """Invoke a tool on an idle session and return the CallToolResult."""
+        timeout = timedelta(seconds=self.call_timeout) if self.call_timeout else None
+        return await self._request(
+            lambda session: session.call_tool(tool_name, tool_args, read_timeout_seconds=timeout)
+        )
+
+    async def list_tools(self):
+        """Return the server's Tool objects using an idle session."""
+        return (await self._request(lambda session: session.list_tools())).tools
+
+    # -------------------- Health Checks --------------------
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            # Only probe sessions nobody is using; busy ones prove themselves. Each
+            # one is checked out of the idle queue while it is probed, so a caller
+            # can never borrow a session that is being pinged or restarted.
+            for _ in range(self._idle.qsize()):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                slot.in_use = True
+                try:
+                    if not await slot.ping(self.ping_timeout):
+                        try:
+                            await slot.restart()
+                        except Exception:
+                            # Leave it unhealthy; the next borrower retries the restart
+                            slot.healthy = False
+                finally:
+                    slot.in_use = False
+                    self._idle.put_nowait(slot)
+
@@ -0,0 +1,249 @@
+import contextvars  # Scatter tasks keep the caller's context (e.g. the per-call SQLite timer)
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait  # Runs one query per shard in parallel
+
+
+# A sharded database is described by "<db_file>.shards.json" next to it. When the
+# manifest exists, Employee and EmployeeDB calls made with that db_file are routed
+# to the shard files it lists instead of the file itself.
+MANIFEST_SUFFIX = ".shards.json"
+
+# Bumped whenever the manifest layout changes
+MANIFEST_FORMAT = 1
+
+# IDs handed out to one process at a time for single-row inserts. Unused IDs of a
+# block are skipped when the process exits, which leaves gaps but never duplicates.
+ID_BLOCK_SIZE = 1000
+
+# Fibonacci hashing spreads consecutive IDs evenly over the shards
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def manifest_path(db_file: str) -> str:
+    return db_file + MANIFEST_SUFFIX
+
+
+class IdAllocator:
+    """
+    Globally unique employee IDs for every process writing to a sharded database.
+
+    The next free ID lives in a small SQLite file of its own. A process reserves
+    a block of IDs in one short transaction and hands them out from memory, so
+    allocating is a lock-free counter bump almost every time.
+    """
+
+    def __init__(self, path: str, block_size: int = ID_BLOCK_SIZE):
+        """
+        Args:
+            path (str): The allocator's SQLite file.
+            block_size (int): IDs reserved per round trip for small requests.
+        """
+        self.path = path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._conn = None
+        self._next = 0
+        self._end = 0
+
+    @staticmethod
+    def create(path: str, next_id: int = 1):
+        """Create the allocator file, starting at `next_id`."""
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS id_allocator (next_id INTEGER NOT NULL)")
+            conn.execute("DELETE FROM id_allocator")
+            conn.execute("INSERT INTO id_allocator (next_id) VALUES (?)", (next_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _reserve(self, count: int) -> int:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        # IMMEDIATE takes the write lock up front, so two processes never read the same value
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            first = self._conn.execute("SELECT next_id FROM id_allocator").fetchone()[0]
+            self._conn.execute("UPDATE id_allocator SET next_id = ?", (first + count,))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return first
+
+    def allocate(self, count: int = 1) -> range:
+        """Return `count` consecutive, never-before-used IDs."""
+        with self._lock:
+            if count > self._end - self._next:
+                if count >= self.block_size:
+                    # Large requests (bulk loads) get a range of their own
+                    first = self._reserve(count)
+                    return range(first, first + count)
+                self._next = self._reserve(self.block_size)
+                self._end = self._next + self.block_size
+            first = self._next
+            self._next += count
+            return range(first, first + count)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ShardedStore:
+    """
+    Employees spread over several SQLite files by a hash of their ID.
+
+    Every shard is a complete employees database (same schema, indexes, triggers
+    and full-text index), so each holds one SQLite writer lock of its own and
+    writes to different shards proceed in parallel. IDs come from one shared
+    IdAllocator, so they stay unique across shards and processes.
+
+    - Point lookups go to the single shard that owns the ID (shard_for).
+    - Scans, searches and aggregates run once per shard on a thread pool
+      (scatter) and the caller merges the partial results.
+    """
+
+    def __init__(self, db_file: str, shard_files: list, ids_file: str):
+        """
+        Args:
+            db_file (str): The logical database path callers pass around.
+            shard_files (list): Paths of the shard files, in shard order.
+            ids_file (str): Path of the IdAllocator file.
+        """
+        self.db_file = db_file
+        self.shards = list(shard_files)
+        self.ids = IdAllocator(ids_file)
+        self._pool = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard")
+
+    # ---------------------- Manifest ----------------------
+
+    @classmethod
+    def load(cls, db_file: str):
+        """Return the store described by `db_file`'s manifest, or None if it is not sharded."""
+        try:
+            with open(manifest_path(db_file)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported shard manifest format in {manifest_path(db_file)}.")
+        base = os.path.dirname(os.path.abspath(db_file))
+        return cls(
+            db_file,
+            [os.path.join(base, name) for name in manifest["shards"]],
+            os.path.join(base, manifest["ids"]),
+        )
+
+    def save(self):
+        """Atomically write the manifest, which makes the sharding visible to other processes."""
+        base = os.path.dirname(os.path.abspath(self.db_file))
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "shards": [os.path.relpath(s, base) for s in self.shards],
+            "ids": os.path.relpath(self.ids.path, base),
+        }
+        fd, tmp = tempfile.mkstemp(dir=base, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, manifest_path(self.db_file))
+
+    # ---------------------- Routing ----------------------
+
+    def shard_for(self, emp_id: int) -> str:
+        """The shard file that owns `emp_id`."""
+        return self.shards[(((emp_id * _HASH_MULTIPLIER) & _MASK64) >> 32) % len(self.shards)]
+
+    def allocate_ids(self, count: int = 1) -> range:
+        """Reserve `count` consecutive globally unique IDs."""
+        return self.ids.allocate(count)
+
+    def scatter(self, fn, items=None) -> list:
+        """
+        Run `fn(item)` for every item (default: every shard file) in parallel.
+
+        Returns:
+            list: The results, in the same order as the items. The first
+            exception raised by any call is re-raised once all have finished.
+        """
+        items = self.shards if items is None else list(items)
+        if not items:
+            return []
+        # The calling thread takes the first item itself instead of idling
+        futures = [self._pool.submit(contextvars.copy_context().run, fn, item) for item in items[1:]]
+        try:
+            first = fn(items[0])
+        finally:
+            wait(futures)
+        return [first] + [future.result() for future in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.ids.close()
+
+
+# ---------------------- Shared Stores ----------------------
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_file: str = "employees.db"):
+    """
+    Return the ShardedStore for `db_file`, or None if it is a plain database file.
+
+    The manifest is read once per process; sharding a database that other
+    processes have open requires restarting them.
+    """
+    try:
+        return _stores[db_file]
+    except KeyError:
+        pass
+    with _stores_lock:
+        if db_file not in _stores:
+            _stores[db_file] = ShardedStore.load(db_file)
+        return _stores[db_file]
+
+
+def create_shards(db_file: str, count: int, next_id: int = 1, publish: bool = True) -> ShardedStore:
+    """
+    Lay out a sharded database: `count` shard files named after `db_file` and an
+    ID allocator starting at `next_id`.
+
+    The shard files get their schema on first use. With publish=False the manifest
+    is not written yet, so the files can be filled before anyone routes to them;
+    call publish_store() afterwards.
+
+    Raises:
+        ValueError: If `count` is below 1, `db_file` is already sharded, or shard
+            files from an earlier layout are still there.
+    """
+    if count < 1:
+        raise ValueError("A sharded database needs at least one shard.")
+    if os.path.exists(manifest_path(db_file)):
+        raise ValueError(f"{db_file} is already sharded.")
+    stem, ext = os.path.splitext(os.path.abspath(db_file))
+    ids_file = f"{stem}.ids{ext or '.db'}"
+    shard_files = [f"{stem}.shard{i}{ext or '.db'}" for i in range(count)]
+    leftovers = [f for f in shard_files if os.path.exists(f)]
+    if leftovers:
+        raise ValueError(f"Shard files already exist: {', '.join(leftovers)}")
+    IdAllocator.create(ids_file, next_id)
+    store = ShardedStore(db_file, shard_files, ids_file)
+    if publish:
+        publish_store(store)
+    return store
+
+
+def publish_store(store: ShardedStore):
+    """Write `store`'s manifest and route this process's calls for its db_file to it."""
+    store.save()
+    with _stores_lock:
+        _stores[store.db_file] = store
@@ -0,0 +1,237 @@
+import sqlite3  # Standard Python library for interacting with SQLite databases
+import threading  # Per-thread reader connections and the writer lock
+import time
+from contextlib import contextmanager  # Lets callers write "with manager.reader() as conn:"
+
+from metrics import add_sqlite_time  # Credits time spent holding a connection to the current tool call
+
+
+# Pragmas applied to every connection we open.
+#   journal_mode=WAL   readers never block the writer and vice versa
+#   synchronous=NORMAL safe with WAL and avoids an fsync on every commit
+#   cache_size=-65536  64 MiB page cache per connection (negative means KiB)
+#   mmap_size          let SQLite read pages through a memory map
+#   temp_store=MEMORY  sorts and temp indexes stay off disk
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# Number of prepared statements sqlite3 keeps compiled per connection
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionManager:
+    """
+    Shared access to one SQLite database file.
+
+    Opening a connection and re-applying pragmas costs far more than a primary-key
+    lookup, so connections are opened once and reused:
+
+    - Readers check a connection out of a pool of at most `max_readers` and
+      return it when done. A semaphore makes callers wait once all are checked
+      out, so the number of open connections stays bounded however many threads
+      read over the process's lifetime. A nested read on the same thread reuses
+      the connection it already holds, without taking a second slot. Do not keep
+      a reader open across a generator's yield: the generator may be resumed or
+      finalized on another thread.
+    - All writes go through a single connection guarded by a lock, which matches
+      SQLite's one-writer model and avoids "database is locked" retries.
+
+    sqlite3 caches prepared statements per connection (keyed by SQL text), so
+    reusing connections also reuses compiled statements.
+    """
+
+    def __init__(self, db_file: str, max_readers: int = 8, pragmas: dict | None = None, on_create=None):
+        """
+        Args:
+            db_file (str): Path to the SQLite database file.
+            max_readers (int): Maximum number of threads allowed to read at once.
+            pragmas (dict | None): Overrides for DEFAULT_PRAGMAS.
+            on_create (callable | None): Called once with the writer connection right
+                after it is opened, e.g. to create or migrate the schema.
+        """
+        self.db_file = db_file
+        self.max_readers = max_readers
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self._on_create = on_create
+        self._held = {}                     # Thread ident -> the connection that thread has checked out
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self._readers = []                  # Every reader connection, so close() can find them
+        self._idle_readers = []             # Reader connections not checked out (at most max_readers)
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._watcher = None                # Dedicated connection for PRAGMA data_version
+        self._watcher_lock = threading.Lock()
+        self.replica = None                 # In-memory copy serving reads, if enabled (see replica.py)
+
+    # ---------------------- Opening Connections ----------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file,
+            check_same_thread=False,           # The writer is shared across threads (under a lock)
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self._connect()
+            if self._on_create is not None:
+                self._on_create(self._writer)
+                self._writer.commit()
+        return self._writer
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        # Called holding a reader slot, so fewer than max_readers connections are
+        # checked out: either one is idle or another may be opened
+        with self._readers_lock:
+            if self._idle_readers:
+                return self._idle_readers.pop()   # Most recently used, so its cache is warm
+        # Make sure the schema exists before the first read from a fresh file
+        with self._writer_lock:
+            self._get_writer()
+        conn = self._connect()
+        with self._readers_lock:
+            self._readers.append(conn)
+        return conn
+
+    def _checkin_reader(self, conn: sqlite3.Connection):
+        with self._readers_lock:
+            if conn in self._readers:   # Not closed by close() meanwhile
+                self._idle_readers.append(conn)
+
+    # ---------------------- Public API ----------------------
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a read connection from the pool.
+
+        When an in-memory replica is attached, the connection reads from it
+        instead of the file.
+
+        Yields:
+            sqlite3.Connection: A connection for SELECT queries only.
+        """
+        owner = threading.get_ident()
+        held = self._held.get(owner)
+        if held is not None:
+            # Nested read: this thread already holds a slot and a connection (to
+            # the file or the replica). Taking a second slot could deadlock.
+            yield held
+            return
+        with self._reader_slots:
+            start = time.perf_counter()
+            try:
+                replica = self.replica
+                conn = self._checkout_reader() if replica is None else replica.acquire()
+                self._held[owner] = conn
+                try:
+                    yield conn
+                finally:
+                    # Release under the thread that checked the connection out, even
+                    # if this block is being closed from another thread
+                    if self._held.get(owner) is conn:
+                        del self._held[owner]
+                    if replica is None:
+                        self._checkin_reader(conn)
+                    else:
+                        replica.release(owner)
+            finally:
+                add_sqlite_time(time.perf_counter() - start)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        reader() inside one read transaction, so every query in the block sees the
+        same committed data. Otherwise each statement gets a snapshot of its own,
+        and a count taken by one query may not match the rows seen by the next.
+
+        Yields:
+            sqlite3.Connection: A connection for SELECT queries only.
+        """
+        with self.reader() as conn:
+            if conn.in_transaction:
+                # Nested in another snapshot on this connection: already consistent
+                yield conn
+                return
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+
+    @contextmanager
+    def writer(self):
+        """
+        Hold the single write connection inside a transaction.
+
+        Commits when the block exits normally and rolls back if it raises.
+
+        Yields:
+            sqlite3.Connection: The shared write connection.
+        """
+        with self._writer_lock:
+            start = time.perf_counter()
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                add_sqlite_time(time.perf_counter() - start)
+
+    def data_version(self) -> int:
+        """
+        Return SQLite's data_version as seen by a dedicated connection.
+
+        The value changes whenever any other connection commits to the file,
+        including this manager's writer and other processes, which makes it a
+        cheap way to tell whether cached reads are still valid.
+        """
+        with self._watcher_lock:
+            if self._watcher is None:
+                with self._writer_lock:
+                    self._get_writer()
+                self._watcher = self._connect()
+            return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def read_version(self) -> int:
+        """
+        Version of the data that reader() connections see: the file's data_version,
+        or the version an attached in-memory replica has caught up to.
+        """
+        replica = self.replica
+        if replica is not None:
+            return replica.current_version()
+        return self.data_version()
+
+    def close(self):
+        """Close every connection this manager has opened."""
+        if self.replica is not None:
+            self.replica.close()
+            self.replica = None
+        with self._watcher_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+            self._idle_readers = []
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The servers import their modules flat (`from datastore import EmployeeDB`), as
+# they do when run from the mcp/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The servers open their database at import time; point them at a scratch file
+# rather than the employees.db checked into the repository
+os.environ.setdefault("EMPLOYEE_DB", os.path.join(tempfile.mkdtemp(prefix="employee-tests-"), "employees.db"))
+
+from datastore import EmployeeDB  # noqa: E402
+
+
+@pytest.fixture
+def db_file(tmp_path) -> str:
+    """An empty, fully migrated employee database of the test's own."""
+    path = str(tmp_path / "employees.db")
+    EmployeeDB(path)
+    return path
+
+
+@pytest.fixture
+def seeded_db(db_file) -> str:
+    """db_file with 100 employees spread over four roles (IDs 1-100)."""
+    roles = ["Engineer", "Manager", "Analyst", "Designer"]
+    EmployeeDB(db_file).bulk_add_employees(
+        {"name": f"Employee {i}", "role": roles[i % len(roles)], "salary": 1000.0 * i}
+        for i in range(1, 101)
+    )
+    return db_file
@@ -0,0 +1,30 @@
+# A minimal stdio MCP server for the session pool tests
+import os
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("echo")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Return `text` unchanged."""
+    return text
+
+
+@mcp.tool()
+def pid() -> int:
+    """The server's process ID."""
+    return os.getpid()
+
+
+@mcp.tool()
+def hang(seconds: float) -> str:
+    """Block the server for `seconds` seconds."""
+    time.sleep(seconds)
+    return "done"
+
+
+if __name__ == "__main__":
+    mcp.run()
@@ -0,0 +1,94 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import employee_server
+from datastore import BulkLoadError, EmployeeDB, migrate, shard_database
+from employee import Employee
+
+
+def _rows(n: int, start: int = 0):
+    return [{"name": f"Bulk {i}", "role": "Tester", "salary": float(i)} for i in range(start, start + n)]
+
+
+def _indexes(db_file: str) -> set:
+    conn = sqlite3.connect(db_file)
+    try:
+        return {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL")}
+    finally:
+        conn.close()
+
+
+def test_chunked_load_reports_id_ranges(db_file):
+    result = EmployeeDB(db_file).bulk_add_employees(_rows(250), chunk_size=100)
+    assert result["inserted"] == 250 and result["id_ranges"] == [[1, 250]]
+    assert len(Employee.get_all(db_file)) == 250
+
+
+def test_failed_load_keeps_committed_chunks(db_file):
+    rows = _rows(250)
+    rows[220]["salary"] = "a lot"
+    with pytest.raises(BulkLoadError) as info:
+        EmployeeDB(db_file).bulk_add_employees(rows, chunk_size=100)
+    assert info.value.result["inserted"] == 200
+    assert info.value.result["id_ranges"] == [[1, 200]]
+    assert "a lot" not in str(info.value)   # Rows are not echoed back
+    assert len(Employee.get_all(db_file)) == 200
+
+
+def test_sharded_failure_reports_exact_ids(seeded_db):
+    shard_database(seeded_db, shards=3)
+    rows = _rows(150)
+    rows[120]["name"] = ""
+    with pytest.raises(BulkLoadError) as info:
+        EmployeeDB(seeded_db).bulk_add_employees(rows, chunk_size=100)
+    committed = [i for first, last in info.value.result["id_ranges"] for i in range(first, last + 1)]
+    assert len(committed) == info.value.result["inserted"] == 100
+    assert {e.id for e in Employee.get_all(seeded_db)} >= set(committed)
+
+
+def test_deferred_indexes_are_rebuilt(seeded_db):
+    before = _indexes(seeded_db)
+    EmployeeDB(seeded_db).bulk_add_employees(_rows(500), chunk_size=100, defer_indexes=True)
+    assert _indexes(seeded_db) == before
+    # Rows loaded while the full-text triggers were off are searchable
+    assert [e["name"] for e in Employee.find("Bulk 499", db_file=seeded_db)][:1] == ["Bulk 499"]
+
+
+def test_deferred_indexes_survive_a_crash(seeded_db):
+    before = _indexes(seeded_db)
+    EmployeeDB(seeded_db)._defer_indexes()   # The process dies mid-load
+    assert _indexes(seeded_db) < before
+
+    # The next process to open the file restores them
+    conn = sqlite3.connect(seeded_db)
+    try:
+        migrate(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    assert _indexes(seeded_db) == before
+
+
+@pytest.fixture
+def imports(tmp_path, db_file, monkeypatch):
+    directory = tmp_path / "imports"
+    directory.mkdir()
+    monkeypatch.setenv("EMPLOYEE_IMPORT_DIR", str(directory))
+    monkeypatch.setattr(employee_server, "DB_FILE", db_file)
+    return directory
+
+
+def test_tool_loads_files_from_the_import_dir(imports):
+    (imports / "people.csv").write_text("name,role,salary\nAda,Engineer,100\nGrace,Admiral,200\n")
+    (imports / "people.ndjson").write_text('{"name": "Linus", "role": "Engineer", "salary": 300}\n')
+    assert asyncio.run(employee_server.bulk_add_employees(path="people.csv"))["inserted"] == 2
+    assert asyncio.run(employee_server.bulk_add_employees(path="people.ndjson"))["inserted"] == 1
+
+
+@pytest.mark.parametrize("path", ["../employees.db", "/etc/passwd", "people.txt", "missing.csv"])
+def test_tool_refuses_paths_outside_the_import_dir(imports, path):
+    result = asyncio.run(employee_server.bulk_add_employees(path=path))
+    assert "error" in result and "inserted" not in result
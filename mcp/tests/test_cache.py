@@ -0,0 +1,79 @@
+import sqlite3
+import time
+
+from cache import MISSING, LRUCache, VersionedCache
+from datastore import get_read_cache
+from employee import Employee
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_version_is_polled_at_most_every_interval():
+    calls = []
+
+    def version():
+        calls.append(1)
+        return 1
+
+    cache = VersionedCache(version, poll_interval=60)
+    cache.set("a", 1, cache.version)
+    for _ in range(100):
+        cache.get("a")
+    assert len(calls) == 1
+
+    # A local write invalidates directly and the next lookup asks again
+    cache.invalidate()
+    assert cache.get("a") is MISSING
+    assert len(calls) == 2
+
+
+def test_version_change_empties_the_cache():
+    versions = iter([1, 2])
+    cache = VersionedCache(lambda: next(versions), poll_interval=0)
+    cache.get("a")
+    cache.set("a", "old", cache.version)
+    assert cache.get("a") is MISSING
+
+
+def test_result_read_before_a_write_is_not_cached():
+    cache = VersionedCache(lambda: 1)
+    cache.get("a")
+    version = cache.version
+    cache.invalidate()   # A write lands while the query runs
+    cache.set("a", "stale", version)
+    assert cache.get("a") is MISSING
+
+
+def test_commit_from_another_connection_invalidates(seeded_db):
+    cache = get_read_cache(seeded_db)
+    assert Employee.get_by_id(1, seeded_db).name == "Employee 1"
+    assert cache.get(("id", 1)) is not MISSING
+
+    # Another process (here: a separate connection) renames the employee
+    conn = sqlite3.connect(seeded_db)
+    conn.execute("UPDATE employees SET name = 'Renamed' WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    time.sleep(cache.poll_interval * 2)
+    assert Employee.get_by_id(1, seeded_db).name == "Renamed"
+
+
+def test_local_write_is_seen_immediately(seeded_db):
+    cache = get_read_cache(seeded_db)
+    interval, cache.poll_interval = cache.poll_interval, 60
+    try:
+        before = Employee.get_all(seeded_db)
+        Employee.add_employee("Ada", "Engineer", 100.0, db_file=seeded_db)
+        assert len(Employee.get_all(seeded_db)) == len(before) + 1
+    finally:
+        cache.poll_interval = interval
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import calculator_server
+import employee_server
+from compact import decode_table, dumps, encode_table, expand, expand_result
+
+ROWS = [
+    {"id": 1, "name": "Ada", "role": "Engineer", "salary": 100.0},
+    {"id": 2, "name": "Grace", "role": "Admiral", "salary": 200.0},
+    {"id": 3, "name": "Linus", "role": "Engineer", "salary": 300.5},
+]
+COLUMNS = ("id", "name", "role", "salary")
+
+
+def test_table_round_trip():
+    table = encode_table(ROWS, COLUMNS, dictionary=("role",))
+    assert table["rows"][2] == [3, "Linus", 0, 300.5]
+    assert table["dictionaries"] == {"role": ["Engineer", "Admiral"]}
+    # Through JSON and back, as a client receives it
+    assert decode_table(json.loads(dumps(table))) == ROWS
+
+
+def test_tuple_rows_and_empty_tables():
+    tuples = [tuple(r[c] for c in COLUMNS) for r in ROWS]
+    assert decode_table(encode_table(tuples, COLUMNS)) == ROWS
+    assert decode_table(encode_table([], COLUMNS, dictionary=("role",))) == []
+
+
+def test_expand_finds_nested_tables():
+    value = {"employees": encode_table(ROWS, COLUMNS, dictionary=("role",)), "next_cursor": None}
+    assert expand(json.loads(dumps(value))) == {"employees": ROWS, "next_cursor": None}
+
+
+async def _call(server, tool: str, args: dict):
+    async with create_connected_server_and_client_session(server._mcp_server) as session:
+        return await session.call_tool(tool, args)
+
+
+@pytest.mark.parametrize("server, tool, args", [
+    (employee_server.mcp, "get_all_employees", {}),
+    (employee_server.mcp, "get_employees_page", {"limit": 30}),
+    (employee_server.mcp, "employee_stats_by_role", {}),
+    (calculator_server.mcp, "batch_eval", {"op": "divide", "a": [1, 2, 3, 4], "b": [1, 0, 2, 0]}),
+])
+def test_expanded_results_match_the_default_encoding(seeded_db, monkeypatch, server, tool, args):
+    monkeypatch.setattr(employee_server, "DB_FILE", seeded_db)
+    default = asyncio.run(_call(server, tool, args))
+    compact = asyncio.run(_call(server, tool, {**args, "compact": True}))
+    assert len(compact.content[0].text) < sum(len(c.text) for c in default.content)
+    assert expand_result(compact).content == default.content
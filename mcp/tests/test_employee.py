@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+
+import pytest
+
+from datastore import shard_database
+from employee import Employee, decode_cursor, encode_cursor
+
+
+def test_percentiles_interpolate(seeded_db):
+    # Salaries 1000, 2000, ..., 100000
+    result = Employee.salary_percentiles([0, 50, 100], db_file=seeded_db)
+    assert result == {"count": 100, "percentiles": {"0": 1000.0, "50": 50500.0, "100": 100000.0}}
+    assert Employee.salary_percentiles([50], role="Nobody", db_file=seeded_db)["percentiles"] == {"50": None}
+
+
+def test_sharded_percentiles_match_single_file(seeded_db):
+    expected = Employee.salary_percentiles([10, 50, 99], db_file=seeded_db)
+    shard_database(seeded_db, shards=3)
+    assert Employee.salary_percentiles([10, 50, 99], db_file=seeded_db) == expected
+
+
+def test_percentiles_under_concurrent_deletes(seeded_db):
+    # Another connection keeps deleting and restoring every Manager, so the role's
+    # row count changes between any two statements that are not in one snapshot
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        conn = sqlite3.connect(seeded_db, timeout=10)
+        rows = conn.execute("SELECT id, name, role, salary FROM employees WHERE role = 'Manager'").fetchall()
+        try:
+            while not stop.is_set():
+                conn.execute("DELETE FROM employees WHERE role = 'Manager'")
+                conn.commit()
+                conn.executemany("INSERT INTO employees (id, name, role, salary) VALUES (?, ?, ?, ?)", rows)
+                conn.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=churn)
+    thread.start()
+    try:
+        for _ in range(300):
+            result = Employee.salary_percentiles([0, 50, 100], role="Manager", db_file=seeded_db)
+            values = result["percentiles"]
+            if result["count"] == 0:
+                assert set(values.values()) == {None}
+            else:
+                assert result["count"] == 25
+                assert values["0"] <= values["50"] <= values["100"]
+    finally:
+        stop.set()
+        thread.join()
+    assert not errors
+
+
+def _all_pages(db_file: str, limit: int) -> list:
+    pages, after_id = [], 0
+    while True:
+        page, cursor = Employee.get_page(after_id, limit, db_file, raw=True)
+        pages.append([e["id"] for e in page])
+        if cursor is None:
+            return pages
+        after_id = decode_cursor(cursor)
+
+
+def test_pages_cover_every_row_once(seeded_db):
+    pages = _all_pages(seeded_db, 30)
+    assert [len(p) for p in pages] == [30, 30, 30, 10]
+    assert sum(pages, []) == list(range(1, 101))
+    # An exact multiple of the limit ends without an empty extra page
+    assert [len(p) for p in _all_pages(seeded_db, 50)] == [50, 50]
+
+
+def test_sharded_pages_match_single_file(seeded_db):
+    expected = _all_pages(seeded_db, 30)
+    shard_database(seeded_db, shards=3)
+    assert _all_pages(seeded_db, 30) == expected
+
+
+def test_page_limit_must_be_positive(seeded_db):
+    with pytest.raises(ValueError):
+        Employee.get_page(limit=0, db_file=seeded_db)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(5)[:-2] + "!!"])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_tool_follows_cursors(seeded_db, monkeypatch):
+    import asyncio
+
+    import employee_server
+
+    monkeypatch.setattr(employee_server, "DB_FILE", seeded_db)
+    ids, cursor = [], None
+    while True:
+        page = asyncio.run(employee_server.get_employees_page(cursor, limit=40))
+        ids += [e["id"] for e in page["employees"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == list(range(1, 101))
+    assert "error" in asyncio.run(employee_server.get_employees_page(limit=0))
+    assert "error" in asyncio.run(employee_server.get_employees_page("garbage"))
+
+
+@pytest.mark.parametrize("prefix, matches", [
+    ("Employee 1", 12),           # 1, 10-19, 100
+    ("Employee 99", 1),
+    ("Zed", 0),
+    ("\U0010ffff", 1),            # The highest code point: no upper bound
+    ("Emp\ud7ff", 1),             # The next character would be a surrogate
+])
+def test_search_by_name_prefix(seeded_db, prefix, matches):
+    from datastore import EmployeeDB
+
+    EmployeeDB(seeded_db).add_employee("\U0010ffff\U0010ffffmax", "Analyst", 1.0)
+    EmployeeDB(seeded_db).add_employee("Emp\ud7ffx", "Analyst", 1.0)
+    found = Employee.search(name_prefix=prefix, limit=200, db_file=seeded_db, raw=True)
+    assert len(found) == matches
+    assert all(e["name"].startswith(prefix) for e in found)
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+import employee_server
+from write_queue import WriteQueue
+
+
+class _StuckQueue:
+    """A write queue whose committer has taken the row but never finishes."""
+
+    def __init__(self, running: bool):
+        self.running = running
+
+    def submit(self, name, role, salary):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        return future
+
+    def is_running(self) -> bool:
+        return self.running
+
+
+@pytest.fixture
+def queue(db_file, monkeypatch):
+    queue = WriteQueue(db_file)
+    monkeypatch.setattr(employee_server, "writes", queue)
+    yield queue
+    queue.close(timeout=5)
+
+
+def test_add_employee_returns_id(queue):
+    result = asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0))
+    assert result["id"] > 0
+
+
+def test_pending_only_while_committer_is_alive(monkeypatch):
+    monkeypatch.setattr(employee_server, "WRITE_TIMEOUT", 0.01)
+    monkeypatch.setattr(employee_server, "writes", _StuckQueue(running=True))
+    assert asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0))["pending"] is True
+
+    monkeypatch.setattr(employee_server, "writes", _StuckQueue(running=False))
+    result = asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0))
+    assert "error" in result and "pending" not in result
+
+
+def test_enqueue_needs_a_live_committer(monkeypatch):
+    monkeypatch.setattr(employee_server, "writes", _StuckQueue(running=True))
+    assert asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0, durability="enqueue"))["queued"]
+
+    monkeypatch.setattr(employee_server, "writes", _StuckQueue(running=False))
+    result = asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0, durability="enqueue"))
+    assert "error" in result and "queued" not in result
+
+
+def test_failed_commit_is_reported(queue, monkeypatch):
+    import sqlite3
+    import write_queue
+
+    def broken_store(db_file):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(write_queue, "get_store", broken_store)
+    result = asyncio.run(employee_server.add_employee("Ada", "Engineer", 100.0))
+    assert "error" in result
@@ -0,0 +1,60 @@
+import asyncio
+import csv
+import json
+
+import numpy as np
+import pytest
+
+import employee_server
+from datastore import EmployeeDB, export_employees, read_columnar_export
+
+
+def test_ndjson_and_csv_exports_hold_every_row(seeded_db, tmp_path):
+    for fmt in ("ndjson", "csv"):
+        result = export_employees(seeded_db, fmt, out_dir=str(tmp_path / fmt), rows_per_file=30)
+        assert result["rows"] == 100 and [f["rows"] for f in result["files"]] == [30, 30, 30, 10]
+        ids = []
+        for f in result["files"]:
+            with open(f["path"], encoding="utf-8") as fh:
+                rows = [json.loads(line) for line in fh] if fmt == "ndjson" else list(csv.DictReader(fh))
+            ids.extend(int(r["id"]) for r in rows)
+        assert ids == list(range(1, 101))
+
+
+def test_columnar_round_trip_past_65536_roles(db_file, tmp_path):
+    # More distinct roles than uint16 codes can address; the first batches are
+    # still coded as uint16 and must be widened when the file is written
+    n = 70_000
+    EmployeeDB(db_file).bulk_add_employees(
+        {"name": f"Employee {i}", "role": f"Role {i}", "salary": float(i)} for i in range(n)
+    )
+    result = export_employees(db_file, "columnar", out_dir=str(tmp_path), batch_size=10_000)
+    path = result["files"][0]["path"]
+    with np.load(path) as data:
+        assert data["role_codes"].dtype == np.uint32
+
+    rows = list(read_columnar_export(path))
+    assert len(rows) == n
+    assert rows[0] == {"id": 1, "name": "Employee 0", "role": "Role 0", "salary": 0.0}
+    assert rows[-1] == {"id": n, "name": f"Employee {n - 1}", "role": f"Role {n - 1}", "salary": float(n - 1)}
+    assert all(r["role"] == f"Role {r['id'] - 1}" for r in rows)
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMPLOYEE_EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_read_export_returns_file_contents(export_dir):
+    (export_dir / "employees-1.ndjson").write_text('{"id": 1}\n', encoding="utf-8")
+    assert asyncio.run(employee_server.read_export("employees-1.ndjson")) == '{"id": 1}\n'
+
+
+def test_read_export_refuses_oversized_and_outside_files(export_dir, monkeypatch):
+    (export_dir / "employees-1.ndjson").write_text("x" * 100, encoding="utf-8")
+    monkeypatch.setattr(employee_server, "EXPORT_RESOURCE_MAX_BYTES", 10)
+    with pytest.raises(ValueError, match="rows_per_file"):
+        asyncio.run(employee_server.read_export("employees-1.ndjson"))
+    with pytest.raises(ValueError):
+        asyncio.run(employee_server.read_export("../employees.db"))
@@ -0,0 +1,31 @@
+import pytest
+
+from expression import compile_expression, evaluate
+
+
+def test_arithmetic_and_functions():
+    assert evaluate("2*(x+4)**2", {"x": 1}) == {"result": 50.0}
+    assert evaluate("7 // 2 + 7 % 2 + max(pi, e)", {})["result"] == pytest.approx(4 + 3.141592653589793)
+
+
+@pytest.mark.parametrize("expression", ["1 / x", "1 // x", "1 % x"])
+def test_zero_divisor_is_division_by_zero(expression):
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        evaluate(expression, {"x": 0})
+
+
+def test_bulk_errors_are_per_row():
+    result = evaluate("10 % x + 10 // x", [{"x": 3}, {"x": 0}, {"x": -4}])
+    assert result["results"] == [4.0, None, -5.0]
+    assert result["errors"] == [{"index": 1, "error": "Cannot divide by zero."}]
+
+
+def test_overflow_is_not_finite():
+    with pytest.raises(ValueError, match="not a finite number"):
+        evaluate("exp(x)", {"x": 1000})
+
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "x.real", "[x for x in y]", "open(1)"])
+def test_code_is_rejected(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
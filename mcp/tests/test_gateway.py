@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import employee_server
+import gateway as gateway_module
+from gateway import Gateway, parse_servers
+
+
+def _inventory() -> FastMCP:
+    app = FastMCP("inventory")
+
+    @app.tool()
+    def count(item: str) -> int:
+        """How many of `item` are in stock."""
+        return len(item)
+
+    @app.resource("inventory://items")
+    def items() -> list:
+        return ["bolt", "nut"]
+
+    @app.resource("inventory://items/{item}")
+    def item(item: str) -> str:
+        return item
+
+    @app.prompt()
+    def restock(item: str) -> str:
+        return f"Restock {item}"
+
+    return app
+
+
+def test_mount_prefixes_tools_and_prompts():
+    gw = Gateway("test")
+    gw.mount("inv", _inventory())
+    mcp = gw.mcp
+    assert "inv_count" in {t.name for t in mcp._tool_manager.list_tools()}
+    assert "inv_restock" in {p.name for p in mcp._prompt_manager.list_prompts()}
+    # Resources keep their URIs; the gateway's own metrics resource stays the only one
+    uris = [str(r.uri) for r in mcp._resource_manager.list_resources()]
+    assert "inventory://items" in uris and uris.count("metrics://tools") == 1
+    assert "inventory://items/{item}" in {t.uri_template for t in mcp._resource_manager.list_templates()}
+    assert asyncio.run(gw.call("inv_count", item="bolt")) == 4
+
+    with pytest.raises(ValueError):
+        gw.mount("inv", _inventory())
+    with pytest.raises(ValueError):
+        asyncio.run(gw.call("inv_missing"))
+
+
+def test_parse_servers():
+    assert parse_servers("calculator=calculator_server, employee=employee_server,") == {
+        "calculator": "calculator_server", "employee": "employee_server"}
+    assert parse_servers("calculator_server") == {"calculator_server": "calculator_server"}
+
+
+def test_default_gateway_serves_both_servers(seeded_db, monkeypatch):
+    monkeypatch.setattr(employee_server, "DB_FILE", seeded_db)
+
+    async def run():
+        async with create_connected_server_and_client_session(gateway_module.mcp._mcp_server) as session:
+            names = {t.name for t in (await session.list_tools()).tools}
+            assert {"calculator_add", "employee_get_employee_by_id", "payroll_projection"} <= names
+            added = await session.call_tool("calculator_add", {"a": 2, "b": 3})
+            employee = await session.call_tool("employee_get_employee_by_id", {"emp_id": 3})
+            return added.content[0].text, employee.content[0].text
+
+    added, employee = asyncio.run(run())
+    assert float(added) == 5.0
+    assert '"Employee 3"' in employee
+
+
+def test_payroll_projection_combines_servers(seeded_db, monkeypatch):
+    monkeypatch.setattr(employee_server, "DB_FILE", seeded_db)
+    result = asyncio.run(gateway_module.payroll_projection(10))
+    assert result["total_salary"] == sum(1000.0 * i for i in range(1, 101))
+    assert result["projected_total_salary"] == pytest.approx(result["total_salary"] * 1.1)
+    assert {r["role"] for r in result["roles"]} == {"Engineer", "Manager", "Analyst", "Designer"}
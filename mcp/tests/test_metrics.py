@@ -0,0 +1,57 @@
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+from metrics import MetricsRegistry, instrument
+
+
+class _FutureMCP:
+    """Stands in for an mcp release whose add_tool takes parameters this one lacks."""
+
+    name = "future"
+
+    def __init__(self):
+        self.added = []
+
+    def add_tool(self, fn, name=None, title=None, description=None, annotations=None,
+                 structured_output=None):
+        self.added.append((fn, name, title, description, structured_output))
+
+    def resource(self, uri):
+        return lambda fn: fn
+
+
+def test_add_tool_arguments_are_forwarded():
+    server = _FutureMCP()
+    instrument(server, MetricsRegistry())
+
+    def lookup():
+        return 1
+
+    server.add_tool(lookup, "find", "Find", description="Looks things up", structured_output=True)
+    fn, name, title, description, structured = server.added[0]
+    assert (name, title, description, structured) == ("find", "Find", "Looks things up", True)
+    assert fn.__name__ == "find" and fn() == 1
+
+
+def test_tool_calls_are_recorded():
+    registry = MetricsRegistry()
+    server = instrument(FastMCP("test"), registry)
+
+    @server.tool()
+    def double(x: int) -> int:
+        return 2 * x
+
+    @server.tool(name="fails")
+    async def error_tool() -> dict:
+        return {"error": "nope"}
+
+    async def run():
+        await server.call_tool("double", {"x": 2})
+        await server.call_tool("double", {"x": 3})
+        await server.call_tool("fails", {})
+
+    asyncio.run(run())
+    stats = {s["tool"]: s for s in registry.snapshot("test")}
+    assert (stats["double"]["calls"], stats["double"]["errors"]) == (2, 0)
+    assert (stats["fails"]["calls"], stats["fails"]["errors"]) == (1, 1)
@@ -0,0 +1,76 @@
+import sqlite3
+import time
+
+import pytest
+
+from employee import Employee
+from replica import MemoryReplica, enable_replica
+from sqlite_pool import ConnectionManager
+
+
+@pytest.fixture
+def manager(seeded_db):
+    manager = ConnectionManager(seeded_db)
+    yield manager
+    manager.close()
+
+
+def _external(db_file: str, sql: str, params=()):
+    """Commit a change from another connection, as another process would."""
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _names(replica) -> dict:
+    with replica.reader() as conn:
+        return dict(conn.execute("SELECT id, name FROM employees"))
+
+
+def test_external_commits_are_seen_within_the_poll_interval(manager):
+    replica = MemoryReplica(manager.db_file, manager.data_version, poll_interval=0.2)
+    _names(replica)                      # Catches up with the load
+    assert len(_names(replica)) == 100   # Polls now; the next poll is due in 0.2s
+
+    _external(manager.db_file, "INSERT INTO employees (name, role, salary) VALUES ('New', 'Engineer', 1)")
+    assert len(_names(replica)) == 100   # Not polled yet: stale by at most poll_interval
+    time.sleep(0.25)
+    assert _names(replica)[101] == "New"
+    # Appended incrementally, not reloaded
+    assert (replica.loads, replica.rows_applied) == (1, 1)
+    replica.close()
+
+
+def test_external_update_and_delete_reload_the_copy(manager):
+    replica = MemoryReplica(manager.db_file, manager.data_version, poll_interval=0)
+    _external(manager.db_file, "UPDATE employees SET name = 'Renamed' WHERE id = 5")
+    assert _names(replica)[5] == "Renamed"
+    _external(manager.db_file, "DELETE FROM employees WHERE id = 6")
+    assert 6 not in _names(replica)
+    assert replica.loads == 3
+    replica.close()
+
+
+def test_local_writes_are_seen_immediately(manager):
+    replica = MemoryReplica(manager.db_file, manager.data_version, poll_interval=60)
+    _names(replica)
+    with manager.writer() as conn:
+        conn.execute("INSERT INTO employees (name, role, salary) VALUES ('Local', 'Engineer', 1)")
+    replica.mark_stale()   # What invalidate_read_cache() does after every write
+    assert _names(replica)[101] == "Local"
+    replica.close()
+
+
+def test_lookups_through_the_replica_follow_the_file(seeded_db):
+    replica = enable_replica(seeded_db)
+    assert Employee.get_by_id(7, seeded_db).name == "Employee 7"
+
+    Employee.add_employee("Ada", "Engineer", 1.0, db_file=seeded_db)
+    assert [e.name for e in Employee.get_all(seeded_db)][-1] == "Ada"
+
+    _external(seeded_db, "UPDATE employees SET name = 'Renamed' WHERE id = 7")
+    time.sleep(replica.poll_interval * 2)
+    assert Employee.get_by_id(7, seeded_db).name == "Renamed"
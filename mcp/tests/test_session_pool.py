@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+
+import psutil
+import pytest
+from mcp import StdioServerParameters
+from mcp.shared.exceptions import McpError
+
+from session_pool import MCPSessionPool
+
+SERVER = StdioServerParameters(
+    command=sys.executable,
+    args=[os.path.join(os.path.dirname(os.path.abspath(__file__)), "echo_server.py")],
+)
+
+
+async def _pid(pool) -> int:
+    return int((await pool.call_tool("pid", {})).content[0].text)
+
+
+def test_calls_are_served_by_warm_sessions():
+    async def run():
+        async with MCPSessionPool(SERVER, size=2, health_check_interval=0) as pool:
+            results = await asyncio.gather(*(pool.call_tool("echo", {"text": str(i)}) for i in range(10)))
+            assert [r.content[0].text for r in results] == [str(i) for i in range(10)]
+            assert len(psutil.Process().children()) == 2
+
+    asyncio.run(run())
+
+
+def test_slot_restarts_after_its_server_dies():
+    async def run():
+        async with MCPSessionPool(SERVER, size=1, health_check_interval=0) as pool:
+            old = await _pid(pool)
+            server = psutil.Process(old)
+            server.kill()
+            psutil.wait_procs([server], timeout=5)
+            # The first call after the crash is retried on a fresh server, not failed
+            new = await _pid(pool)
+            assert new != old
+
+    asyncio.run(run())
+
+
+def test_timed_out_session_is_replaced():
+    async def run():
+        async with MCPSessionPool(SERVER, size=1, health_check_interval=0, call_timeout=0.5) as pool:
+            old = await _pid(pool)
+            with pytest.raises(McpError):
+                await pool.call_tool("hang", {"seconds": 30})
+            # The stuck server is not handed to the next caller
+            assert await _pid(pool) != old
+
+    asyncio.run(run())
+
+
+def test_health_check_restarts_idle_dead_sessions():
+    async def run():
+        async with MCPSessionPool(SERVER, size=1, health_check_interval=0.2, ping_timeout=1) as pool:
+            old = await _pid(pool)
+            psutil.Process(old).kill()
+            # No caller touches the pool; the background ping finds and replaces the server
+            for _ in range(100):
+                await asyncio.sleep(0.1)
+                slot = pool._slots[0]
+                if slot.healthy and old not in [p.pid for p in psutil.Process().children()]:
+                    break
+            else:
+                pytest.fail("The dead server was not restarted by the health check.")
+
+    asyncio.run(run())
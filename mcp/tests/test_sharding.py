@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+
+from sharding import IdAllocator, create_shards, get_store
+from write_queue import WriteQueue
+
+
+def test_allocator_hands_out_consecutive_unique_ids(tmp_path):
+    path = str(tmp_path / "ids.db")
+    IdAllocator.create(path, next_id=10)
+    ids = IdAllocator(path, block_size=4)
+    try:
+        assert list(ids.allocate(3)) == [10, 11, 12]
+        # Crosses a block boundary: a fresh block is reserved rather than a partial one
+        assert list(ids.allocate(2)) == [14, 15]
+        # Requests of a block or more get a range of their own
+        assert list(ids.allocate(5)) == [18, 19, 20, 21, 22]
+        assert list(ids.allocate(1)) == [16]
+    finally:
+        ids.close()
+
+
+def test_allocators_sharing_a_file_never_overlap(tmp_path):
+    # Two allocators on one file behave like two server processes
+    path = str(tmp_path / "ids.db")
+    IdAllocator.create(path)
+    allocators = [IdAllocator(path, block_size=8), IdAllocator(path, block_size=8)]
+    seen = []
+    lock = threading.Lock()
+
+    def allocate(ids):
+        for count in (1, 3, 8, 2, 20, 1) * 5:
+            block = list(ids.allocate(count))
+            with lock:
+                seen.extend(block)
+
+    threads = [threading.Thread(target=allocate, args=(ids,)) for ids in allocators for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for ids in allocators:
+        ids.close()
+    assert len(seen) == len(set(seen)) == 4 * 5 * 35
+
+
+def test_queued_inserts_land_in_the_owning_shard(tmp_path):
+    db_file = str(tmp_path / "sharded.db")
+    store = create_shards(db_file, 3)
+    assert get_store(db_file) is store
+    queue = WriteQueue(db_file)
+    try:
+        futures = [queue.submit(f"Employee {i}", "Engineer", 100.0) for i in range(30)]
+        ids = [f.result(timeout=10) for f in futures]
+    finally:
+        queue.close(timeout=10)
+    assert len(set(ids)) == 30
+
+    for emp_id in ids:
+        for shard in store.shards:
+            conn = sqlite3.connect(shard)
+            try:
+                found = conn.execute("SELECT 1 FROM employees WHERE id = ?", (emp_id,)).fetchone()
+            finally:
+                conn.close()
+            assert (found is not None) == (shard == store.shard_for(emp_id))
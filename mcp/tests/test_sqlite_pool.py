@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from employee import Employee
+from replica import MemoryReplica
+from sqlite_pool import ConnectionManager
+
+
+@pytest.fixture
+def manager(seeded_db):
+    manager = ConnectionManager(seeded_db, max_readers=1)
+    yield manager
+    manager.close()
+
+
+def _in_thread(fn, timeout: float = 5):
+    """Run fn on a new thread; fail instead of hanging if it deadlocks."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        pytest.fail("Deadlocked waiting for a reader slot.")
+    return result[0]
+
+
+def test_nested_read_reuses_the_connection(manager):
+    def nested():
+        with manager.reader() as outer:
+            with manager.reader() as inner:
+                assert inner is outer
+                return inner.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    # With one slot, taking a second one for the inner read would never return
+    assert _in_thread(nested) == 100
+    assert manager._held == {}
+
+
+def test_nested_replica_read_reuses_the_connection(manager):
+    manager.replica = MemoryReplica(manager.db_file, manager.data_version)
+
+    def nested():
+        with manager.reader() as outer:
+            with manager.reader() as inner:
+                assert inner is outer
+                return inner.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    assert _in_thread(nested) == 100
+    assert manager.replica._depth == {} and manager.replica._readers == 0
+
+
+def test_reader_closed_from_another_thread(manager):
+    def rows():
+        with manager.reader() as conn:
+            yield from conn.execute("SELECT id FROM employees ORDER BY id")
+
+    # Started on this thread, finalized on another
+    gen = rows()
+    next(gen)
+    assert threading.get_ident() in manager._held
+    _in_thread(gen.close)
+
+    # This thread no longer claims the connection, and the only slot is free again
+    assert manager._held == {}
+
+    def count():
+        with manager.reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    assert _in_thread(count) == 100
+    assert count() == 100
+
+
+def test_open_connections_stay_bounded(seeded_db):
+    manager = ConnectionManager(seeded_db, max_readers=3)
+    barrier = threading.Barrier(20)
+
+    def read():
+        barrier.wait()
+        with manager.reader() as conn:
+            conn.execute("SELECT COUNT(*) FROM employees").fetchone()
+
+    threads = [threading.Thread(target=read) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert len(manager._readers) <= 3
+    finally:
+        manager.close()
+
+
+def test_iter_all_holds_no_connection_between_batches(seeded_db):
+    from datastore import get_manager
+
+    rows = Employee.iter_all(batch_size=10, db_file=seeded_db, raw=True)
+    first = next(rows)
+    assert get_manager(seeded_db)._held == {}
+    assert [first["id"]] + [r["id"] for r in rows] == list(range(1, 101))
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from calculator import ArrayCalculator
+from worker_pool import CalculatorWorkers
+
+
+@pytest.fixture(scope="module")
+def workers():
+    # One spawned worker is shared by the module's tests; starting one takes a while
+    workers = CalculatorWorkers(1, shm_threshold=100)
+    yield workers
+    workers.shutdown()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_small_batches_are_pickled(workers):
+    a, b = [1.0, 2.0, 3.0], [2.0, 0.0, 4.0]
+    assert _run(workers.batch("divide", a, b)) == ArrayCalculator().batch("divide", a, b)
+
+
+def test_large_batches_go_through_shared_memory(workers):
+    a = [float(i) for i in range(1000)]
+    b = [float(i % 7) for i in range(1000)]   # Some divisions by zero
+    ops = ["add", "divide", "power", "subtract"] * 250
+    calc = ArrayCalculator()
+    assert _run(workers.batch("divide", a, b)) == calc.batch("divide", a, b)
+    assert _run(workers.batch_mixed(ops, a, b)) == calc.batch_mixed(ops, a, b)
+    assert _run(workers.batch("add", a, [1.0])) == calc.batch("add", a, [1.0])
+
+
+@pytest.mark.parametrize("call", [
+    lambda w: w.batch("modulo", [1.0] * 200, [1.0] * 200),
+    lambda w: w.batch("add", [1.0] * 200, [1.0] * 3),
+    lambda w: w.batch_mixed(["add"] * 3, [1.0] * 200, [1.0] * 200),
+])
+def test_bad_input_fails_before_reaching_a_worker(workers, call):
+    with pytest.raises(ValueError):
+        _run(call(workers))
+
+
+def test_callers_beyond_max_pending_are_turned_away():
+    workers = CalculatorWorkers(1, max_pending=1, queue_timeout=0.2)
+
+    async def run():
+        busy = asyncio.create_task(workers.run(time.sleep, 1))
+        await asyncio.sleep(0)   # Let it take the only slot
+        with pytest.raises(TimeoutError):
+            await workers.run(time.sleep, 0)
+        await busy
+
+    try:
+        _run(run())
+    finally:
+        workers.shutdown()
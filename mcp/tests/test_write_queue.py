@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+
+import pytest
+
+import write_queue
+from employee import Employee
+from write_queue import WriteQueue
+
+
+def test_insert_returns_committed_id(db_file):
+    queue = WriteQueue(db_file)
+    try:
+        emp_id = queue.insert("Ada", "Engineer", 100.0, timeout=5)
+        assert Employee.get_by_id(emp_id, db_file).name == "Ada"
+    finally:
+        queue.close(timeout=5)
+
+
+def test_concurrent_inserts_get_distinct_ids(db_file):
+    queue = WriteQueue(db_file, max_delay=0.01)
+    futures = []
+    lock = threading.Lock()
+
+    def submit(i):
+        future = queue.submit(f"Employee {i}", "Engineer", float(i))
+        with lock:
+            futures.append(future)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        ids = [f.result(timeout=5) for f in futures]
+        assert len(set(ids)) == 50
+    finally:
+        queue.close(timeout=5)
+
+
+def test_committer_failure_reaches_every_caller(db_file, monkeypatch):
+    queue = WriteQueue(db_file)
+
+    def broken_store(db_file):
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(write_queue, "get_store", broken_store)
+    future = queue.submit("Ada", "Engineer", 100.0)
+    with pytest.raises(sqlite3.OperationalError):
+        future.result(timeout=5)
+    assert queue.stats()["errors"] == 1
+
+    # The committer survived and writes the next row once the store is back
+    monkeypatch.undo()
+    try:
+        assert queue.is_running()
+        assert queue.insert("Grace", "Engineer", 100.0, timeout=5) > 0
+    finally:
+        queue.close(timeout=5)
+
+
+def test_invalid_row_is_rejected_before_queueing(db_file):
+    queue = WriteQueue(db_file)
+    with pytest.raises(ValueError):
+        queue.submit("Ada", "Engineer", "lots")
+    assert queue.stats()["queued"] == 0
+
+
+def test_committer_death_fails_its_batch_and_restarts(db_file, monkeypatch):
+    queue = WriteQueue(db_file)
+    calls = []
+    # The dying thread's traceback is expected; keep it out of the test report
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+
+    def dying_commit(batch):
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            # Not an Exception, so it escapes the loop and ends the thread
+            raise SystemExit
+        WriteQueue._commit(queue, batch)
+
+    monkeypatch.setattr(queue, "_commit", dying_commit)
+    try:
+        first = queue.submit("Ada", "Engineer", 100.0)
+        with pytest.raises(RuntimeError):
+            first.result(timeout=5)
+        calls[0].join(5)
+        assert queue.insert("Grace", "Engineer", 100.0, timeout=5) > 0
+    finally:
+        queue.close(timeout=5)
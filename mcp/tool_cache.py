@@ -0,0 +1,157 @@
+# asyncio runs the background revalidation without blocking the caller
+import asyncio
+
+# hashlib gives the content hash of the server module used in the cache key
+import hashlib
+
+# Cached listings are stored as JSON files
+import json
+import os
+import tempfile
+import time
+
+# The MCP Tool model, used to rebuild cached listings
+from mcp.types import Tool
+
+
+# Where cached tool listings are written. Override with MCP_TOOL_CACHE_DIR.
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mcp_basics", "tools")
+
+# Bumped whenever the on-disk format changes, so old files are ignored
+CACHE_FORMAT = 1
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file's contents, or "" if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+class ToolListCache:
+    """
+    On-disk cache of one MCP server's tool listing.
+
+    Listing tools normally means spawning the server and completing a handshake,
+    only to read schemas that change when the server code changes. The cache key
+    combines the launch command with a hash of the server module, so editing the
+    server automatically misses the cache. A hit is served straight from disk and
+    checked against the live server later, when a session is open anyway.
+
+    Usage:
+        cache = ToolListCache("calculator", params, "mcp/calculator_server.py")
+        tools = await cache.get(fetch_tools_from_server)
+        cache.revalidate_in_background(pool.list_tools)   # once a session exists
+    """
+
+    def __init__(self, name: str, server_params, server_module: str, cache_dir: str | None = None):
+        """
+        Args:
+            name (str): Short server name, used in the cache file name.
+            server_params (StdioServerParameters | str): How the server is launched, or its URL.
+            server_module (str): Path of the server's Python module.
+            cache_dir (str | None): Directory for cache files (default: MCP_TOOL_CACHE_DIR or ~/.cache).
+        """
+        self.name = name
+        self.server_params = server_params
+        self.server_module = server_module
+        self.cache_dir = cache_dir or os.environ.get("MCP_TOOL_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self._revalidated = False
+        self._tasks = set()   # Keeps background tasks referenced until they finish
+
+    # -------------------- Cache Key and File --------------------
+
+    @property
+    def key(self) -> str:
+        """Hash of the launch command (or URL) plus the server module's contents."""
+        if isinstance(self.server_params, str):
+            command = self.server_params   # URL of an HTTP server
+        else:
+            command = json.dumps([self.server_params.command, list(self.server_params.args)])
+        material = f"{CACHE_FORMAT}\n{command}\n{file_sha256(self.server_module)}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.name}-{self.key[:16]}.json")
+
+    def load(self):
+        """Return the cached list of Tool objects, or None if there is no valid entry."""
+        key = self.key
+        try:
+            with open(self.path) as f:
+                entry = json.load(f)
+            if entry.get("key") != key:
+                return None
+            return [Tool.model_validate(t) for t in entry["tools"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, tools):
+        """Atomically write `tools` to the cache file."""
+        entry = {
+            "key": self.key,
+            "server": self.name,
+            "saved_at": time.time(),
+            "tools": [t.model_dump(mode="json", exclude_none=True) for t in tools],
+        }
+        tmp = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            # A read-only, unwritable or full disk only costs us the cache
+            if tmp is not None and os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    # -------------------- Lookup and Revalidation --------------------
+
+    async def get(self, fetch):
+        """
+        Return the tool listing, from disk if possible.
+
+        Args:
+            fetch (callable): `async fetch()` returning the live list of Tool objects,
+                only called on a cache miss.
+        """
+        tools = self.load()
+        if tools is not None:
+            return tools
+        tools = await fetch()
+        self.save(tools)
+        # Just fetched from the live server, so there is nothing to revalidate
+        self._revalidated = True
+        return tools
+
+    def revalidate_in_background(self, fetch):
+        """
+        Refresh the cached listing from the live server, at most once per process.
+
+        Meant to be called once a session is open anyway (e.g. right after the
+        session pool starts) so revalidating never spawns a server of its own.
+        Failures are ignored; the cache is simply left as it was.
+        """
+        if self._revalidated:
+            return
+        self._revalidated = True
+
+        async def refresh():
+            try:
+                tools = await fetch()
+            except Exception:
+                self._revalidated = False
+                return
+            if tools != self.load():
+                self.save(tools)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
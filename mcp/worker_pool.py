@@ -0,0 +1,187 @@
+import asyncio  # The calculator server awaits worker results without blocking its event loop
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor  # Runs CPU-heavy work on other cores
+from multiprocessing import shared_memory  # Hands large arrays to workers without pickling them
+
+# NumPy arrays are laid directly over the shared memory blocks
+import numpy as np
+
+from calculator import ArrayCalculator
+
+
+# Batches with at least this many elements travel through shared memory; smaller
+# ones are cheaper to pickle than to set up a shared block for
+SHM_THRESHOLD = 50_000
+
+
+# ---------------------- WORKER SIDE ----------------------
+# These run inside the worker processes, so they must be importable top-level functions.
+
+def _layout(n: int, nb: int, mixed: bool) -> list:
+    """Byte layout of one shared block: (name, dtype, length, offset) per array."""
+    fields = [("a", np.float64, n), ("b", np.float64, nb), ("out", np.float64, n), ("errors", np.int8, n)]
+    if mixed:
+        fields.append(("codes", np.int16, n))
+    layout, offset = [], 0
+    for name, dtype, length in fields:
+        layout.append((name, dtype, length, offset))
+        offset += np.dtype(dtype).itemsize * length
+    return layout
+
+
+def _block_size(layout: list) -> int:
+    name, dtype, length, offset = layout[-1]
+    return max(offset + np.dtype(dtype).itemsize * length, 1)
+
+
+def _views(buf, layout: list) -> dict:
+    return {name: np.ndarray((length,), dtype=dtype, buffer=buf, offset=offset)
+            for name, dtype, length, offset in layout}
+
+
+def _batch_in_worker(op, ops, a, b):
+    """Run a batch on pickled inputs and return the packaged result."""
+    calc = ArrayCalculator()
+    if ops is not None:
+        return calc.batch_mixed(ops, a, b)
+    return calc.batch(op, a, b)
+
+
+def _batch_in_shared_memory(block_name: str, n: int, nb: int, op, op_names):
+    """Run a batch whose inputs and outputs live in the shared block `block_name`."""
+    calc = ArrayCalculator()
+    block = shared_memory.SharedMemory(name=block_name)
+    v = _views(block.buf, _layout(n, nb, op_names is not None))
+    try:
+        if op_names is not None:
+            ops = np.asarray(op_names, dtype=str)[v["codes"]]
+            calc.compute_mixed(ops, v["a"], v["b"], out=v["out"], errors=v["errors"])
+        else:
+            calc.compute(op, v["a"], v["b"], out=v["out"], errors=v["errors"])
+    finally:
+        v = ops = None  # Views must be released before the block can be closed
+        block.close()
+
+
+# ---------------------- SERVER SIDE ----------------------
+
+class CalculatorWorkers:
+    """
+    Runs CPU-heavy calculator work on a pool of worker processes.
+
+    The calculator server is a single asyncio loop, so one large batch or
+    expression would otherwise stall every other caller. Here such work goes to
+    `workers` processes and scales across cores.
+
+    - Large batches are copied once into a shared memory block that the worker
+      reads and writes in place, instead of pickling the lists both ways.
+    - At most `max_pending` calls may be running or queued; further callers wait
+      up to `queue_timeout` seconds for a slot and then get an error.
+    - If a caller is cancelled (e.g. the client cancels the MCP request) while its
+      work is still queued, the work is dropped. Work already running finishes,
+      keeps its slot until then, and its result is discarded.
+    """
+
+    def __init__(self, workers: int, max_pending: int | None = None, queue_timeout: float = 5.0,
+                 shm_threshold: int = SHM_THRESHOLD):
+        """
+        Args:
+            workers (int): Number of worker processes.
+            max_pending (int | None): Calls allowed in flight or queued (default 4 per worker).
+            queue_timeout (float): Seconds a caller waits for a free slot.
+            shm_threshold (int): Batch length from which shared memory is used.
+        """
+        if workers < 1:
+            raise ValueError("At least one worker process is required.")
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self.queue_timeout = queue_timeout
+        self.shm_threshold = shm_threshold
+        self._executor = None   # Started on first use, so importing the server spawns nothing
+        self._slots = None
+        self._calc = ArrayCalculator()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" behaves the same on every OS and is safe with the server's threads
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` in a worker process and return its result.
+
+        Raises:
+            TimeoutError: If no slot frees up within `queue_timeout` seconds.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Calculator is busy: {self.max_pending} requests are already queued.")
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the worker is really done, even if the caller gave up
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._slots.release))
+        # Cancelling this await cancels the executor future, which drops it from the
+        # queue if no worker has picked it up yet
+        return await asyncio.wrap_future(future)
+
+    async def batch(self, op: str, a: list[float], b: list[float]) -> dict:
+        """Process-pool version of ArrayCalculator.batch()."""
+        return await self._batch(op, None, a, b)
+
+    async def batch_mixed(self, ops: list[str], a: list[float], b: list[float]) -> dict:
+        """Process-pool version of ArrayCalculator.batch_mixed()."""
+        return await self._batch(None, ops, a, b)
+
+    async def _batch(self, op, ops, a, b) -> dict:
+        if len(a) < self.shm_threshold:
+            return await self.run(_batch_in_worker, op, ops, a, b)
+
+        # Validate here so bad input fails fast without touching a worker
+        if op is not None:
+            self._calc._kernel(op)
+        a_arr = np.asarray(a, dtype=np.float64)
+        b_arr = np.asarray(b, dtype=np.float64)
+        if a_arr.ndim != 1 or b_arr.ndim != 1:
+            raise ValueError("Batch inputs must be flat lists of numbers.")
+        n, nb = a_arr.size, b_arr.size
+        if nb not in (1, n):
+            raise ValueError(f"Length mismatch: a has {n} values, b has {nb}.")
+        op_names = None
+        if ops is not None:
+            op_names, codes = np.unique(np.asarray(ops, dtype=str), return_inverse=True)
+            if codes.size != n:
+                raise ValueError(f"Length mismatch: {codes.size} operations for {n} values.")
+            for name in op_names.tolist():
+                self._calc._kernel(name)
+            op_names = op_names.tolist()
+
+        layout = _layout(n, nb, ops is not None)
+        block = shared_memory.SharedMemory(create=True, size=_block_size(layout))
+        v = _views(block.buf, layout)
+        try:
+            v["a"][:] = a_arr
+            v["b"][:] = b_arr
+            if ops is not None:
+                v["codes"][:] = codes
+            await self.run(_batch_in_shared_memory, block.name, n, nb, op, op_names)
+            return self._calc._package(v["out"], v["errors"])
+        finally:
+            # Views must be released before the block can be closed. A worker still
+            # running after a cancellation keeps its own mapping until it finishes.
+            v = None
+            block.close()
+            block.unlink()
+
+    def shutdown(self):
+        """Stop the worker processes, dropping any queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
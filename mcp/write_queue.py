@@ -0,0 +1,283 @@
+import atexit  # Flush queued writes when the process exits
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future  # Each caller waits on its own row's outcome
+
+from datastore import get_manager, invalidate_read_cache
+from employee import NewEmployee
+from sharding import get_store
+
+
+# How long the queue waits for more rows after the first one arrives, and how many
+# rows it merges into one transaction at most
+DEFAULT_MAX_DELAY = 0.005
+DEFAULT_MAX_BATCH = 256
+
+# Lingering ends early once no new row has arrived for max_delay / QUIET_FRACTION
+QUIET_FRACTION = 10
+
+# Rows allowed to wait in the queue before new submissions are refused
+DEFAULT_MAX_QUEUED = 10_000
+
+# "commit": the caller waits until its row is committed and gets its ID.
+# "enqueue": the caller is answered as soon as the row is validated and queued;
+#            a crash before the next commit (a few milliseconds) loses it.
+DURABILITY_MODES = ("commit", "enqueue")
+
+
+class _PendingRow:
+    __slots__ = ("row", "future")
+
+    def __init__(self, row: tuple):
+        self.row = row
+        self.future = Future()
+
+
+class WriteQueue:
+    """
+    Group commit for single-row employee inserts.
+
+    Concurrent add_employee calls each paid for their own transaction and queued
+    up on the single writer lock. Here they are handed to one background thread,
+    which merges whatever arrives within `max_delay` seconds (or `max_batch` rows)
+    into one transaction; rows arriving while nothing else is queued are committed
+    at once. Every caller still gets its own ID or error: rows are
+    inserted one statement each inside the shared transaction, so a bad row only
+    fails its own caller, while a failed commit (or an error that makes SQLite
+    roll back the whole transaction) fails the whole batch.
+    """
+
+    def __init__(self, db_file: str = "employees.db", max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY, max_queued: int = DEFAULT_MAX_QUEUED):
+        """
+        Args:
+            db_file (str): Path to the SQLite database file.
+            max_batch (int): Most rows merged into one transaction.
+            max_delay (float): Seconds to wait for more rows after the first arrives
+                (0 commits whatever has queued up while the previous commit ran).
+            max_queued (int): Rows allowed to wait before submit() refuses more.
+        """
+        self.db_file = db_file
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queued = max_queued
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._inflight = []   # The batch the committer is writing right now
+        self._closed = False
+        self._busy = False   # Whether recent batches had more than one row
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+
+    # ---------------------- Submitting ----------------------
+
+    def submit(self, name: str, role: str, salary: float) -> Future:
+        """
+        Validate a new employee and queue it for the next group commit.
+
+        Returns:
+            Future: Resolves to the new employee's ID once committed, or raises the
+            database error that rejected the row.
+
+        Raises:
+            ValueError: If the employee is invalid (pydantic's ValidationError).
+            RuntimeError: If the queue is full or closed.
+        """
+        new = NewEmployee(name=name, role=role, salary=salary)
+        pending = _PendingRow((new.name, new.role, new.salary))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The write queue is closed.")
+            if len(self._pending) >= self.max_queued:
+                raise RuntimeError(f"Too many pending writes ({self.max_queued}); try again shortly.")
+            if not self.is_running():
+                # First write, or the previous committer died: start a new one
+                self._thread = threading.Thread(target=self._run, name="employee-writes", daemon=True)
+                self._thread.start()
+            self._pending.append(pending)
+            self._cond.notify()
+        return pending.future
+
+    def insert(self, name: str, role: str, salary: float, timeout: float | None = None) -> int:
+        """Queue a new employee and block until it is committed; returns its ID."""
+        return self.submit(name, role, salary).result(timeout)
+
+    # ---------------------- Background Committer ----------------------
+
+    def is_running(self) -> bool:
+        """Whether a committer thread is alive to write what is queued."""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            # Normally reached only once closed and drained. If the committer died
+            # instead, nobody is left to resolve the batch it was writing (SQLite
+            # rolled it back), and rows still queued get a new committer.
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                stranded = [p for p in self._inflight if not p.future.done()]
+                self._inflight = []
+                self.errors += len(stranded)
+                if self._pending and not self._closed:
+                    self._thread = threading.Thread(target=self._run, name="employee-writes", daemon=True)
+                    self._thread.start()
+            for pending in stranded:
+                pending.future.set_exception(RuntimeError("The write queue stopped before committing this row."))
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return   # Closed and fully drained
+                # Give concurrent callers a moment to join this transaction. A lone
+                # caller (the last batch was a single row) is committed straight away,
+                # and lingering stops early once rows stop arriving, so the delay only
+                # applies while there is concurrency to merge.
+                deadline = time.monotonic() + self.max_delay
+                while self._busy and len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    queued = len(self._pending)
+                    self._cond.wait(min(remaining, self.max_delay / QUIET_FRACTION))
+                    if len(self._pending) == queued:
+                        break
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+                self._busy = len(batch) > 1 or bool(self._pending)
+                self._inflight = batch
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # E.g. the shard ID allocator failed before any row was written. Every
+                # caller still waiting hears about it, and the committer carries on.
+                failed = [p for p in batch if not p.future.done()]
+                with self._cond:
+                    self.errors += len(failed)
+                for pending in failed:
+                    pending.future.set_exception(e)
+            self._inflight = []
+
+    def _commit(self, batch: list):
+        # Callers that gave up (cancelled futures) are dropped before anything is written
+        batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        # A sharded database gets the IDs up front and one transaction per shard,
+        # committed in parallel; otherwise SQLite assigns the IDs (id NULL)
+        store = get_store(self.db_file)
+        if store is None:
+            groups = {self.db_file: [(None, p) for p in batch]}
+        else:
+            groups = defaultdict(list)
+            for emp_id, pending in zip(store.allocate_ids(len(batch)), batch):
+                groups[store.shard_for(emp_id)].append((emp_id, pending))
+        items = list(groups.items())
+        if store is None:
+            self._commit_group(items[0])
+        else:
+            store.scatter(self._commit_group, items)
+
+    def _commit_group(self, item: tuple):
+        db_file, group = item
+        outcomes = []
+        try:
+            with get_manager(db_file).writer() as conn:
+                for emp_id, pending in group:
+                    try:
+                        cursor = conn.execute(
+                            "INSERT INTO employees (id, name, role, salary) VALUES (?, ?, ?, ?)",
+                            (emp_id, *pending.row),
+                        )
+                        outcomes.append((cursor.lastrowid, None))
+                    except sqlite3.Error as e:
+                        if not conn.in_transaction:
+                            # SQLITE_FULL, IOERR, NOMEM and the like roll back the whole
+                            # transaction, including rows already given an ID above
+                            raise
+                        # A constraint error undoes just this statement; the rest of the batch goes ahead
+                        outcomes.append((None, e))
+        except Exception as e:
+            with self._cond:
+                self.errors += len(group)
+            for _, pending in group:
+                pending.future.set_exception(e)
+            return
+        finally:
+            invalidate_read_cache(db_file)
+
+        with self._cond:
+            self.batches += 1
+            self.rows += sum(1 for _, error in outcomes if error is None)
+            self.errors += sum(1 for _, error in outcomes if error is not None)
+        for (_, pending), (emp_id, error) in zip(group, outcomes):
+            if error is None:
+                pending.future.set_result(emp_id)
+            else:
+                pending.future.set_exception(error)
+
+    # ---------------------- Lifecycle ----------------------
+
+    def close(self, timeout: float | None = None):
+        """Commit everything still queued, then stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Counters suitable for returning from an MCP resource."""
+        return {
+            "queued": len(self._pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+        }
+
+
+# ---------------------- Shared Queues ----------------------
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_file: str = "employees.db") -> WriteQueue:
+    """
+    Return the shared write queue for a database file, creating it on first use.
+
+    Batching is tuned with EMPLOYEE_WRITE_BATCH (rows) and EMPLOYEE_WRITE_DELAY_MS.
+    """
+    key = os.path.abspath(db_file)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = WriteQueue(
+                db_file,
+                max_batch=int(os.environ.get("EMPLOYEE_WRITE_BATCH", DEFAULT_MAX_BATCH)),
+                max_delay=float(os.environ.get("EMPLOYEE_WRITE_DELAY_MS", DEFAULT_MAX_DELAY * 1000)) / 1000,
+            )
+            _queues[key] = queue
+        return queue
+
+
+@atexit.register
+def close_write_queues():
+    """Flush and stop every write queue (runs automatically at exit)."""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for queue in queues:
+        queue.close(timeout=10)